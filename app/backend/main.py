@@ -2,9 +2,13 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.backend.routes import api_router
+from src.utils.progress import progress
 
 app = FastAPI(title="AI Hedge Fund API", description="Backend API for AI Hedge Fund", version="0.1.0")
 
+# A server has no console to render the live progress display to
+progress.set_headless()
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
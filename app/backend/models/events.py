@@ -19,6 +19,15 @@ class StartEvent(BaseEvent):
     type: Literal["start"] = "start"
     timestamp: Optional[str] = None
 
+class QueuedEvent(BaseEvent):
+    """Event reporting a job's position in the run queue"""
+
+    type: Literal["queued"] = "queued"
+    job_id: str
+    position: int
+    timestamp: Optional[str] = None
+
+
 class ProgressUpdateEvent(BaseEvent):
     """Event containing an agent's progress update"""
 
@@ -29,6 +38,16 @@ class ProgressUpdateEvent(BaseEvent):
     timestamp: Optional[str] = None
     analysis: Optional[str] = None
 
+class SignalEvent(BaseEvent):
+    """Event carrying an agent's finished signal for one ticker, including its reasoning"""
+
+    type: Literal["signal"] = "signal"
+    agent: str
+    ticker: str
+    signal: Dict[str, Any]
+    timestamp: Optional[str] = None
+
+
 class ErrorEvent(BaseEvent):
     """Event indicating an error occurred"""
 
@@ -1,12 +1,20 @@
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from src.llm.models import ModelProvider
+from src.utils.analysts import DEFAULT_TOP_K, screening_analysts
+
+
+class ScreeningResult(BaseModel):
+    candidates: List[str]
+    scores: Dict[str, float]
 
 
 class HedgeFundResponse(BaseModel):
     decisions: dict
     analyst_signals: dict
+    # Set for runs submitted to /hedge-fund/screen
+    screening: Optional[ScreeningResult] = None
 
 
 class ErrorResponse(BaseModel):
@@ -23,9 +31,68 @@ class HedgeFundRequest(BaseModel):
     model_provider: ModelProvider = ModelProvider.OPENAI
     initial_cash: float = 100000.0
     margin_requirement: float = 0.0
+    allocation_mode: Literal["llm", "deterministic"] = "llm"
+    # Start from a stored portfolio (see /portfolios) instead of initial_cash/margin_requirement
+    portfolio_id: Optional[str] = None
 
     def get_start_date(self) -> str:
         """Calculate start date if not provided"""
         if self.start_date:
             return self.start_date
         return (datetime.strptime(self.end_date, "%Y-%m-%d") - timedelta(days=90)).strftime("%Y-%m-%d")
+
+
+class ScreenRequest(HedgeFundRequest):
+    """
+    A staged run: screening_agents (analysts without LLM calls) rank the whole `tickers`
+    universe, and only the top_k candidates go to selected_agents and the portfolio manager.
+    """
+
+    screening_agents: List[str] = Field(default_factory=screening_analysts)
+    top_k: int = Field(default=DEFAULT_TOP_K, gt=0)
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
+    position: Optional[int] = None
+    created_at: str
+    result: Optional[HedgeFundResponse] = None
+    error: Optional[str] = None
+
+
+class PortfolioCreateRequest(BaseModel):
+    portfolio_id: Optional[str] = None
+    initial_cash: float = 100000.0
+    margin_requirement: float = 0.0
+    tickers: List[str] = []
+
+
+class ExecutedDecision(BaseModel):
+    action: Literal["buy", "sell", "short", "cover", "hold"]
+    quantity: int = 0
+
+
+class PortfolioTradesRequest(BaseModel):
+    decisions: Dict[str, ExecutedDecision]
+    prices: Dict[str, float] = {}
+    date: Optional[str] = None
+
+
+class PortfolioSnapshotRequest(BaseModel):
+    label: Optional[str] = None
+
+
+class PortfolioResponse(BaseModel):
+    portfolio_id: str
+    portfolio: dict
+    updated_at: datetime
+    executed: Optional[Dict[str, int]] = None
+
+
+class PortfolioSnapshotResponse(BaseModel):
+    snapshot_id: int
+    portfolio_id: str
+    label: Optional[str] = None
+    portfolio: dict
+    created_at: datetime
@@ -2,6 +2,7 @@ from fastapi import APIRouter
 
 from app.backend.routes.hedge_fund import router as hedge_fund_router
 from app.backend.routes.health import router as health_router
+from app.backend.routes.portfolios import router as portfolios_router
 
 # Main API router
 api_router = APIRouter()
@@ -9,3 +10,4 @@ api_router = APIRouter()
 # Include sub-routers
 api_router.include_router(health_router, tags=["health"])
 api_router.include_router(hedge_fund_router, tags=["hedge-fund"])
+api_router.include_router(portfolios_router, tags=["portfolios"])
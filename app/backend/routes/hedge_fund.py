@@ -1,106 +1,115 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
-import asyncio
 
-from app.backend.models.schemas import ErrorResponse, HedgeFundRequest
-from app.backend.models.events import StartEvent, ProgressUpdateEvent, ErrorEvent, CompleteEvent
-from app.backend.services.graph import create_graph, parse_hedge_fund_response, run_graph_async
-from app.backend.services.portfolio import create_portfolio
-from src.utils.progress import progress
+from app.backend.models.schemas import ErrorResponse, HedgeFundRequest, JobResponse, ScreenRequest
+from app.backend.services.event_bridge import EventBridge
+from app.backend.services.jobs import Job, JobQueueFullError, job_manager
+from app.backend.services.portfolio_store import PortfolioNotFoundError
 
 router = APIRouter(prefix="/hedge-fund")
 
 
+def submit_job(request: HedgeFundRequest, detached: bool = False, stream: bool = False) -> Job:
+    try:
+        return job_manager.submit(request, detached=detached, stream=stream)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except PortfolioNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred while processing the request: {str(e)}")
+
+
+def get_job(job_id: str, stream: bool = False) -> Job:
+    job = job_manager.get(job_id, stream=stream)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+def stream_job(job: Job) -> StreamingResponse:
+    """
+    Stream a job's events. The job must have been obtained with stream=True. When the
+    client disconnects, a job that no other stream is waiting for is cancelled unless
+    it was submitted detached (POST /jobs).
+    """
+
+    async def event_generator():
+        bridge = EventBridge()
+        job.subscribe(bridge)
+        try:
+            async for event in bridge:
+                yield event.to_sse()
+        finally:
+            job_manager.release(job, bridge)
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
+def job_response(job: Job) -> JobResponse:
+    return JobResponse(job_id=job.id, status=job.status, position=job.position, created_at=job.created_at, result=job.result, error=job.error)
+
+
 @router.post(
     path="/run",
     responses={
         200: {"description": "Successful response with streaming updates"},
         400: {"model": ErrorResponse, "description": "Invalid request parameters"},
         500: {"model": ErrorResponse, "description": "Internal server error"},
+        503: {"model": ErrorResponse, "description": "Job queue is full"},
     },
 )
 async def run_hedge_fund(request: HedgeFundRequest):
-    try:
-        # Create the portfolio
-        portfolio = create_portfolio(request.initial_cash, request.margin_requirement, request.tickers)
-
-        # Construct agent graph
-        graph = create_graph(request.selected_agents)
-        graph = graph.compile()
-
-        # Log a test progress update for debugging
-        progress.update_status("system", None, "Preparing hedge fund run")
-
-        # Convert model_provider to string if it's an enum
-        model_provider = request.model_provider
-        if hasattr(model_provider, "value"):
-            model_provider = model_provider.value
-
-        # Set up streaming response
-        async def event_generator():
-            # Queue for progress updates
-            progress_queue = asyncio.Queue()
-
-            # Simple handler to add updates to the queue
-            def progress_handler(agent_name, ticker, status, analysis, timestamp):
-                event = ProgressUpdateEvent(agent=agent_name, ticker=ticker, status=status, timestamp=timestamp, analysis=analysis)
-                progress_queue.put_nowait(event)
-
-            # Register our handler with the progress tracker
-            progress.register_handler(progress_handler)
-
-            try:
-                # Start the graph execution in a background task
-                run_task = asyncio.create_task(
-                    run_graph_async(
-                        graph=graph,
-                        portfolio=portfolio,
-                        tickers=request.tickers,
-                        start_date=request.start_date,
-                        end_date=request.end_date,
-                        model_name=request.model_name,
-                        model_provider=model_provider,
-                    )
-                )
-                # Send initial message
-                yield StartEvent().to_sse()
-
-                # Stream progress updates until run_task completes
-                while not run_task.done():
-                    # Either get a progress update or wait a bit
-                    try:
-                        event = await asyncio.wait_for(progress_queue.get(), timeout=1.0)
-                        yield event.to_sse()
-                    except asyncio.TimeoutError:
-                        # Just continue the loop
-                        pass
-
-                # Get the final result
-                result = run_task.result()
-
-                if not result or not result.get("messages"):
-                    yield ErrorEvent(message="Failed to generate hedge fund decisions").to_sse()
-                    return
-
-                # Send the final result
-                final_data = CompleteEvent(
-                    data={
-                        "decisions": parse_hedge_fund_response(result.get("messages", [])[-1].content),
-                        "analyst_signals": result.get("data", {}).get("analyst_signals", {}),
-                    }
-                )
-                yield final_data.to_sse()
-
-            finally:
-                # Clean up
-                progress.unregister_handler(progress_handler)
-                if "run_task" in locals() and not run_task.done():
-                    run_task.cancel()
-
-        # Return a streaming response
-        return StreamingResponse(event_generator(), media_type="text/event-stream")
-
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An error occurred while processing the request: {str(e)}")
+    """Submit a run and stream its queue position, progress and result."""
+    return stream_job(submit_job(request, stream=True))
+
+
+@router.post(
+    path="/screen",
+    responses={
+        200: {"description": "Successful response with streaming updates"},
+        404: {"model": ErrorResponse, "description": "Portfolio not found"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+        503: {"model": ErrorResponse, "description": "Job queue is full"},
+    },
+)
+async def screen_hedge_fund(request: ScreenRequest):
+    """
+    Screen a large universe with the analysts that make no LLM calls, then run the
+    selected agents and the portfolio manager on the top_k candidates only. Streams like
+    /run; the complete event also carries the screening scores and candidates.
+    """
+    return stream_job(submit_job(request, stream=True))
+
+
+@router.post(
+    path="/jobs",
+    response_model=JobResponse,
+    responses={
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+        503: {"model": ErrorResponse, "description": "Job queue is full"},
+    },
+)
+async def submit_hedge_fund_job(request: HedgeFundRequest):
+    """Submit a run without streaming it; poll or stream it later by job id."""
+    return job_response(submit_job(request, detached=True))
+
+
+@router.get(path="/jobs/{job_id}", response_model=JobResponse, responses={404: {"model": ErrorResponse, "description": "Job not found"}})
+async def get_hedge_fund_job(job_id: str):
+    """Status, queue position and (once finished) result of a job."""
+    return job_response(get_job(job_id))
+
+
+@router.get(path="/jobs/{job_id}/events", responses={200: {"description": "Streaming job updates"}, 404: {"model": ErrorResponse, "description": "Job not found"}})
+async def stream_hedge_fund_job(job_id: str):
+    """Stream a job's events, starting with its current state."""
+    return stream_job(get_job(job_id, stream=True))
+
+
+@router.post(path="/jobs/{job_id}/cancel", response_model=JobResponse, responses={404: {"model": ErrorResponse, "description": "Job not found"}})
+async def cancel_hedge_fund_job(job_id: str):
+    """Cancel a queued or running job."""
+    job = get_job(job_id)
+    job_manager.cancel(job)
+    return job_response(job)
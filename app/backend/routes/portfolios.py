@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException
+
+from app.backend.models.schemas import ErrorResponse, PortfolioCreateRequest, PortfolioResponse, PortfolioSnapshotRequest, PortfolioSnapshotResponse, PortfolioTradesRequest
+from app.backend.services.portfolio_store import PortfolioNotFoundError, get_portfolio_store
+from src.tools.api_router import get_last_price
+
+router = APIRouter(prefix="/portfolios")
+
+
+def portfolio_response(record, executed: dict[str, int] | None = None) -> PortfolioResponse:
+    return PortfolioResponse(portfolio_id=record.id, portfolio=record.state, updated_at=record.updated_at, executed=executed)
+
+
+def snapshot_response(snapshot) -> PortfolioSnapshotResponse:
+    return PortfolioSnapshotResponse(snapshot_id=snapshot.id, portfolio_id=snapshot.portfolio_id, label=snapshot.label, portfolio=snapshot.state, created_at=snapshot.created_at)
+
+
+@router.post(path="", response_model=PortfolioResponse)
+def create_portfolio(request: PortfolioCreateRequest):
+    """Create a cash-only portfolio (or reset an existing id)."""
+    return portfolio_response(get_portfolio_store().create(request.initial_cash, request.margin_requirement, request.tickers, request.portfolio_id))
+
+
+@router.get(path="/{portfolio_id}", response_model=PortfolioResponse, responses={404: {"model": ErrorResponse, "description": "Portfolio not found"}})
+def get_portfolio(portfolio_id: str):
+    try:
+        return portfolio_response(get_portfolio_store().get(portfolio_id))
+    except PortfolioNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post(
+    path="/{portfolio_id}/trades",
+    response_model=PortfolioResponse,
+    responses={
+        404: {"model": ErrorResponse, "description": "Portfolio not found"},
+        502: {"model": ErrorResponse, "description": "A missing price could not be fetched"},
+    },
+)
+def apply_trades(portfolio_id: str, request: PortfolioTradesRequest):
+    """
+    Update the portfolio from executed decisions (e.g. the decisions of a run). Tickers
+    without a price in the request are filled at their latest close as of the date.
+    """
+    date = request.date or datetime.now().strftime("%Y-%m-%d")
+    prices = dict(request.prices)
+    for ticker, decision in request.decisions.items():
+        if decision.action != "hold" and ticker not in prices:
+            try:
+                price = get_last_price(ticker, date)
+            except Exception as e:
+                raise HTTPException(status_code=502, detail=f"Could not fetch the price of {ticker} as of {date}: {str(e)}")
+            if price is not None:
+                prices[ticker] = price
+
+    decisions = {ticker: decision.model_dump() for ticker, decision in request.decisions.items()}
+    try:
+        record, executed = get_portfolio_store().apply_decisions(portfolio_id, decisions, prices, date)
+    except PortfolioNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return portfolio_response(record, executed)
+
+
+@router.post(path="/{portfolio_id}/snapshots", response_model=PortfolioSnapshotResponse, responses={404: {"model": ErrorResponse, "description": "Portfolio not found"}})
+def snapshot_portfolio(portfolio_id: str, request: PortfolioSnapshotRequest):
+    try:
+        return snapshot_response(get_portfolio_store().snapshot(portfolio_id, request.label))
+    except PortfolioNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get(path="/{portfolio_id}/snapshots", response_model=list[PortfolioSnapshotResponse], responses={404: {"model": ErrorResponse, "description": "Portfolio not found"}})
+def list_portfolio_snapshots(portfolio_id: str):
+    try:
+        return [snapshot_response(snapshot) for snapshot in get_portfolio_store().list_snapshots(portfolio_id)]
+    except PortfolioNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from collections import deque
+
+# Maximum number of events buffered between the graph threads and the SSE stream
+DEFAULT_BUFFER_SIZE = 1000
+# Event types that may be dropped when the buffer is full (a later update supersedes them)
+DROPPABLE_EVENT_TYPES = {"progress"}
+
+
+class EventBridge:
+    """
+    Hands events from the graph's worker threads to an async consumer on the event loop.
+
+    `publish` and `close` may be called from any thread. Events are buffered in a bounded,
+    lock-protected deque, and the event loop is only woken up (via call_soon_threadsafe)
+    when the buffer goes from empty to non-empty, so a burst of updates costs one wakeup
+    instead of one loop callback per event. When the buffer is full, the oldest droppable
+    (progress) event is discarded; start, complete and error events are never dropped.
+    Iteration ends as soon as the bridge is closed and the buffer is drained.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None, maxsize: int = DEFAULT_BUFFER_SIZE):
+        self.loop = loop or asyncio.get_running_loop()
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+        self._wakeup_scheduled = False
+        self._closed = False
+
+    def publish(self, event):
+        """Buffer an event for the consumer (thread-safe)."""
+        with self._lock:
+            if self._closed:
+                return
+            if len(self._buffer) >= self.maxsize and self._drop_oldest():
+                self.dropped += 1
+            self._buffer.append(event)
+            self._wake_up()
+
+    def close(self):
+        """Signal that no more events will be published (thread-safe)."""
+        with self._lock:
+            self._closed = True
+            self._wake_up()
+
+    def _drop_oldest(self) -> bool:
+        for i, event in enumerate(self._buffer):
+            if event.type in DROPPABLE_EVENT_TYPES:
+                del self._buffer[i]
+                return True
+        return False
+
+    def _wake_up(self):
+        # Called with the lock held
+        if not self._wakeup_scheduled:
+            self._wakeup_scheduled = True
+            self.loop.call_soon_threadsafe(self._ready.set)
+
+    async def __aiter__(self):
+        while True:
+            await self._ready.wait()
+            with self._lock:
+                batch = list(self._buffer)
+                self._buffer.clear()
+                self._ready.clear()
+                self._wakeup_scheduled = False
+                closed = self._closed
+
+            for event in batch:
+                yield event
+            if closed:
+                return
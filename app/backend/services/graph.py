@@ -1,4 +1,4 @@
-import asyncio
+import functools
 import json
 from langchain_core.messages import HumanMessage
 from langgraph.graph import END, StateGraph
@@ -48,13 +48,19 @@ def create_graph(selected_agents: list[str]) -> StateGraph:
     return graph
 
 
-async def run_graph_async(graph, portfolio, tickers, start_date, end_date, model_name, model_provider):
-    """Async wrapper for run_graph to work with asyncio."""
-    # Use run_in_executor to run the synchronous function in a separate thread
-    # so it doesn't block the event loop
-    loop = asyncio.get_running_loop()
-    result = await loop.run_in_executor(None, lambda: run_graph(graph, portfolio, tickers, start_date, end_date, model_name, model_provider))  # Use default executor
-    return result
+def get_compiled_graph(selected_agents: list[str]):
+    """
+    The compiled graph of an agent selection, memoized by the set of selected agents so
+    that requests with the same selection share one compiled graph.
+    """
+    # Unknown agents are dropped by create_graph, so they do not change the graph
+    return _compile_graph(frozenset(agent for agent in selected_agents if agent in ANALYST_CONFIG))
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_graph(selected_agents: frozenset):
+    # Canonical (configuration) order, so equal selections build identical graphs
+    return create_graph([agent for agent in ANALYST_CONFIG if agent in selected_agents]).compile()
 
 
 def run_graph(
@@ -65,11 +71,14 @@ def run_graph(
     end_date: str,
     model_name: str,
     model_provider: str,
+    allocation_mode: str = "llm",
+    analyst_signals: dict | None = None,
 ) -> dict:
     """
     Run the graph with the given portfolio, tickers,
     start date, end date, show reasoning, model name,
-    and model provider.
+    and model provider. analyst_signals seeds signals computed
+    beforehand (e.g. by a screen) that the graph does not recompute.
     """
     return graph.invoke(
         {
@@ -83,12 +92,13 @@ def run_graph(
                 "portfolio": portfolio,
                 "start_date": start_date,
                 "end_date": end_date,
-                "analyst_signals": {},
+                "analyst_signals": dict(analyst_signals) if analyst_signals is not None else {},
             },
             "metadata": {
                 "show_reasoning": False,
                 "model_name": model_name,
                 "model_provider": model_provider,
+                "allocation_mode": allocation_mode,
             },
         },
     )
@@ -0,0 +1,397 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from app.backend.models.events import CompleteEvent, ErrorEvent, ProgressUpdateEvent, QueuedEvent, SignalEvent, StartEvent
+from app.backend.models.schemas import HedgeFundRequest, ScreenRequest
+from app.backend.services.graph import get_compiled_graph, parse_hedge_fund_response, run_graph
+from app.backend.services.portfolio import create_portfolio
+from app.backend.services.portfolio_store import get_portfolio_store
+from src.utils.analysts import ANALYST_CONFIG
+from src.utils.cancellation import CancellationToken, RunCancelled, cancellation_scope
+from src.utils.progress import progress
+from src.utils.screening import rank_tickers, screen_universe
+
+# Number of hedge fund runs executed at the same time
+MAX_CONCURRENT_RUNS = int(os.environ.get("HEDGE_FUND_MAX_CONCURRENT_RUNS", "2"))
+# Number of submitted runs allowed to wait for a worker before new submissions are rejected
+MAX_QUEUED_RUNS = int(os.environ.get("HEDGE_FUND_MAX_QUEUED_RUNS", "32"))
+# Number of finished jobs whose results are kept for retrieval
+MAX_FINISHED_JOBS = 100
+# Seconds a completed run's result is reused for identical requests
+RESULT_TTL_SECONDS = float(os.environ.get("HEDGE_FUND_RESULT_TTL", "300"))
+
+
+class JobQueueFullError(Exception):
+    """Raised when a run is submitted while the job queue is full."""
+
+
+def request_fingerprint(request: HedgeFundRequest, model_provider: str, portfolio: dict) -> str:
+    """
+    Key of the requests that produce the same run: the same tickers, agents (in any
+    order, unknown agents ignored like the graph does), dates, model and portfolio state.
+    """
+    key = {
+        "tickers": sorted(request.tickers),
+        "selected_agents": sorted(agent for agent in set(request.selected_agents) if agent in ANALYST_CONFIG),
+        "start_date": request.start_date,
+        "end_date": request.end_date,
+        "model_name": request.model_name,
+        "model_provider": model_provider,
+        "portfolio": portfolio,
+        "allocation_mode": request.allocation_mode,
+    }
+    if isinstance(request, ScreenRequest):
+        key["screening_agents"] = sorted(set(request.screening_agents))
+        key["top_k"] = request.top_k
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Job:
+    """
+    One submitted hedge fund run and its event stream.
+
+    Subscribers (EventBridges of SSE streams) can attach and detach at any time: a new
+    subscriber first receives the job's current state (queue position, start, the latest
+    progress and the signal of every agent and ticker, and the final event if the job has
+    finished), then the live events. A detached job keeps running when its subscribers
+    disconnect, and its result stays available through the job manager; other jobs are
+    cancelled once their last stream is gone (see JobManager.release).
+    """
+
+    def __init__(self, request: HedgeFundRequest, graph, portfolio: dict, model_provider: str, fingerprint: str | None = None, detached: bool = False):
+        self.id = uuid.uuid4().hex
+        self.fingerprint = fingerprint
+        self.detached = detached
+        self.cancel_token = CancellationToken()
+        self.request = request
+        self.graph = graph
+        self.portfolio = portfolio
+        self.model_provider = model_provider
+        self.created_at = _now()
+        self.status = "queued"
+        self.position = None
+        self.result = None
+        self.error = None
+        self.finished_at = None
+        # Streams handed this job and not yet released (guarded by the JobManager's lock)
+        self.streams = 0
+
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._queued_event = None
+        self._start_event = None
+        self._progress_events = {}
+        self._signal_events = {}
+        self._final_event = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def subscribe(self, bridge):
+        """Replay the job's current state to bridge and attach it to the live events."""
+        with self._lock:
+            for event in (self._queued_event, self._start_event, *self._progress_events.values(), *self._signal_events.values(), self._final_event):
+                if event is not None:
+                    bridge.publish(event)
+            if self._final_event is not None:
+                bridge.close()
+            else:
+                self._subscribers.append(bridge)
+
+    def unsubscribe(self, bridge):
+        with self._lock:
+            if bridge in self._subscribers:
+                self._subscribers.remove(bridge)
+
+    def publish(self, event):
+        """Record an event and forward it to the subscribers (thread-safe)."""
+        with self._lock:
+            if event.type == "queued":
+                self._queued_event = event
+            elif event.type == "start":
+                self._start_event = event
+            elif event.type == "progress":
+                # Only the latest update of an agent and ticker is replayed to new subscribers
+                self._progress_events[(event.agent, event.ticker)] = event
+            elif event.type == "signal":
+                self._signal_events[(event.agent, event.ticker)] = event
+            else:
+                self._final_event = event
+
+            for bridge in self._subscribers:
+                bridge.publish(event)
+            if self._final_event is not None:
+                for bridge in self._subscribers:
+                    bridge.close()
+                self._subscribers.clear()
+
+    def publish_progress(self, agent_name, ticker, status, analysis, timestamp):
+        """Progress handler of the job's run channel."""
+        self.publish(ProgressUpdateEvent(agent=agent_name, ticker=ticker, status=status, timestamp=timestamp, analysis=analysis))
+
+    def publish_signal(self, agent_name, ticker, signal, timestamp):
+        """Signal handler of the job's run channel: a per-ticker delta, sent once (progress events do not repeat it)."""
+        self.publish(SignalEvent(agent=agent_name, ticker=ticker, signal=signal, timestamp=timestamp))
+
+    def set_position(self, position: int):
+        self.position = position
+        self.publish(QueuedEvent(job_id=self.id, position=position, timestamp=_now()))
+
+    def run(self):
+        """Execute the run (on a worker thread) and publish its final event."""
+        self.status = "running"
+        self.position = None
+        self.publish(StartEvent(timestamp=_now()))
+
+        try:
+            with progress.run_channel(self.publish_progress, self.publish_signal), cancellation_scope(self.cancel_token):
+                result = self._execute()
+        except RunCancelled:
+            self._cancelled()
+            return
+        except Exception as e:
+            self._fail(f"An error occurred while running the hedge fund: {str(e)}")
+            return
+
+        if result is None:
+            self._fail("Failed to generate hedge fund decisions")
+            return
+
+        self.result = result
+        self.status = "completed"
+        self.finished_at = time.monotonic()
+        self.publish(CompleteEvent(data=self.result, timestamp=_now()))
+
+    def _execute(self, tickers: list[str] | None = None, portfolio: dict | None = None, analyst_signals: dict | None = None) -> dict | None:
+        """Run the graph; returns the job result, or None when it produced no decisions."""
+        request = self.request
+        result = run_graph(
+            graph=self.graph,
+            portfolio=portfolio if portfolio is not None else self.portfolio,
+            tickers=tickers if tickers is not None else request.tickers,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            model_name=request.model_name,
+            model_provider=self.model_provider,
+            allocation_mode=request.allocation_mode,
+            analyst_signals=analyst_signals,
+        )
+        if not result or not result.get("messages"):
+            return None
+        return {
+            "decisions": parse_hedge_fund_response(result.get("messages", [])[-1].content),
+            "analyst_signals": result.get("data", {}).get("analyst_signals", {}),
+        }
+
+    def cancel(self):
+        """
+        Ask the run to stop: a queued job is cancelled right away, a running one at the
+        agents' next cancellation check (between tickers, before LLM calls and data fetches).
+        """
+        if self.finished:
+            return
+        self.cancel_token.cancel()
+        if self.status == "queued":
+            self._cancelled()
+
+    def _cancelled(self):
+        self.error = "Run cancelled"
+        self.status = "cancelled"
+        self.finished_at = time.monotonic()
+        self.publish(ErrorEvent(message=self.error, timestamp=_now()))
+
+    def _fail(self, message: str):
+        self.error = message
+        self.status = "failed"
+        self.finished_at = time.monotonic()
+        self.publish(ErrorEvent(message=message, timestamp=_now()))
+
+
+class ScreeningJob(Job):
+    """
+    A staged run over a large universe: the screening analysts (no LLM calls) run over
+    every ticker in concurrent batches, the tickers are ranked by the strength of their
+    net conviction, and only the top_k candidates go through the selected analysts, risk
+    management and the portfolio manager. The screening signals of the candidates are
+    passed on, so the portfolio manager sees them without recomputing them.
+    """
+
+    def _execute(self) -> dict | None:
+        request = self.request
+        universe = list(dict.fromkeys(request.tickers))
+
+        progress.update_status("screener", None, f"Screening {len(universe)} tickers")
+        screen_signals = screen_universe(universe, request.start_date, request.end_date, request.screening_agents, request.model_name, self.model_provider)
+        scores = rank_tickers(screen_signals, universe)
+        candidates = list(scores)[: request.top_k]
+        progress.update_status("screener", None, f"Done: selected {len(candidates)} of {len(universe)} tickers")
+        if not candidates:
+            # Nothing to pass on (never fall back to running the LLM analysts on the whole universe)
+            return {"decisions": {}, "analyst_signals": {}, "screening": {"candidates": [], "scores": scores}}
+
+        # Only the candidates (and existing holdings) go to risk management
+        positions = {ticker: position for ticker, position in self.portfolio["positions"].items() if ticker in candidates or position.get("long") or position.get("short")}
+        portfolio = {**self.portfolio, "positions": positions, "realized_gains": {ticker: gains for ticker, gains in self.portfolio.get("realized_gains", {}).items() if ticker in positions}}
+        candidate_signals = {agent: {ticker: signals[ticker] for ticker in candidates if ticker in signals} for agent, signals in screen_signals.items()}
+
+        result = super()._execute(tickers=candidates, portfolio=portfolio, analyst_signals=candidate_signals)
+        if result is not None:
+            result["screening"] = {"candidates": candidates, "scores": scores}
+        return result
+
+
+class JobManager:
+    """
+    Admission control for hedge fund runs: submitted jobs wait in a bounded FIFO queue
+    and are executed by a fixed pool of worker threads, so a burst of requests queues up
+    instead of running unboundedly many graphs against the LLM providers and data APIs
+    at once. Queued jobs are told their position whenever it changes.
+
+    Identical requests (see request_fingerprint) share one job: while it is queued or
+    running, later requests subscribe to its event stream, and after it completed its
+    result is reused for result_ttl seconds. Failed and cancelled runs are never reused.
+    """
+
+    def __init__(self, max_workers: int = MAX_CONCURRENT_RUNS, max_queued: int = MAX_QUEUED_RUNS, max_finished: int = MAX_FINISHED_JOBS, result_ttl: float = RESULT_TTL_SECONDS):
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge-fund-run")
+        self._lock = threading.Lock()
+        self._queue = []
+        self._jobs = OrderedDict()
+        self._jobs_by_fingerprint = {}
+
+    def submit(self, request: HedgeFundRequest, detached: bool = False, stream: bool = False) -> Job:
+        """
+        Queue a run, or return the job of an identical in-flight or recently completed
+        run. A detached job is not cancelled when its streams disconnect. With stream,
+        the caller's stream is counted in the same locked step that hands out the job,
+        so the job cannot be cancelled by another stream's release before the caller
+        subscribes; the caller must call release when its stream ends. Raises
+        JobQueueFullError when too many runs are already waiting, and
+        PortfolioNotFoundError for an unknown portfolio_id.
+        """
+        # Convert model_provider to string if it's an enum
+        model_provider = request.model_provider
+        if hasattr(model_provider, "value"):
+            model_provider = model_provider.value
+
+        # Warm-start from the stored portfolio when the request names one
+        if request.portfolio_id:
+            portfolio = get_portfolio_store().load_for_run(request.portfolio_id, request.tickers)
+        else:
+            portfolio = create_portfolio(request.initial_cash, request.margin_requirement, request.tickers)
+
+        fingerprint = request_fingerprint(request, model_provider, portfolio)
+        with self._lock:
+            if (shared_job := self._shared_job(fingerprint, detached, stream)) is not None:
+                return shared_job
+
+        job_class = ScreeningJob if isinstance(request, ScreenRequest) else Job
+        job = job_class(
+            request=request,
+            graph=get_compiled_graph(request.selected_agents),
+            portfolio=portfolio,
+            model_provider=model_provider,
+            fingerprint=fingerprint,
+            detached=detached,
+        )
+
+        with self._lock:
+            # An identical request may have been submitted while the job was built
+            if (shared_job := self._shared_job(fingerprint, detached, stream)) is not None:
+                return shared_job
+            if len(self._queue) >= self.max_queued:
+                raise JobQueueFullError(f"Too many queued runs ({len(self._queue)}), try again later")
+            if stream:
+                job.streams += 1
+            self._queue.append(job)
+            self._jobs[job.id] = job
+            self._jobs_by_fingerprint[fingerprint] = job
+            job.set_position(len(self._queue))
+            self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str, stream: bool = False) -> Job | None:
+        """A job by id; with stream, the caller's stream is counted as in submit."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and stream:
+                job.streams += 1
+            return job
+
+    def cancel(self, job: Job):
+        """Cancel a job, taking it out of the queue if it has not started yet."""
+        with self._lock:
+            self._cancel(job)
+
+    def release(self, job: Job, bridge):
+        """Detach an ended stream, cancelling a job no stream is waiting for any more."""
+        job.unsubscribe(bridge)
+        with self._lock:
+            job.streams -= 1
+            if job.streams == 0 and not job.detached and not job.finished:
+                self._cancel(job)
+
+    def _cancel(self, job: Job):
+        # Called with the lock held
+        if job in self._queue:
+            self._remove_from_queue(job)
+        job.cancel()
+
+    def _shared_job(self, fingerprint: str, detached: bool, stream: bool) -> Job | None:
+        """The job an identical request can share, counting the caller's stream (called with the lock held)."""
+        job = self._jobs_by_fingerprint.get(fingerprint)
+        if job is None or job.status in ("failed", "cancelled"):
+            return None
+        if job.status == "completed" and time.monotonic() - job.finished_at > self.result_ttl:
+            return None
+        job.detached = job.detached or detached
+        if stream:
+            job.streams += 1
+        return job
+
+    def _remove_from_queue(self, job: Job):
+        # Called with the lock held
+        self._queue.remove(job)
+        for position, queued_job in enumerate(self._queue, start=1):
+            queued_job.set_position(position)
+
+    def _run(self, job: Job):
+        with self._lock:
+            if job.status == "cancelled":
+                return
+            self._remove_from_queue(job)
+            # From here on, cancelling goes through the job's token
+            job.status = "running"
+
+        try:
+            job.run()
+        finally:
+            self._prune()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_finished."""
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+            for job_id in finished[: max(len(finished) - self.max_finished, 0)]:
+                job = self._jobs.pop(job_id)
+                if self._jobs_by_fingerprint.get(job.fingerprint) is job:
+                    del self._jobs_by_fingerprint[job.fingerprint]
+
+
+# Global job manager of the API process
+job_manager = JobManager()
@@ -0,0 +1,141 @@
+import functools
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import JSON, DateTime, ForeignKey, Integer, String, create_engine, event, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+
+from app.backend.services.portfolio import create_portfolio
+from src.utils.ledger import PortfolioLedger
+
+# SQLAlchemy URL of the portfolio database
+DATABASE_URL_ENV = "HEDGE_FUND_DATABASE_URL"
+DEFAULT_DATABASE_URL = "sqlite:///hedge_fund.db"
+
+
+class PortfolioNotFoundError(Exception):
+    """Raised when a portfolio id is not in the store."""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class PortfolioRecord(Base):
+    """Current state of a portfolio, in the nested-dict format the agents use."""
+
+    __tablename__ = "portfolios"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    state: Mapped[dict] = mapped_column(JSON)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
+
+
+class PortfolioSnapshotRecord(Base):
+    """A copy of a portfolio's state at one point in time."""
+
+    __tablename__ = "portfolio_snapshots"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    portfolio_id: Mapped[str] = mapped_column(ForeignKey("portfolios.id"), index=True)
+    label: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    state: Mapped[dict] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
+
+
+class PortfolioStore:
+    """
+    Persisted portfolios keyed by id, so API runs can start from a portfolio's current
+    positions (a primary-key lookup) instead of clients sending the full state with
+    every request. Executed decisions are applied with the backtester's PortfolioLedger,
+    so cash, margin and realized gains follow the same rules as in a backtest.
+
+    Writes to one portfolio are serialized by a per-portfolio lock, since SQLite ignores
+    SELECT ... FOR UPDATE and concurrent read-modify-write updates would otherwise be
+    lost. The lock covers the API process (which runs as a single process).
+    """
+
+    def __init__(self, url: str = DEFAULT_DATABASE_URL):
+        connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+        self.engine = create_engine(url, connect_args=connect_args)
+        if url.startswith("sqlite"):
+            # WAL lets runs read portfolios while one is being updated
+            event.listen(self.engine, "connect", lambda connection, _: connection.execute("PRAGMA journal_mode=WAL"))
+        # Tables are created on first use; there are no migrations yet
+        Base.metadata.create_all(self.engine)
+        self._sessions = sessionmaker(self.engine, expire_on_commit=False)
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _portfolio_lock(self, portfolio_id: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(portfolio_id, threading.Lock())
+
+    def create(self, initial_cash: float, margin_requirement: float, tickers: list[str], portfolio_id: str | None = None) -> PortfolioRecord:
+        """Create (or reset) a portfolio holding only cash."""
+        portfolio_id = portfolio_id or uuid.uuid4().hex
+        with self._portfolio_lock(portfolio_id), self._sessions.begin() as session:
+            record = session.merge(PortfolioRecord(id=portfolio_id, state=create_portfolio(initial_cash, margin_requirement, tickers), updated_at=_utcnow()))
+        return record
+
+    def get(self, portfolio_id: str) -> PortfolioRecord:
+        with self._sessions() as session:
+            record = session.get(PortfolioRecord, portfolio_id)
+        if record is None:
+            raise PortfolioNotFoundError(f"Portfolio not found: {portfolio_id}")
+        return record
+
+    def load_for_run(self, portfolio_id: str, tickers: list[str]) -> dict:
+        """The portfolio's state, with empty positions added for requested tickers it does not hold."""
+        return PortfolioLedger.from_dict(self.get(portfolio_id).state, tickers).to_dict()
+
+    def apply_decisions(self, portfolio_id: str, decisions: dict[str, dict], prices: dict[str, float], date: str | None = None) -> tuple[PortfolioRecord, dict[str, int]]:
+        """
+        Execute decisions ({ticker: {"action", "quantity"}}, e.g. the decisions of a run)
+        at the given prices. Returns the updated portfolio and the shares actually
+        traded per ticker, which can be fewer than requested when cash or holdings limit.
+        """
+        with self._portfolio_lock(portfolio_id), self._sessions.begin() as session:
+            # The row lock additionally serializes writers of other processes on databases that support it
+            record = session.get(PortfolioRecord, portfolio_id, with_for_update=True)
+            if record is None:
+                raise PortfolioNotFoundError(f"Portfolio not found: {portfolio_id}")
+
+            ledger = PortfolioLedger.from_dict(record.state, list(decisions))
+            executed = {}
+            for ticker, decision in decisions.items():
+                action = decision.get("action", "hold")
+                if action == "hold" or ticker not in prices:
+                    executed[ticker] = 0
+                    continue
+                executed[ticker] = ledger.execute_trade(ticker, action, decision.get("quantity", 0), prices[ticker], date=date)
+
+            record.state = ledger.to_dict()
+        return record, executed
+
+    def snapshot(self, portfolio_id: str, label: str | None = None) -> PortfolioSnapshotRecord:
+        """Store a copy of the portfolio's current state."""
+        with self._sessions.begin() as session:
+            record = session.get(PortfolioRecord, portfolio_id)
+            if record is None:
+                raise PortfolioNotFoundError(f"Portfolio not found: {portfolio_id}")
+            snapshot = PortfolioSnapshotRecord(portfolio_id=portfolio_id, label=label, state=record.state, created_at=_utcnow())
+            session.add(snapshot)
+        return snapshot
+
+    def list_snapshots(self, portfolio_id: str) -> list[PortfolioSnapshotRecord]:
+        self.get(portfolio_id)
+        with self._sessions() as session:
+            return list(session.scalars(select(PortfolioSnapshotRecord).where(PortfolioSnapshotRecord.portfolio_id == portfolio_id).order_by(PortfolioSnapshotRecord.id)))
+
+
+@functools.lru_cache(maxsize=None)
+def get_portfolio_store() -> PortfolioStore:
+    """The portfolio store of the API process, opened on first use."""
+    return PortfolioStore(os.environ.get(DATABASE_URL_ENV, DEFAULT_DATABASE_URL))
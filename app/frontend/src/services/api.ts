@@ -116,6 +116,21 @@ export const api = {
                         });
                       }
                       break;
+                    case 'signal':
+                      // Per-ticker signal of a finished agent, with its reasoning
+                      // (the "Done" progress events no longer carry it)
+                      if (eventData.agent && eventData.ticker && eventData.signal) {
+                        const agentId = eventData.agent.replace('_agent', '');
+                        const reasoning = eventData.signal.reasoning;
+
+                        nodeContext.updateAgentNode(agentId, {
+                          ticker: eventData.ticker,
+                          message: `Signal: ${eventData.signal.signal ?? 'n/a'}`,
+                          analysis: typeof reasoning === 'string' ? reasoning : JSON.stringify(reasoning ?? eventData.signal, null, 2),
+                          timestamp: eventData.timestamp
+                        });
+                      }
+                      break;
                     case 'complete':
                       // Store the complete event data in the node context
                       if (eventData.data) {
@@ -15,6 +15,7 @@ from src.tools.api_router import (
 )
 from src.utils.llm import call_llm
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
 
 
 class AswathDamodaranSignal(BaseModel):
@@ -40,6 +41,7 @@ def aswath_damodaran_agent(state: AgentState):
     damodaran_signals: dict[str, dict] = {}
 
     for ticker in tickers:
+        check_cancelled()
         # ─── Fetch core data ────────────────────────────────────────────────────
         progress.update_status("aswath_damodaran_agent", ticker, "Fetching financial metrics")
         metrics = get_financial_metrics(ticker, end_date, period="ttm", limit=5)
@@ -122,7 +124,8 @@ def aswath_damodaran_agent(state: AgentState):
 
         damodaran_signals[ticker] = damodaran_output.model_dump()
 
-        progress.update_status("aswath_damodaran_agent", ticker, "Done", analysis=damodaran_output.reasoning)
+        progress.update_signal("aswath_damodaran_agent", ticker, damodaran_signals[ticker])
+        progress.update_status("aswath_damodaran_agent", ticker, "Done")
 
     # ─── Push message back to graph state ──────────────────────────────────────
     message = HumanMessage(content=json.dumps(damodaran_signals), name="aswath_damodaran_agent")
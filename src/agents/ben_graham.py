@@ -6,6 +6,7 @@ from pydantic import BaseModel
 import json
 from typing_extensions import Literal
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
 from src.utils.llm import call_llm
 import math
 
@@ -32,6 +33,7 @@ def ben_graham_agent(state: AgentState):
     graham_analysis = {}
 
     for ticker in tickers:
+        check_cancelled()
         progress.update_status("ben_graham_agent", ticker, "Fetching financial metrics")
         metrics = get_financial_metrics(ticker, end_date, period="annual", limit=10)
 
@@ -75,7 +77,8 @@ def ben_graham_agent(state: AgentState):
 
         graham_analysis[ticker] = {"signal": graham_output.signal, "confidence": graham_output.confidence, "reasoning": graham_output.reasoning}
 
-        progress.update_status("ben_graham_agent", ticker, "Done", analysis=graham_output.reasoning)
+        progress.update_signal("ben_graham_agent", ticker, graham_analysis[ticker])
+        progress.update_status("ben_graham_agent", ticker, "Done")
 
     # Wrap results in a single message for the chain
     message = HumanMessage(content=json.dumps(graham_analysis), name="ben_graham_agent")
@@ -7,6 +7,7 @@ from pydantic import BaseModel
 import json
 from typing_extensions import Literal
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
 from src.utils.llm import call_llm
 
 
@@ -30,6 +31,7 @@ def bill_ackman_agent(state: AgentState):
     ackman_analysis = {}
     
     for ticker in tickers:
+        check_cancelled()
         progress.update_status("bill_ackman_agent", ticker, "Fetching financial metrics")
         metrics = get_financial_metrics(ticker, end_date, period="annual", limit=5)
         
@@ -110,7 +112,8 @@ def bill_ackman_agent(state: AgentState):
             "reasoning": ackman_output.reasoning
         }
         
-        progress.update_status("bill_ackman_agent", ticker, "Done", analysis=ackman_output.reasoning)
+        progress.update_signal("bill_ackman_agent", ticker, ackman_analysis[ticker])
+        progress.update_status("bill_ackman_agent", ticker, "Done")
     
     # Wrap results in a single message for the chain
     message = HumanMessage(
@@ -6,6 +6,7 @@ from pydantic import BaseModel
 import json
 from typing_extensions import Literal
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
 from src.utils.llm import call_llm
 
 
@@ -31,6 +32,7 @@ def cathie_wood_agent(state: AgentState):
     cw_analysis = {}
 
     for ticker in tickers:
+        check_cancelled()
         progress.update_status("cathie_wood_agent", ticker, "Fetching financial metrics")
         metrics = get_financial_metrics(ticker, end_date, period="annual", limit=5)
 
@@ -92,7 +94,8 @@ def cathie_wood_agent(state: AgentState):
 
         cw_analysis[ticker] = {"signal": cw_output.signal, "confidence": cw_output.confidence, "reasoning": cw_output.reasoning}
 
-        progress.update_status("cathie_wood_agent", ticker, "Done", analysis=cw_output.reasoning)
+        progress.update_signal("cathie_wood_agent", ticker, cw_analysis[ticker])
+        progress.update_status("cathie_wood_agent", ticker, "Done")
 
     message = HumanMessage(content=json.dumps(cw_analysis), name="cathie_wood_agent")
 
@@ -6,6 +6,7 @@ from pydantic import BaseModel
 import json
 from typing_extensions import Literal
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
 from src.utils.llm import call_llm
 
 class CharlieMungerSignal(BaseModel):
@@ -27,6 +28,7 @@ def charlie_munger_agent(state: AgentState):
     munger_analysis = {}
     
     for ticker in tickers:
+        check_cancelled()
         progress.update_status("charlie_munger_agent", ticker, "Fetching financial metrics")
         metrics = get_financial_metrics(ticker, end_date, period="annual", limit=10)  # Munger looks at longer periods
         
@@ -134,7 +136,8 @@ def charlie_munger_agent(state: AgentState):
             "reasoning": munger_output.reasoning
         }
         
-        progress.update_status("charlie_munger_agent", ticker, "Done", analysis=munger_output.reasoning)
+        progress.update_signal("charlie_munger_agent", ticker, munger_analysis[ticker])
+        progress.update_status("charlie_munger_agent", ticker, "Done")
     
     # Wrap results in a single message for the chain
     message = HumanMessage(
@@ -1,6 +1,7 @@
 from langchain_core.messages import HumanMessage
 from src.graph.state import AgentState, show_agent_reasoning
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
 import json
 
 from src.tools.api_router import get_financial_metrics
@@ -17,6 +18,7 @@ def fundamentals_analyst_agent(state: AgentState):
     fundamental_analysis = {}
 
     for ticker in tickers:
+        check_cancelled()
         progress.update_status("fundamentals_analyst_agent", ticker, "Fetching financial metrics")
 
         # Get the financial metrics
@@ -138,7 +140,8 @@ def fundamentals_analyst_agent(state: AgentState):
             "reasoning": reasoning,
         }
 
-        progress.update_status("fundamentals_analyst_agent", ticker, "Done", analysis=json.dumps(reasoning, indent=4))
+        progress.update_signal("fundamentals_analyst_agent", ticker, fundamental_analysis[ticker])
+        progress.update_status("fundamentals_analyst_agent", ticker, "Done")
 
     # Create the fundamental analysis message
     message = HumanMessage(
@@ -18,6 +18,7 @@ from src.tools.api_router import (
 )
 from src.utils.llm import call_llm
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
 
 __all__ = [
     "MichaelBurrySignal",
@@ -56,6 +57,7 @@ def michael_burry_agent(state: AgentState):  # noqa: C901  (complexity is fine h
     burry_analysis: dict[str, dict] = {}
 
     for ticker in tickers:
+        check_cancelled()
         # ------------------------------------------------------------------
         # Fetch raw data
         # ------------------------------------------------------------------
@@ -153,7 +155,8 @@ def michael_burry_agent(state: AgentState):  # noqa: C901  (complexity is fine h
             "reasoning": burry_output.reasoning,
         }
 
-        progress.update_status("michael_burry_agent", ticker, "Done", analysis=burry_output.reasoning)
+        progress.update_signal("michael_burry_agent", ticker, burry_analysis[ticker])
+        progress.update_status("michael_burry_agent", ticker, "Done")
 
     # ----------------------------------------------------------------------
     # Return to the graph
@@ -13,6 +13,7 @@ from pydantic import BaseModel
 import json
 from typing_extensions import Literal
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
 from src.utils.llm import call_llm
 
 
@@ -49,6 +50,7 @@ def peter_lynch_agent(state: AgentState):
     lynch_analysis = {}
 
     for ticker in tickers:
+        check_cancelled()
         progress.update_status("peter_lynch_agent", ticker, "Fetching financial metrics")
         metrics = get_financial_metrics(ticker, end_date, period="annual", limit=5)
 
@@ -85,7 +87,11 @@ def peter_lynch_agent(state: AgentState):
         company_news = get_company_news(ticker, end_date, start_date=None, limit=50)
 
         progress.update_status("peter_lynch_agent", ticker, "Fetching recent price data for reference")
-        prices = get_prices(ticker, start_date=start_date, end_date=end_date)
+        try:
+            prices = get_prices(ticker, start_date=start_date, end_date=end_date)
+        except Exception as e:
+            print(f"Error fetching prices for {ticker}: {e}")
+            prices = []
 
         # Perform sub-analyses:
         progress.update_status("peter_lynch_agent", ticker, "Analyzing growth")
@@ -149,7 +155,8 @@ def peter_lynch_agent(state: AgentState):
             "reasoning": lynch_output.reasoning,
         }
 
-        progress.update_status("peter_lynch_agent", ticker, "Done", analysis=lynch_output.reasoning)
+        progress.update_signal("peter_lynch_agent", ticker, lynch_analysis[ticker])
+        progress.update_status("peter_lynch_agent", ticker, "Done")
 
     # Wrap up results
     message = HumanMessage(content=json.dumps(lynch_analysis), name="peter_lynch_agent")
@@ -12,6 +12,7 @@ from pydantic import BaseModel
 import json
 from typing_extensions import Literal
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
 from src.utils.llm import call_llm
 import statistics
 
@@ -42,6 +43,7 @@ def phil_fisher_agent(state: AgentState):
     fisher_analysis = {}
 
     for ticker in tickers:
+        check_cancelled()
         progress.update_status("phil_fisher_agent", ticker, "Fetching financial metrics")
         metrics = get_financial_metrics(ticker, end_date, period="annual", limit=5)
 
@@ -152,7 +154,8 @@ def phil_fisher_agent(state: AgentState):
             "reasoning": fisher_output.reasoning,
         }
 
-        progress.update_status("phil_fisher_agent", ticker, "Done", analysis=fisher_output.reasoning)
+        progress.update_signal("phil_fisher_agent", ticker, fisher_analysis[ticker])
+        progress.update_status("phil_fisher_agent", ticker, "Done")
 
     # Wrap results in a single message
     message = HumanMessage(content=json.dumps(fisher_analysis), name="phil_fisher_agent")
@@ -1,4 +1,6 @@
+import contextvars
 import json
+from concurrent.futures import ThreadPoolExecutor
 from langchain_core.messages import HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
 
@@ -20,6 +22,20 @@ class PortfolioManagerOutput(BaseModel):
     decisions: dict[str, PortfolioDecision] = Field(description="Dictionary of ticker to trading decisions")
 
 
+# Ways of turning signals into orders: ask the LLM, or size them with allocate_deterministically
+ALLOCATION_MODES = ("llm", "deterministic")
+
+# Largest number of tickers decided by a single LLM call, and how many such calls run at once
+CHUNK_SIZE = 20
+MAX_CONCURRENT_CHUNKS = 4
+
+# Direction of each analyst signal in the net conviction
+SIGNAL_DIRECTIONS = {"bullish": 1, "neutral": 0, "bearish": -1}
+
+# Minimum net conviction (confidence-weighted signal balance, 0-1) before opening or adding to a position
+MIN_CONVICTION = 0.2
+
+
 ##### Portfolio Management Agent #####
 def portfolio_management_agent(state: AgentState):
     """Makes final trading decisions and generates orders for multiple tickers"""
@@ -58,15 +74,24 @@ def portfolio_management_agent(state: AgentState):
     progress.update_status("portfolio_manager", None, "Generating trading decisions")
 
     # Generate the trading decision
-    result = generate_trading_decision(
-        tickers=tickers,
-        signals_by_ticker=signals_by_ticker,
-        current_prices=current_prices,
-        max_shares=max_shares,
-        portfolio=portfolio,
-        model_name=state["metadata"]["model_name"],
-        model_provider=state["metadata"]["model_provider"],
-    )
+    if state["metadata"].get("allocation_mode", "llm") == "deterministic":
+        result = allocate_deterministically(
+            tickers=tickers,
+            signals_by_ticker=signals_by_ticker,
+            current_prices=current_prices,
+            max_shares=max_shares,
+            portfolio=portfolio,
+        )
+    else:
+        result = generate_trading_decision(
+            tickers=tickers,
+            signals_by_ticker=signals_by_ticker,
+            current_prices=current_prices,
+            max_shares=max_shares,
+            portfolio=portfolio,
+            model_name=state["metadata"]["model_name"],
+            model_provider=state["metadata"]["model_provider"],
+        )
 
     # Create the portfolio management message
     message = HumanMessage(
@@ -94,6 +119,69 @@ def generate_trading_decision(
     portfolio: dict[str, float],
     model_name: str,
     model_provider: str,
+) -> PortfolioManagerOutput:
+    """
+    Get the trading decisions from the LLM. Universes larger than CHUNK_SIZE are split
+    into chunks that are prompted concurrently; each chunk receives a share of the
+    cash in proportion to what its tickers could buy (with max_shares clamped to that
+    share) and only sees the margin in use by its own positions. Since the chunks cannot
+    see each other's orders, each chunk's orders are then limited to its cash share in
+    one pass (see limit_to_cash), so together they never spend more than the portfolio's
+    cash. A chunk whose call fails
+    falls back on its own without affecting the decisions of the other chunks.
+    """
+    if len(tickers) <= CHUNK_SIZE:
+        return generate_chunk_decision(tickers, signals_by_ticker, current_prices, max_shares, portfolio, model_name, model_provider)
+
+    chunks = [tickers[i : i + CHUNK_SIZE] for i in range(0, len(tickers), CHUNK_SIZE)]
+    cash = portfolio.get("cash", 0.0)
+    demands = [sum(max_shares.get(ticker, 0) * current_prices.get(ticker, 0) for ticker in chunk) for chunk in chunks]
+    total_demand = sum(demands)
+
+    def run_chunk(chunk: list[str], demand: float) -> PortfolioManagerOutput:
+        chunk_cash = cash * demand / total_demand if total_demand > 0 else cash / len(chunks)
+        chunk_max_shares = {ticker: min(max_shares.get(ticker, 0), int(chunk_cash / current_prices[ticker])) if current_prices.get(ticker, 0) > 0 else 0 for ticker in chunk}
+        chunk_positions = {ticker: position for ticker, position in portfolio.get("positions", {}).items() if ticker in chunk}
+        chunk_portfolio = {
+            **portfolio,
+            "cash": chunk_cash,
+            "positions": chunk_positions,
+            "margin_used": sum(position.get("short_margin_used", 0.0) for position in chunk_positions.values()),
+        }
+        chunk_prices = {ticker: current_prices.get(ticker, 0) for ticker in chunk}
+        result = generate_chunk_decision(
+            chunk,
+            {ticker: signals_by_ticker.get(ticker, {}) for ticker in chunk},
+            chunk_prices,
+            chunk_max_shares,
+            chunk_portfolio,
+            model_name,
+            model_provider,
+        )
+        return limit_to_cash(result, chunk_prices, chunk_positions, chunk_cash, portfolio.get("margin_requirement", 0.0))
+
+    progress.update_status("portfolio_manager", None, f"Generating trading decisions in {len(chunks)} chunks")
+    decisions = {}
+    with ThreadPoolExecutor(max_workers=min(len(chunks), MAX_CONCURRENT_CHUNKS)) as executor:
+        # Each chunk runs in a copy of this context, so its progress updates stay on the run's channel
+        futures = [executor.submit(contextvars.copy_context().run, run_chunk, chunk, demand) for chunk, demand in zip(chunks, demands)]
+        for chunk, result in zip(chunks, (future.result() for future in futures)):
+            decisions.update({ticker: decision for ticker, decision in result.decisions.items() if ticker in chunk})
+
+    # Hold any ticker the LLM left out
+    return PortfolioManagerOutput(
+        decisions={ticker: decisions.get(ticker) or PortfolioDecision(action="hold", quantity=0, confidence=0.0, reasoning="No decision returned, defaulting to hold") for ticker in tickers}
+    )
+
+
+def generate_chunk_decision(
+    tickers: list[str],
+    signals_by_ticker: dict[str, dict],
+    current_prices: dict[str, float],
+    max_shares: dict[str, int],
+    portfolio: dict[str, float],
+    model_name: str,
+    model_provider: str,
 ) -> PortfolioManagerOutput:
     """Attempts to get a decision from the LLM with retry logic"""
     # Create the prompt template
@@ -188,8 +276,128 @@ def generate_trading_decision(
         }
     )
 
-    # Create default factory for PortfolioManagerOutput
+    # Fall back to the deterministic allocation if the LLM keeps failing
     def create_default_portfolio_output():
-        return PortfolioManagerOutput(decisions={ticker: PortfolioDecision(action="hold", quantity=0, confidence=0.0, reasoning="Error in portfolio management, defaulting to hold") for ticker in tickers})
+        return allocate_deterministically(tickers, signals_by_ticker, current_prices, max_shares, portfolio)
 
     return call_llm(prompt=prompt, model_name=model_name, model_provider=model_provider, pydantic_model=PortfolioManagerOutput, agent_name="portfolio_manager", default_factory=create_default_portfolio_output)
+
+
+def limit_to_cash(result: PortfolioManagerOutput, current_prices: dict[str, float], positions: dict[str, dict], cash: float, margin_requirement: float) -> PortfolioManagerOutput:
+    """
+    Reduce the orders so that together they stay within cash, spending one budget the way
+    allocate_deterministically does: sells first (adding their proceeds), then the other
+    orders in order, each reduced to what the remaining budget can pay for.
+    """
+    short_collateral = _short_collateral(margin_requirement)
+    available_cash = cash
+    for ticker, decision in sorted(result.decisions.items(), key=lambda item: item[1].action != "sell"):
+        price = current_prices.get(ticker, 0)
+        if decision.action == "hold" or price <= 0:
+            continue
+        cash_per_share = _cash_per_share(decision.action, price, positions.get(ticker, {}), short_collateral)
+        quantity = _affordable_quantity(decision.quantity, cash_per_share, available_cash)
+        available_cash -= quantity * cash_per_share
+        if quantity < decision.quantity:
+            result.decisions[ticker] = decision.model_copy(update={"action": decision.action if quantity > 0 else "hold", "quantity": quantity, "reasoning": f"{decision.reasoning} (reduced to the available cash)"})
+    return result
+
+
+def signal_conviction(signals: list[dict]) -> float:
+    """Confidence-weighted balance of bullish and bearish signals, between -1 and 1 (0 without signals)."""
+    if not signals:
+        return 0.0
+    weighted = sum(SIGNAL_DIRECTIONS.get(signal["signal"], 0) * (signal.get("confidence") or 0) for signal in signals)
+    return max(-1.0, min(1.0, weighted / (100 * len(signals))))
+
+
+def allocate_deterministically(
+    tickers: list[str],
+    signals_by_ticker: dict[str, dict],
+    current_prices: dict[str, float],
+    max_shares: dict[str, int],
+    portfolio: dict[str, float],
+) -> PortfolioManagerOutput:
+    """
+    Turn the analyst signals into orders without an LLM.
+
+    Each ticker's conviction is the confidence-weighted balance of bullish and bearish
+    signals (between -1 and 1). Bullish tickers first cover any short and otherwise buy,
+    bearish tickers first sell any long and otherwise short. Covers and sells exit
+    conviction x the position (the whole position at full conviction), buys and shorts
+    are sized as conviction x max_shares. Sells are filled first and add their proceeds
+    to one shared cash budget, then the other tickers in order of conviction, each
+    reduced to what the remaining budget can pay for (see _cash_per_share), so buys,
+    covers and short margin never exceed the available cash.
+    """
+    positions = portfolio.get("positions", {})
+    short_collateral = _short_collateral(portfolio.get("margin_requirement", 0.0))
+    available_cash = portfolio.get("cash", 0.0)
+
+    convictions = {ticker: signal_conviction(list(signals_by_ticker.get(ticker, {}).values())) for ticker in tickers}
+
+    decisions = {}
+    sells_long = {ticker for ticker in tickers if convictions[ticker] < 0 and positions.get(ticker, {}).get("long", 0) > 0}
+    for ticker in sorted(tickers, key=lambda ticker: (ticker not in sells_long, -abs(convictions[ticker]))):
+        conviction = convictions[ticker]
+        price = current_prices.get(ticker, 0)
+        position = positions.get(ticker, {})
+        reasoning = f"Deterministic allocation: net conviction {conviction:+.2f} from {len(signals_by_ticker.get(ticker, {}))} analyst signals"
+
+        action, quantity = "hold", 0
+        if price > 0 and abs(conviction) >= MIN_CONVICTION:
+            target = int(max_shares.get(ticker, 0) * abs(conviction))
+            if conviction > 0 and position.get("short", 0) > 0:
+                action, quantity = "cover", _exit_quantity(position["short"], conviction)
+            elif conviction > 0:
+                action, quantity = "buy", target
+            elif position.get("long", 0) > 0:
+                action, quantity = "sell", _exit_quantity(position["long"], conviction)
+            else:
+                action, quantity = "short", target
+
+            cash_per_share = _cash_per_share(action, price, position, short_collateral)
+            quantity = _affordable_quantity(quantity, cash_per_share, available_cash)
+            available_cash -= quantity * cash_per_share
+
+        if quantity <= 0:
+            action, quantity = "hold", 0
+        decisions[ticker] = PortfolioDecision(action=action, quantity=quantity, confidence=abs(conviction) * 100, reasoning=reasoning)
+
+    # Report the decisions in the original ticker order
+    return PortfolioManagerOutput(decisions={ticker: decisions[ticker] for ticker in tickers})
+
+
+def _exit_quantity(position_shares: int, conviction: float) -> int:
+    """Shares of a position to exit at the given conviction (at least one share)."""
+    return min(position_shares, max(1, int(position_shares * abs(conviction))))
+
+
+def _short_collateral(margin_requirement: float) -> float:
+    """Cash set aside per currency unit shorted; without a margin requirement, shorts are collateralized in full."""
+    return margin_requirement if margin_requirement > 0 else 1.0
+
+
+def _cash_per_share(action: str, price: float, position: dict, short_collateral: float) -> float:
+    """
+    Cash an order takes per share: the price of a buy, the collateral of a short, and for
+    a cover the buy-back less its share of the margin the short holds. Negative for the
+    proceeds of a sell (and of a cover that releases more margin than it costs).
+    """
+    if action == "buy":
+        return price
+    if action == "sell":
+        return -price
+    if action == "short":
+        return price * short_collateral
+    if action == "cover":
+        short = position.get("short", 0)
+        return price - (position.get("short_margin_used", 0.0) / short if short > 0 else 0.0)
+    return 0.0
+
+
+def _affordable_quantity(quantity: int, cash_per_share: float, available_cash: float) -> int:
+    """The quantity reduced to what available_cash can pay for."""
+    if cash_per_share <= 0:
+        return quantity
+    return min(quantity, int(max(available_cash, 0) / cash_per_share))
@@ -7,6 +7,7 @@ from typing_extensions import Literal
 from src.tools.api_router import get_financial_metrics, get_market_cap, search_line_items
 from src.utils.llm import call_llm
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
 
 class RakeshJhunjhunwalaSignal(BaseModel):
     signal: Literal["bullish", "bearish", "neutral"]
@@ -24,6 +25,7 @@ def rakesh_jhunjhunwala_agent(state: AgentState):
     jhunjhunwala_analysis = {}
 
     for ticker in tickers:
+        check_cancelled()
 
         # Core Data
         progress.update_status("rakesh_jhunjhunwala_agent", ticker, "Fetching financial metrics")
@@ -143,7 +145,8 @@ def rakesh_jhunjhunwala_agent(state: AgentState):
 
         jhunjhunwala_analysis[ticker] = jhunjhunwala_output.model_dump()
 
-        progress.update_status("rakesh_jhunjhunwala_agent", ticker, "Done", analysis=jhunjhunwala_output.reasoning)
+        progress.update_signal("rakesh_jhunjhunwala_agent", ticker, jhunjhunwala_analysis[ticker])
+        progress.update_status("rakesh_jhunjhunwala_agent", ticker, "Done")
 
     # ─── Push message back to graph state ──────────────────────────────────────
     message = HumanMessage(content=json.dumps(jhunjhunwala_analysis), name="rakesh_jhunjhunwala_agent")
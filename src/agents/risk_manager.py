@@ -1,63 +1,80 @@
 from langchain_core.messages import HumanMessage
 from src.graph.state import AgentState, show_agent_reasoning
 from src.utils.progress import progress
-from src.tools.api_router import get_prices, prices_to_df
+from src.utils.cancellation import check_cancelled
+from src.tools.api_router import get_last_price
+from src.utils.risk_model import MAX_POSITION_WEIGHT, estimate_covariance, risk_based_limits
 import json
+import numpy as np
 
 
 ##### Risk Management Agent #####
 def risk_management_agent(state: AgentState):
-    """Controls position sizing based on real-world risk factors for multiple tickers."""
+    """
+    Controls position sizing based on real-world risk factors for multiple tickers.
+    Position limits follow the volatility and correlation of the universe (see
+    src/utils/risk_model.py), falling back to a flat 20% of NAV without enough history.
+    """
     portfolio = state["data"]["portfolio"]
     data = state["data"]
     tickers = data["tickers"]
 
     # Initialize risk analysis for each ticker
     risk_analysis = {}
-    current_prices = {}  # Store prices here to avoid redundant API calls
-
-    # First, fetch prices for all relevant tickers
-    all_tickers = set(tickers) | set(portfolio.get("positions", {}).keys())
-    
-    for ticker in all_tickers:
-        progress.update_status("risk_management_agent", ticker, "Fetching price data")
-        
-        prices = get_prices(
-            ticker=ticker,
-            start_date=data["start_date"],
-            end_date=data["end_date"],
-        )
-
-        if not prices:
+    positions = portfolio.get("positions", {})
+    cash = float(portfolio.get("cash", 0.0))
+
+    # First, look up the latest close of every relevant ticker (no full price history needed)
+    all_tickers = list(dict.fromkeys(list(tickers) + list(positions.keys())))
+    current_prices = np.full(len(all_tickers), np.nan)
+
+    for idx, ticker in enumerate(all_tickers):
+        check_cancelled()
+        progress.update_status("risk_management_agent", ticker, "Fetching latest price")
+
+        try:
+            current_price = get_last_price(ticker, data["end_date"])
+        except Exception as e:
+            print(f"Error fetching prices for {ticker}: {e}")
+            current_price = None
+        if current_price is None:
             progress.update_status("risk_management_agent", ticker, "Warning: No price data found")
             continue
 
-        prices_df = prices_to_df(prices)
-        
-        if not prices_df.empty:
-            current_price = prices_df["close"].iloc[-1]
-            current_prices[ticker] = current_price
-            progress.update_status("risk_management_agent", ticker, f"Current price: {current_price}")
-        else:
-            progress.update_status("risk_management_agent", ticker, "Warning: Empty price data")
+        current_prices[idx] = current_price
+        progress.update_status("risk_management_agent", ticker, f"Current price: {current_price}")
+
+    # Net shares per ticker (long - short), aligned with all_tickers
+    long_shares = np.array([positions.get(ticker, {}).get("long", 0) for ticker in all_tickers], dtype=float)
+    short_shares = np.array([positions.get(ticker, {}).get("short", 0) for ticker in all_tickers], dtype=float)
+    has_price = ~np.isnan(current_prices)
+    net_values = np.where(has_price, (long_shares - short_shares) * np.nan_to_num(current_prices), 0.0)
 
     # Calculate total portfolio value based on current market prices (Net Liquidation Value)
-    total_portfolio_value = portfolio.get("cash", 0.0)
-    
-    for ticker, position in portfolio.get("positions", {}).items():
-        if ticker in current_prices:
-            # Add market value of long positions
-            total_portfolio_value += position.get("long", 0) * current_prices[ticker]
-            # Subtract market value of short positions
-            total_portfolio_value -= position.get("short", 0) * current_prices[ticker]
-    
+    total_portfolio_value = cash + net_values.sum()
+
     progress.update_status("risk_management_agent", None, f"Total portfolio value: {total_portfolio_value}")
 
-    # Calculate risk limits for each ticker in the universe
-    for ticker in tickers:
-        progress.update_status("risk_management_agent", ticker, "Calculating position limits")
-        
-        if ticker not in current_prices:
+    # Size limits from the rolling covariance of the universe's returns
+    progress.update_status("risk_management_agent", None, "Estimating covariance")
+    estimate = estimate_covariance(all_tickers, data["end_date"])
+    flat_limit = total_portfolio_value * MAX_POSITION_WEIGHT
+    if estimate is not None:
+        covariance, shrinkage = estimate
+        risk = risk_based_limits(covariance, total_portfolio_value, net_values)
+        # Tickers without return history keep the flat limit
+        position_limits = np.where(risk["volatility"] > 0, risk["position_limits"], flat_limit)
+    else:
+        risk, shrinkage = None, None
+        position_limits = np.full(len(all_tickers), flat_limit)
+
+    # Calculate risk limits for every ticker at once
+    current_position_values = np.abs(net_values)  # Use absolute exposure
+    remaining_position_limits = position_limits - current_position_values
+    max_position_sizes = np.minimum(remaining_position_limits, cash)  # Ensure we don't exceed available cash
+
+    for idx, ticker in enumerate(all_tickers[: len(dict.fromkeys(tickers))]):
+        if not has_price[idx]:
             progress.update_status("risk_management_agent", ticker, "Failed: No price data available")
             risk_analysis[ticker] = {
                 "remaining_position_limit": 0.0,
@@ -67,36 +84,29 @@ def risk_management_agent(state: AgentState):
                 }
             }
             continue
-            
-        current_price = current_prices[ticker]
-        
-        # Calculate current market value of this position
-        position = portfolio.get("positions", {}).get(ticker, {})
-        long_value = position.get("long", 0) * current_price
-        short_value = position.get("short", 0) * current_price
-        current_position_value = abs(long_value - short_value)  # Use absolute exposure
-        
-        # Calculate position limit (20% of total portfolio)
-        position_limit = total_portfolio_value * 0.20
-        
-        # Calculate remaining limit for this position
-        remaining_position_limit = position_limit - current_position_value
-        
-        # Ensure we don't exceed available cash
-        max_position_size = min(remaining_position_limit, portfolio.get("cash", 0))
-        
+
         risk_analysis[ticker] = {
-            "remaining_position_limit": float(max_position_size),
-            "current_price": float(current_price),
+            "remaining_position_limit": float(max_position_sizes[idx]),
+            "current_price": float(current_prices[idx]),
             "reasoning": {
                 "portfolio_value": float(total_portfolio_value),
-                "current_position_value": float(current_position_value),
-                "position_limit": float(position_limit),
-                "remaining_limit": float(remaining_position_limit),
-                "available_cash": float(portfolio.get("cash", 0)),
+                "current_position_value": float(current_position_values[idx]),
+                "position_limit": float(position_limits[idx]),
+                "remaining_limit": float(remaining_position_limits[idx]),
+                "available_cash": cash,
             },
         }
-        
+        if risk is not None:
+            risk_analysis[ticker]["reasoning"].update(
+                {
+                    "annualized_volatility": float(risk["volatility"][idx]),
+                    "marginal_risk_contribution": float(risk["marginal_contribution"][idx]),
+                    "portfolio_volatility": float(risk["portfolio_volatility"]),
+                    "covariance_shrinkage": shrinkage,
+                }
+            )
+
+        progress.update_signal("risk_management_agent", ticker, risk_analysis[ticker])
         progress.update_status("risk_management_agent", ticker, "Done")
 
     message = HumanMessage(
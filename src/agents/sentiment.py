@@ -1,6 +1,7 @@
 from langchain_core.messages import HumanMessage
 from src.graph.state import AgentState, show_agent_reasoning
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
 import pandas as pd
 import numpy as np
 import json
@@ -19,6 +20,7 @@ def sentiment_analyst_agent(state: AgentState):
     sentiment_analysis = {}
 
     for ticker in tickers:
+        check_cancelled()
         progress.update_status("sentiment_analyst_agent", ticker, "Fetching insider trades")
 
         # Get the insider trades
@@ -79,7 +81,8 @@ def sentiment_analyst_agent(state: AgentState):
             "reasoning": reasoning,
         }
 
-        progress.update_status("sentiment_analyst_agent", ticker, "Done", analysis=json.dumps(reasoning, indent=4))
+        progress.update_signal("sentiment_analyst_agent", ticker, sentiment_analysis[ticker])
+        progress.update_status("sentiment_analyst_agent", ticker, "Done")
 
     # Create the sentiment message
     message = HumanMessage(
@@ -8,8 +8,25 @@ import json
 import pandas as pd
 import numpy as np
 
-from src.tools.api_router import get_prices, prices_to_df
+from src.tools.bars import get_bars
+from src.utils.indicators import (
+    adx,
+    build_price_panel,
+    ema,
+    hurst_exponent,
+    pct_change,
+    rolling_kurt_last,
+    rolling_mean_last,
+    rolling_skew_last,
+    rolling_std_last,
+    rolling_sum_last,
+    rolling_tail,
+    rsi_last,
+    true_range,
+)
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
+from src.utils.technical_state import TechnicalState, get_state_dir, load_technical_state, save_technical_state
 
 
 def safe_float(value, default=0.0):
@@ -31,6 +48,16 @@ def safe_float(value, default=0.0):
         return default
 
 
+# Weights of the strategies in the combined signal
+STRATEGY_WEIGHTS = {
+    "trend": 0.25,
+    "mean_reversion": 0.20,
+    "momentum": 0.25,
+    "volatility": 0.15,
+    "stat_arb": 0.15,
+}
+
+
 ##### Technical Analyst #####
 def technical_analyst_agent(state: AgentState):
     """
@@ -49,92 +76,61 @@ def technical_analyst_agent(state: AgentState):
     # Initialize analysis for each ticker
     technical_analysis = {}
 
+    # Tickers with a persisted online state of the same window start only ingest the bars
+    # added since its checkpoint (giving the batch signals of the window); the others
+    # collect their price history for one batch computation
+    persist_state = get_state_dir() is not None
+    strategy_signals = {}
+    price_frames = {}
     for ticker in tickers:
+        check_cancelled()
         progress.update_status("technical_analyst_agent", ticker, "Analyzing price data")
 
-        # Get the historical price data
-        prices = get_prices(
-            ticker=ticker,
-            start_date=start_date,
-            end_date=end_date,
-        )
-
-        if not prices:
-            progress.update_status("technical_analyst_agent", ticker, "Failed: No price data found")
+        online_state = load_technical_state(ticker)
+        if online_state is not None and online_state.matches(start_date, end_date):
+            if online_state.last_date < end_date:
+                new_start = (pd.Timestamp(online_state.last_date) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+                try:
+                    new_bars = get_bars(ticker, new_start, end_date)
+                except Exception as e:
+                    print(f"Error fetching prices for {ticker}: {e}")
+                    new_bars = pd.DataFrame()
+                if not new_bars.empty:
+                    online_state.update_from_frame(new_bars)
+                    save_technical_state(ticker, online_state)
+            strategy_signals[ticker] = calculate_online_signals(online_state)
             continue
 
-        # Convert prices to a DataFrame
-        prices_df = prices_to_df(prices)
-
-        progress.update_status("technical_analyst_agent", ticker, "Calculating trend signals")
-        trend_signals = calculate_trend_signals(prices_df)
-
-        progress.update_status("technical_analyst_agent", ticker, "Calculating mean reversion")
-        mean_reversion_signals = calculate_mean_reversion_signals(prices_df)
+        # Get the historical price data (a slice of the cached daily bars when a
+        # previous window already covered it)
+        try:
+            prices_df = get_bars(ticker, start_date, end_date)
+        except Exception as e:
+            print(f"Error fetching prices for {ticker}: {e}")
+            prices_df = pd.DataFrame()
 
-        progress.update_status("technical_analyst_agent", ticker, "Calculating momentum")
-        momentum_signals = calculate_momentum_signals(prices_df)
+        if prices_df.empty:
+            progress.update_status("technical_analyst_agent", ticker, "Failed: No price data found")
+            continue
 
-        progress.update_status("technical_analyst_agent", ticker, "Analyzing volatility")
-        volatility_signals = calculate_volatility_signals(prices_df)
+        price_frames[ticker] = prices_df
 
-        progress.update_status("technical_analyst_agent", ticker, "Statistical analysis")
-        stat_arb_signals = calculate_stat_arb_signals(prices_df)
+        # Seed the online state of this window, replacing a state of another window
+        if persist_state:
+            online_state = TechnicalState(start_date)
+            online_state.update_from_frame(price_frames[ticker])
+            save_technical_state(ticker, online_state)
 
-        # Combine all signals using a weighted ensemble approach
-        strategy_weights = {
-            "trend": 0.25,
-            "mean_reversion": 0.20,
-            "momentum": 0.25,
-            "volatility": 0.15,
-            "stat_arb": 0.15,
-        }
+    progress.update_status("technical_analyst_agent", None, "Calculating indicators")
+    strategy_signals.update(calculate_batch_signals(price_frames))
 
+    for ticker, signals in strategy_signals.items():
         progress.update_status("technical_analyst_agent", ticker, "Combining signals")
-        combined_signal = weighted_signal_combination(
-            {
-                "trend": trend_signals,
-                "mean_reversion": mean_reversion_signals,
-                "momentum": momentum_signals,
-                "volatility": volatility_signals,
-                "stat_arb": stat_arb_signals,
-            },
-            strategy_weights,
-        )
 
         # Generate detailed analysis report for this ticker
-        technical_analysis[ticker] = {
-            "signal": combined_signal["signal"],
-            "confidence": round(combined_signal["confidence"] * 100),
-            "strategy_signals": {
-                "trend_following": {
-                    "signal": trend_signals["signal"],
-                    "confidence": round(trend_signals["confidence"] * 100),
-                    "metrics": normalize_pandas(trend_signals["metrics"]),
-                },
-                "mean_reversion": {
-                    "signal": mean_reversion_signals["signal"],
-                    "confidence": round(mean_reversion_signals["confidence"] * 100),
-                    "metrics": normalize_pandas(mean_reversion_signals["metrics"]),
-                },
-                "momentum": {
-                    "signal": momentum_signals["signal"],
-                    "confidence": round(momentum_signals["confidence"] * 100),
-                    "metrics": normalize_pandas(momentum_signals["metrics"]),
-                },
-                "volatility": {
-                    "signal": volatility_signals["signal"],
-                    "confidence": round(volatility_signals["confidence"] * 100),
-                    "metrics": normalize_pandas(volatility_signals["metrics"]),
-                },
-                "statistical_arbitrage": {
-                    "signal": stat_arb_signals["signal"],
-                    "confidence": round(stat_arb_signals["confidence"] * 100),
-                    "metrics": normalize_pandas(stat_arb_signals["metrics"]),
-                },
-            },
-        }
-        progress.update_status("technical_analyst_agent", ticker, "Done", analysis=json.dumps(technical_analysis, indent=4))
+        technical_analysis[ticker] = build_technical_report(signals)
+        progress.update_signal("technical_analyst_agent", ticker, technical_analysis[ticker])
+        progress.update_status("technical_analyst_agent", ticker, "Done")
 
     # Create the technical analyst message
     message = HumanMessage(
@@ -156,29 +152,126 @@ def technical_analyst_agent(state: AgentState):
     }
 
 
-def calculate_trend_signals(prices_df):
+def build_technical_report(signals: dict) -> dict:
     """
-    Advanced trend following strategy using multiple timeframes and indicators
+    Combine the strategy signals of one ticker (keyed like STRATEGY_WEIGHTS) using a
+    weighted ensemble approach and build its analysis report.
     """
-    # Calculate EMAs for multiple timeframes
-    ema_8 = calculate_ema(prices_df, 8)
-    ema_21 = calculate_ema(prices_df, 21)
-    ema_55 = calculate_ema(prices_df, 55)
+    combined_signal = weighted_signal_combination(signals, STRATEGY_WEIGHTS)
+    report_names = {
+        "trend": "trend_following",
+        "mean_reversion": "mean_reversion",
+        "momentum": "momentum",
+        "volatility": "volatility",
+        "stat_arb": "statistical_arbitrage",
+    }
+    return {
+        "signal": combined_signal["signal"],
+        "confidence": round(combined_signal["confidence"] * 100),
+        "strategy_signals": {
+            report_name: {
+                "signal": signals[strategy]["signal"],
+                "confidence": round(signals[strategy]["confidence"] * 100),
+                "metrics": normalize_pandas(signals[strategy]["metrics"]),
+            }
+            for strategy, report_name in report_names.items()
+        },
+    }
 
-    # Calculate ADX for trend strength
-    adx = calculate_adx(prices_df, 14)
 
+def calculate_batch_signals(price_frames: dict[str, pd.DataFrame]) -> dict[str, dict]:
+    """
+    Compute the strategy signals of every ticker in one vectorized pass over a
+    bars x tickers panel. Produces the same signals as the per-DataFrame
+    calculate_*_signals functions.
+    """
+    if not price_frames:
+        return {}
+
+    panel = build_price_panel(price_frames)
+    close, high, low, volume = panel["close"], panel["high"], panel["low"], panel["volume"]
+    returns = pct_change(close)
+    # Shared by ADX and ATR
+    tr = true_range(high, low, close)
+
+    # Trend following
+    ema_8 = ema(close, 8)[-1]
+    ema_21 = ema(close, 21)[-1]
+    ema_55 = ema(close, 55)[-1]
+    adx_last = adx(high, low, close, 14, tr=tr)[0][-1]
+
+    # Mean reversion
+    close_last = close[-1]
+    ma_50 = rolling_mean_last(close, 50)
+    std_50 = rolling_std_last(close, 50)
+    sma_20 = rolling_mean_last(close, 20)
+    std_20 = rolling_std_last(close, 20)
+    bb_upper = sma_20 + (std_20 * 2)
+    bb_lower = sma_20 - (std_20 * 2)
+    rsi_14 = rsi_last(close, 14)
+    rsi_28 = rsi_last(close, 28)
+
+    # Momentum
+    mom_1m = rolling_sum_last(returns, 21)
+    mom_3m = rolling_sum_last(returns, 63)
+    mom_6m = rolling_sum_last(returns, 126)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_momentum = volume[-1] / rolling_mean_last(volume, 21)
+
+    # Volatility: the last 63 values of the 21-day historical volatility
+    hist_vol = rolling_tail(returns, 21, 63).std(axis=-1, ddof=1) * math.sqrt(252)
+    vol_ma = hist_vol.mean(axis=0)
+    vol_std = hist_vol.std(axis=0, ddof=1)
+    atr_ratio = rolling_mean_last(tr, 14) / close_last
+
+    # Statistical arbitrage
+    skew = rolling_skew_last(returns, 63)
+    kurt = rolling_kurt_last(returns, 63)
+    hurst = hurst_exponent(close)
+
+    signals = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for column, ticker in enumerate(price_frames):
+            signals[ticker] = {
+                "trend": trend_signal(ema_8[column], ema_21[column], ema_55[column], adx_last[column]),
+                "mean_reversion": mean_reversion_signal(close_last[column], ma_50[column], std_50[column], bb_upper[column], bb_lower[column], rsi_14[column], rsi_28[column]),
+                "momentum": momentum_signal(mom_1m[column], mom_3m[column], mom_6m[column], volume_momentum[column]),
+                "volatility": volatility_signal(hist_vol[-1, column], vol_ma[column], vol_std[column], atr_ratio[column]),
+                "stat_arb": stat_arb_signal(hurst[column], skew[column], kurt[column]),
+            }
+    return signals
+
+
+def calculate_online_signals(online_state: TechnicalState) -> dict:
+    """
+    Strategy signals from the latest values of an online indicator state. Equal to
+    calculate_batch_signals over the history the state has ingested.
+    """
+    # NumPy scalars, so divisions by zero give inf/NaN as in the batch path
+    values = {name: np.float64(value) for name, value in online_state.indicators().items()}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "trend": trend_signal(values["ema_8"], values["ema_21"], values["ema_55"], values["adx"]),
+            "mean_reversion": mean_reversion_signal(values["close"], values["ma_50"], values["std_50"], values["bb_upper"], values["bb_lower"], values["rsi_14"], values["rsi_28"]),
+            "momentum": momentum_signal(values["mom_1m"], values["mom_3m"], values["mom_6m"], values["volume_momentum"]),
+            "volatility": volatility_signal(values["hist_vol"], values["vol_ma"], values["vol_std"], values["atr_ratio"]),
+            "stat_arb": stat_arb_signal(values["hurst"], values["skew"], values["kurt"]),
+        }
+
+
+def trend_signal(ema_8, ema_21, ema_55, adx_value):
+    """Trend signal from the latest EMA 8/21/55 values and ADX."""
     # Determine trend direction and strength
     short_trend = ema_8 > ema_21
     medium_trend = ema_21 > ema_55
 
     # Combine signals with confidence weighting
-    trend_strength = adx["adx"].iloc[-1] / 100.0
+    trend_strength = adx_value / 100.0
 
-    if short_trend.iloc[-1] and medium_trend.iloc[-1]:
+    if short_trend and medium_trend:
         signal = "bullish"
         confidence = trend_strength
-    elif not short_trend.iloc[-1] and not medium_trend.iloc[-1]:
+    elif not short_trend and not medium_trend:
         signal = "bearish"
         confidence = trend_strength
     else:
@@ -189,38 +282,24 @@ def calculate_trend_signals(prices_df):
         "signal": signal,
         "confidence": confidence,
         "metrics": {
-            "adx": safe_float(adx["adx"].iloc[-1]),
+            "adx": safe_float(adx_value),
             "trend_strength": safe_float(trend_strength),
         },
     }
 
 
-def calculate_mean_reversion_signals(prices_df):
-    """
-    Mean reversion strategy using statistical measures and Bollinger Bands
-    """
-    # Calculate z-score of price relative to moving average
-    ma_50 = prices_df["close"].rolling(window=50).mean()
-    std_50 = prices_df["close"].rolling(window=50).std()
-    z_score = (prices_df["close"] - ma_50) / std_50
-
-    # Calculate Bollinger Bands
-    bb_upper, bb_lower = calculate_bollinger_bands(prices_df)
-
-    # Calculate RSI with multiple timeframes
-    rsi_14 = calculate_rsi(prices_df, 14)
-    rsi_28 = calculate_rsi(prices_df, 28)
-
-    # Mean reversion signals
-    price_vs_bb = (prices_df["close"].iloc[-1] - bb_lower.iloc[-1]) / (bb_upper.iloc[-1] - bb_lower.iloc[-1])
+def mean_reversion_signal(close, ma_50, std_50, bb_upper, bb_lower, rsi_14, rsi_28):
+    """Mean reversion signal from the latest close, 50-day mean/std, Bollinger Bands and RSI."""
+    z_score = (close - ma_50) / std_50
+    price_vs_bb = (close - bb_lower) / (bb_upper - bb_lower)
 
     # Combine signals
-    if z_score.iloc[-1] < -2 and price_vs_bb < 0.2:
+    if z_score < -2 and price_vs_bb < 0.2:
         signal = "bullish"
-        confidence = min(abs(z_score.iloc[-1]) / 4, 1.0)
-    elif z_score.iloc[-1] > 2 and price_vs_bb > 0.8:
+        confidence = min(abs(z_score) / 4, 1.0)
+    elif z_score > 2 and price_vs_bb > 0.8:
         signal = "bearish"
-        confidence = min(abs(z_score.iloc[-1]) / 4, 1.0)
+        confidence = min(abs(z_score) / 4, 1.0)
     else:
         signal = "neutral"
         confidence = 0.5
@@ -229,36 +308,21 @@ def calculate_mean_reversion_signals(prices_df):
         "signal": signal,
         "confidence": confidence,
         "metrics": {
-            "z_score": safe_float(z_score.iloc[-1]),
+            "z_score": safe_float(z_score),
             "price_vs_bb": safe_float(price_vs_bb),
-            "rsi_14": safe_float(rsi_14.iloc[-1]),
-            "rsi_28": safe_float(rsi_28.iloc[-1]),
+            "rsi_14": safe_float(rsi_14),
+            "rsi_28": safe_float(rsi_28),
         },
     }
 
 
-def calculate_momentum_signals(prices_df):
-    """
-    Multi-factor momentum strategy
-    """
-    # Price momentum
-    returns = prices_df["close"].pct_change()
-    mom_1m = returns.rolling(21).sum()
-    mom_3m = returns.rolling(63).sum()
-    mom_6m = returns.rolling(126).sum()
-
-    # Volume momentum
-    volume_ma = prices_df["volume"].rolling(21).mean()
-    volume_momentum = prices_df["volume"] / volume_ma
-
-    # Relative strength
-    # (would compare to market/sector in real implementation)
-
+def momentum_signal(mom_1m, mom_3m, mom_6m, volume_momentum):
+    """Momentum signal from the latest 1/3/6-month return sums and volume momentum."""
     # Calculate momentum score
-    momentum_score = (0.4 * mom_1m + 0.3 * mom_3m + 0.3 * mom_6m).iloc[-1]
+    momentum_score = 0.4 * mom_1m + 0.3 * mom_3m + 0.3 * mom_6m
 
     # Volume confirmation
-    volume_confirmation = volume_momentum.iloc[-1] > 1.0
+    volume_confirmation = volume_momentum > 1.0
 
     if momentum_score > 0.05 and volume_confirmation:
         signal = "bullish"
@@ -274,38 +338,19 @@ def calculate_momentum_signals(prices_df):
         "signal": signal,
         "confidence": confidence,
         "metrics": {
-            "momentum_1m": safe_float(mom_1m.iloc[-1]),
-            "momentum_3m": safe_float(mom_3m.iloc[-1]),
-            "momentum_6m": safe_float(mom_6m.iloc[-1]),
-            "volume_momentum": safe_float(volume_momentum.iloc[-1]),
+            "momentum_1m": safe_float(mom_1m),
+            "momentum_3m": safe_float(mom_3m),
+            "momentum_6m": safe_float(mom_6m),
+            "volume_momentum": safe_float(volume_momentum),
         },
     }
 
 
-def calculate_volatility_signals(prices_df):
-    """
-    Volatility-based trading strategy
-    """
-    # Calculate various volatility metrics
-    returns = prices_df["close"].pct_change()
-
-    # Historical volatility
-    hist_vol = returns.rolling(21).std() * math.sqrt(252)
-
-    # Volatility regime detection
-    vol_ma = hist_vol.rolling(63).mean()
-    vol_regime = hist_vol / vol_ma
-
-    # Volatility mean reversion
-    vol_z_score = (hist_vol - vol_ma) / hist_vol.rolling(63).std()
-
-    # ATR ratio
-    atr = calculate_atr(prices_df)
-    atr_ratio = atr / prices_df["close"]
-
-    # Generate signal based on volatility regime
-    current_vol_regime = vol_regime.iloc[-1]
-    vol_z = vol_z_score.iloc[-1]
+def volatility_signal(hist_vol, vol_ma, vol_std, atr_ratio):
+    """Volatility signal from the latest historical volatility, its 63-day mean/std and the ATR ratio."""
+    # Volatility regime detection and mean reversion
+    current_vol_regime = hist_vol / vol_ma
+    vol_z = (hist_vol - vol_ma) / vol_std
 
     if current_vol_regime < 0.8 and vol_z < -1:
         signal = "bullish"  # Low vol regime, potential for expansion
@@ -321,36 +366,21 @@ def calculate_volatility_signals(prices_df):
         "signal": signal,
         "confidence": confidence,
         "metrics": {
-            "historical_volatility": safe_float(hist_vol.iloc[-1]),
+            "historical_volatility": safe_float(hist_vol),
             "volatility_regime": safe_float(current_vol_regime),
             "volatility_z_score": safe_float(vol_z),
-            "atr_ratio": safe_float(atr_ratio.iloc[-1]),
+            "atr_ratio": safe_float(atr_ratio),
         },
     }
 
 
-def calculate_stat_arb_signals(prices_df):
-    """
-    Statistical arbitrage signals based on price action analysis
-    """
-    # Calculate price distribution statistics
-    returns = prices_df["close"].pct_change()
-
-    # Skewness and kurtosis
-    skew = returns.rolling(63).skew()
-    kurt = returns.rolling(63).kurt()
-
-    # Test for mean reversion using Hurst exponent
-    hurst = calculate_hurst_exponent(prices_df["close"])
-
-    # Correlation analysis
-    # (would include correlation with related securities in real implementation)
-
+def stat_arb_signal(hurst, skew, kurt):
+    """Statistical arbitrage signal from the Hurst exponent and the latest return skewness/kurtosis."""
     # Generate signal based on statistical properties
-    if hurst < 0.4 and skew.iloc[-1] > 1:
+    if hurst < 0.4 and skew > 1:
         signal = "bullish"
         confidence = (0.5 - hurst) * 2
-    elif hurst < 0.4 and skew.iloc[-1] < -1:
+    elif hurst < 0.4 and skew < -1:
         signal = "bearish"
         confidence = (0.5 - hurst) * 2
     else:
@@ -362,12 +392,107 @@ def calculate_stat_arb_signals(prices_df):
         "confidence": confidence,
         "metrics": {
             "hurst_exponent": safe_float(hurst),
-            "skewness": safe_float(skew.iloc[-1]),
-            "kurtosis": safe_float(kurt.iloc[-1]),
+            "skewness": safe_float(skew),
+            "kurtosis": safe_float(kurt),
         },
     }
 
 
+def calculate_trend_signals(prices_df, tr=None):
+    """
+    Advanced trend following strategy using multiple timeframes and indicators
+    """
+    # Calculate EMAs for multiple timeframes
+    ema_8 = calculate_ema(prices_df, 8)
+    ema_21 = calculate_ema(prices_df, 21)
+    ema_55 = calculate_ema(prices_df, 55)
+
+    # Calculate ADX for trend strength
+    adx = calculate_adx(prices_df, 14, tr=tr)
+
+    return trend_signal(ema_8.iloc[-1], ema_21.iloc[-1], ema_55.iloc[-1], adx["adx"].iloc[-1])
+
+
+def calculate_mean_reversion_signals(prices_df):
+    """
+    Mean reversion strategy using statistical measures and Bollinger Bands
+    """
+    # Calculate z-score of price relative to moving average
+    ma_50 = prices_df["close"].rolling(window=50).mean()
+    std_50 = prices_df["close"].rolling(window=50).std()
+
+    # Calculate Bollinger Bands
+    bb_upper, bb_lower = calculate_bollinger_bands(prices_df)
+
+    # Calculate RSI with multiple timeframes
+    rsi_14 = calculate_rsi(prices_df, 14)
+    rsi_28 = calculate_rsi(prices_df, 28)
+
+    return mean_reversion_signal(prices_df["close"].iloc[-1], ma_50.iloc[-1], std_50.iloc[-1], bb_upper.iloc[-1], bb_lower.iloc[-1], rsi_14.iloc[-1], rsi_28.iloc[-1])
+
+
+def calculate_momentum_signals(prices_df):
+    """
+    Multi-factor momentum strategy
+    """
+    # Price momentum
+    returns = prices_df["close"].pct_change()
+    mom_1m = returns.rolling(21).sum()
+    mom_3m = returns.rolling(63).sum()
+    mom_6m = returns.rolling(126).sum()
+
+    # Volume momentum
+    volume_ma = prices_df["volume"].rolling(21).mean()
+    volume_momentum = prices_df["volume"] / volume_ma
+
+    # Relative strength
+    # (would compare to market/sector in real implementation)
+
+    return momentum_signal(mom_1m.iloc[-1], mom_3m.iloc[-1], mom_6m.iloc[-1], volume_momentum.iloc[-1])
+
+
+def calculate_volatility_signals(prices_df, tr=None):
+    """
+    Volatility-based trading strategy
+    """
+    # Calculate various volatility metrics
+    returns = pct_change(np.ascontiguousarray(prices_df["close"], dtype=np.float64))
+
+    # Historical volatility over the last 63 windows only
+    hist_vol = rolling_tail(returns, 21, 63).std(axis=-1, ddof=1) * math.sqrt(252)
+
+    # Volatility regime statistics
+    vol_ma = hist_vol.mean()
+    vol_std = hist_vol.std(ddof=1)
+
+    # ATR ratio
+    atr = calculate_atr(prices_df, tr=tr)
+    atr_ratio = atr / prices_df["close"]
+
+    return volatility_signal(hist_vol[-1], vol_ma, vol_std, atr_ratio.iloc[-1])
+
+
+def calculate_stat_arb_signals(prices_df):
+    """
+    Statistical arbitrage signals based on price action analysis
+    """
+    # Calculate price distribution statistics
+    close = np.ascontiguousarray(prices_df["close"], dtype=np.float64)
+    returns = pct_change(close)
+
+    # Skewness and kurtosis of the latest window only
+    skew = rolling_skew_last(returns, 63)
+    kurt = rolling_kurt_last(returns, 63)
+
+    # Test for mean reversion using Hurst exponent
+    hurst = calculate_hurst_exponent(close)
+
+    # Correlation analysis
+    # (would include correlation with related securities in real implementation)
+
+    return stat_arb_signal(hurst, skew, kurt)
+
+
 def weighted_signal_combination(signals, weights):
     """
     Combines multiple trading signals using a weighted approach
@@ -449,58 +574,57 @@ def calculate_ema(df: pd.DataFrame, window: int) -> pd.Series:
     return df["close"].ewm(span=window, adjust=False).mean()
 
 
-def calculate_adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+def calculate_true_range(df: pd.DataFrame) -> np.ndarray:
     """
-    Calculate Average Directional Index (ADX)
+    Calculate True Range once so that ADX, ATR and the volatility signals can share it
 
     Args:
         df: DataFrame with OHLC data
-        period: Period for calculations
 
     Returns:
-        DataFrame with ADX values
+        np.ndarray: True Range values (the first bar uses high - low)
     """
-    # Calculate True Range
-    df["high_low"] = df["high"] - df["low"]
-    df["high_close"] = abs(df["high"] - df["close"].shift())
-    df["low_close"] = abs(df["low"] - df["close"].shift())
-    df["tr"] = df[["high_low", "high_close", "low_close"]].max(axis=1)
+    return true_range(
+        np.asarray(df["high"], dtype=np.float64),
+        np.asarray(df["low"], dtype=np.float64),
+        np.asarray(df["close"], dtype=np.float64),
+    )
 
-    # Calculate Directional Movement
-    df["up_move"] = df["high"] - df["high"].shift()
-    df["down_move"] = df["low"].shift() - df["low"]
 
-    df["plus_dm"] = np.where((df["up_move"] > df["down_move"]) & (df["up_move"] > 0), df["up_move"], 0)
-    df["minus_dm"] = np.where((df["down_move"] > df["up_move"]) & (df["down_move"] > 0), df["down_move"], 0)
+def calculate_adx(df: pd.DataFrame, period: int = 14, tr: np.ndarray | None = None) -> pd.DataFrame:
+    """
+    Calculate Average Directional Index (ADX) without modifying df
 
-    # Calculate ADX
-    df["+di"] = 100 * (df["plus_dm"].ewm(span=period).mean() / df["tr"].ewm(span=period).mean())
-    df["-di"] = 100 * (df["minus_dm"].ewm(span=period).mean() / df["tr"].ewm(span=period).mean())
-    df["dx"] = 100 * abs(df["+di"] - df["-di"]) / (df["+di"] + df["-di"])
-    df["adx"] = df["dx"].ewm(span=period).mean()
+    Args:
+        df: DataFrame with OHLC data
+        period: Period for calculations
+        tr: Precomputed True Range (see calculate_true_range)
 
-    return df[["adx", "+di", "-di"]]
+    Returns:
+        DataFrame with ADX values
+    """
+    high = np.asarray(df["high"], dtype=np.float64)
+    low = np.asarray(df["low"], dtype=np.float64)
+    close = np.asarray(df["close"], dtype=np.float64)
+    adx_values, plus_di, minus_di = adx(high, low, close, period, tr=tr)
+    return pd.DataFrame({"adx": adx_values, "+di": plus_di, "-di": minus_di}, index=df.index)
 
 
-def calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
+def calculate_atr(df: pd.DataFrame, period: int = 14, tr: np.ndarray | None = None) -> pd.Series:
     """
-    Calculate Average True Range
+    Calculate Average True Range without modifying df
 
     Args:
         df: DataFrame with OHLC data
         period: Period for ATR calculation
+        tr: Precomputed True Range (see calculate_true_range)
 
     Returns:
         pd.Series: ATR values
     """
-    high_low = df["high"] - df["low"]
-    high_close = abs(df["high"] - df["close"].shift())
-    low_close = abs(df["low"] - df["close"].shift())
-
-    ranges = pd.concat([high_low, high_close, low_close], axis=1)
-    true_range = ranges.max(axis=1)
-
-    return true_range.rolling(period).mean()
+    if tr is None:
+        tr = calculate_true_range(df)
+    return pd.Series(tr, index=df.index).rolling(period).mean()
 
 
 def calculate_hurst_exponent(price_series: pd.Series, max_lag: int = 20) -> float:
@@ -517,14 +641,5 @@ def calculate_hurst_exponent(price_series: pd.Series, max_lag: int = 20) -> floa
     Returns:
         float: Hurst exponent
     """
-    lags = range(2, max_lag)
-    # Add small epsilon to avoid log(0)
-    tau = [max(1e-8, np.sqrt(np.std(np.subtract(price_series[lag:], price_series[:-lag])))) for lag in lags]
-
-    # Return the Hurst exponent from linear fit
-    try:
-        reg = np.polyfit(np.log(lags), np.log(tau), 1)
-        return reg[0]  # Hurst exponent is the slope
-    except (ValueError, RuntimeWarning):
-        # Return 0.5 (random walk) if calculation fails
-        return 0.5
+    # Contiguous float64 positions: strided lag differences and a single fit
+    return float(hurst_exponent(np.asarray(price_series, dtype=np.float64), max_lag))
@@ -11,6 +11,7 @@ import json
 from langchain_core.messages import HumanMessage
 from src.graph.state import AgentState, show_agent_reasoning
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
 
 from src.tools.api_router import (
     get_financial_metrics,
@@ -28,6 +29,7 @@ def valuation_analyst_agent(state: AgentState):
     valuation_analysis: dict[str, dict] = {}
 
     for ticker in tickers:
+        check_cancelled()
         progress.update_status("valuation_analyst_agent", ticker, "Fetching financial data")
 
         # --- Historical financial metrics (pull 8 latest TTM snapshots for medians) ---
@@ -145,7 +147,8 @@ def valuation_analyst_agent(state: AgentState):
             "confidence": confidence,
             "reasoning": reasoning,
         }
-        progress.update_status("valuation_analyst_agent", ticker, "Done", analysis=json.dumps(reasoning, indent=4))
+        progress.update_signal("valuation_analyst_agent", ticker, valuation_analysis[ticker])
+        progress.update_status("valuation_analyst_agent", ticker, "Done")
 
     # ---- Emit message (for LLM tool chain) ----
     msg = HumanMessage(content=json.dumps(valuation_analysis), name="valuation_analyst_agent")
@@ -7,6 +7,7 @@ from typing_extensions import Literal
 from src.tools.api_router import get_financial_metrics, get_market_cap, search_line_items
 from src.utils.llm import call_llm
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
 
 
 
@@ -27,6 +28,7 @@ def warren_buffett_agent(state: AgentState):
     buffett_analysis = {}
 
     for ticker in tickers:
+        check_cancelled()
         progress.update_status("warren_buffett_agent", ticker, "Fetching financial metrics")
         # Fetch required data - request more periods for better trend analysis
         metrics = get_financial_metrics(ticker, end_date, period="ttm", limit=10)
@@ -135,7 +137,8 @@ def warren_buffett_agent(state: AgentState):
             "reasoning": buffett_output.reasoning,
         }
 
-        progress.update_status("warren_buffett_agent", ticker, "Done", analysis=buffett_output.reasoning)
+        progress.update_signal("warren_buffett_agent", ticker, buffett_analysis[ticker])
+        progress.update_status("warren_buffett_agent", ticker, "Done")
 
     # Create the message
     message = HumanMessage(content=json.dumps(buffett_analysis), name="warren_buffett_agent")
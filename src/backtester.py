@@ -9,25 +9,49 @@ import pandas as pd
 from colorama import Fore, Style, init
 import numpy as np
 import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from src.llm.models import LLM_ORDER, OLLAMA_LLM_ORDER, get_model_info, ModelProvider
 from src.utils.analysts import ANALYST_ORDER
-from src.main import run_hedge_fund
+from src.agents.portfolio_manager import ALLOCATION_MODES
+from src.main import run_hedge_fund, run_analysts, run_portfolio_stage
+from src.data.cache import get_cache, seed_cache
 from src.tools.api_router import (
-    get_prices,
     get_financial_metrics,
     get_market_cap,
     get_insider_trades,
     get_company_news,
     search_line_items,
 )
+from src.tools.bars import get_bars
 from src.utils.display import print_backtest_results, format_backtest_row
+from src.utils.ledger import PortfolioLedger
+from src.utils.performance import StreamingPerformance
+from src.utils.progress import progress
 from typing_extensions import Callable
 from src.utils.ollama import ensure_ollama_and_model
 
 init(autoreset=True)
 
 
+def _compute_shard_signals(tickers: list[str], trading_dates: list[str], selected_analysts: list[str], model_name: str, model_provider: str) -> dict[str, dict]:
+    """Compute the analyst signals for every trading date of one shard (runs in a worker process)."""
+    # Several worker processes cannot share one live console display
+    progress.set_headless()
+    shard_signals = {}
+    for current_date_str in trading_dates:
+        lookback_start = (datetime.strptime(current_date_str, "%Y-%m-%d") - timedelta(days=30)).strftime("%Y-%m-%d")
+        shard_signals[current_date_str] = run_analysts(
+            tickers=tickers,
+            start_date=lookback_start,
+            end_date=current_date_str,
+            selected_analysts=selected_analysts,
+            model_name=model_name,
+            model_provider=model_provider,
+        )
+    return shard_signals
+
+
 class Backtester:
     def __init__(
         self,
@@ -40,6 +64,12 @@ class Backtester:
         model_provider: str = "OpenAI",
         selected_analysts: list[str] = [],
         initial_margin_requirement: float = 0.0,
+        missing_price_policy: str = "skip",
+        parallel_shards: int = 1,
+        analyst_signals: dict[str, dict] | None = None,
+        verbose: bool = True,
+        allocation_mode: str = "llm",
+        headless: bool = False,
     ):
         """
         :param agent: The trading agent (Callable).
@@ -51,7 +81,21 @@ class Backtester:
         :param model_provider: Which LLM provider (OpenAI, etc).
         :param selected_analysts: List of analyst names or IDs to incorporate.
         :param initial_margin_requirement: The margin ratio (e.g. 0.5 = 50%).
+        :param missing_price_policy: How to treat a ticker without a bar on a trading day
+            (e.g. a suspension): "skip" skips the whole day, "ffill" uses the last known close.
+        :param parallel_shards: When > 1, run walk-forward: the analyst stage is computed for
+            date shards in parallel processes, then risk/portfolio management and trade
+            execution are replayed sequentially over the precomputed signals.
+        :param analyst_signals: Precomputed analyst signals keyed by date (YYYY-MM-DD). When
+            given, the analyst stage is skipped entirely and only the portfolio stages run.
+        :param verbose: Print the running trade table after every day.
+        :param allocation_mode: "llm" lets the portfolio manager LLM decide the orders,
+            "deterministic" sizes them from the signals without an LLM call.
+        :param headless: Disable the live agent progress display (e.g. for unattended runs).
         """
+        if missing_price_policy not in ("skip", "ffill"):
+            raise ValueError(f"Invalid missing_price_policy: {missing_price_policy} (expected 'skip' or 'ffill')")
+
         self.agent = agent
         self.tickers = tickers
         self.start_date = start_date
@@ -60,186 +104,33 @@ class Backtester:
         self.model_name = model_name
         self.model_provider = model_provider
         self.selected_analysts = selected_analysts
+        self.missing_price_policy = missing_price_policy
+        self.parallel_shards = parallel_shards
+        self.analyst_signals = analyst_signals
+        self.verbose = verbose
+        self.allocation_mode = allocation_mode
+        if headless:
+            progress.set_headless()
+
+        # Aligned dates x tickers close prices, loaded once in prefetch_data
+        self.price_matrix = pd.DataFrame(columns=tickers, dtype=float)
 
         # Initialize portfolio with support for long/short positions
         self.portfolio_values = []
-        self.portfolio = {
-            "cash": initial_capital,
-            "margin_used": 0.0,  # total margin usage across all short positions
-            "margin_requirement": initial_margin_requirement,  # The margin ratio required for shorts
-            "positions": {ticker: {"long": 0, "short": 0, "long_cost_basis": 0.0, "short_cost_basis": 0.0, "short_margin_used": 0.0} for ticker in tickers},  # Number of shares held long  # Number of shares held short  # Average cost basis per share (long)  # Average cost basis per share (short)  # Dollars of margin used for this ticker's short
-            "realized_gains": {
-                ticker: {
-                    "long": 0.0,  # Realized gains from long positions
-                    "short": 0.0,  # Realized gains from short positions
-                }
-                for ticker in tickers
-            },
-        }
-
-    def execute_trade(self, ticker: str, action: str, quantity: float, current_price: float):
+        self.ledger = PortfolioLedger(tickers, initial_capital, initial_margin_requirement)
+
+    @property
+    def portfolio(self) -> dict:
+        """Nested-dict view of the ledger, as passed to the agents."""
+        return self.ledger.to_dict()
+
+    def execute_trade(self, ticker: str, action: str, quantity: float, current_price: float, date=None):
         """
         Execute trades with support for both long and short positions.
         `quantity` is the number of shares the agent wants to buy/sell/short/cover.
         We will only trade integer shares to keep it simple.
         """
-        if quantity <= 0:
-            return 0
-
-        quantity = int(quantity)  # force integer shares
-        position = self.portfolio["positions"][ticker]
-
-        if action == "buy":
-            cost = quantity * current_price
-            if cost <= self.portfolio["cash"]:
-                # Weighted average cost basis for the new total
-                old_shares = position["long"]
-                old_cost_basis = position["long_cost_basis"]
-                new_shares = quantity
-                total_shares = old_shares + new_shares
-
-                if total_shares > 0:
-                    total_old_cost = old_cost_basis * old_shares
-                    total_new_cost = cost
-                    position["long_cost_basis"] = (total_old_cost + total_new_cost) / total_shares
-
-                position["long"] += quantity
-                self.portfolio["cash"] -= cost
-                return quantity
-            else:
-                # Calculate maximum affordable quantity
-                max_quantity = int(self.portfolio["cash"] / current_price)
-                if max_quantity > 0:
-                    cost = max_quantity * current_price
-                    old_shares = position["long"]
-                    old_cost_basis = position["long_cost_basis"]
-                    total_shares = old_shares + max_quantity
-
-                    if total_shares > 0:
-                        total_old_cost = old_cost_basis * old_shares
-                        total_new_cost = cost
-                        position["long_cost_basis"] = (total_old_cost + total_new_cost) / total_shares
-
-                    position["long"] += max_quantity
-                    self.portfolio["cash"] -= cost
-                    return max_quantity
-                return 0
-
-        elif action == "sell":
-            # You can only sell as many as you own
-            quantity = min(quantity, position["long"])
-            if quantity > 0:
-                # Realized gain/loss using average cost basis
-                avg_cost_per_share = position["long_cost_basis"] if position["long"] > 0 else 0
-                realized_gain = (current_price - avg_cost_per_share) * quantity
-                self.portfolio["realized_gains"][ticker]["long"] += realized_gain
-
-                position["long"] -= quantity
-                self.portfolio["cash"] += quantity * current_price
-
-                if position["long"] == 0:
-                    position["long_cost_basis"] = 0.0
-
-                return quantity
-
-        elif action == "short":
-            """
-            Typical short sale flow:
-              1) Receive proceeds = current_price * quantity
-              2) Post margin_required = proceeds * margin_ratio
-              3) Net effect on cash = +proceeds - margin_required
-            """
-            proceeds = current_price * quantity
-            margin_required = proceeds * self.portfolio["margin_requirement"]
-            if margin_required <= self.portfolio["cash"]:
-                # Weighted average short cost basis
-                old_short_shares = position["short"]
-                old_cost_basis = position["short_cost_basis"]
-                new_shares = quantity
-                total_shares = old_short_shares + new_shares
-
-                if total_shares > 0:
-                    total_old_cost = old_cost_basis * old_short_shares
-                    total_new_cost = current_price * new_shares
-                    position["short_cost_basis"] = (total_old_cost + total_new_cost) / total_shares
-
-                position["short"] += quantity
-
-                # Update margin usage
-                position["short_margin_used"] += margin_required
-                self.portfolio["margin_used"] += margin_required
-
-                # Increase cash by proceeds, then subtract the required margin
-                self.portfolio["cash"] += proceeds
-                self.portfolio["cash"] -= margin_required
-                return quantity
-            else:
-                # Calculate maximum shortable quantity
-                margin_ratio = self.portfolio["margin_requirement"]
-                if margin_ratio > 0:
-                    max_quantity = int(self.portfolio["cash"] / (current_price * margin_ratio))
-                else:
-                    max_quantity = 0
-
-                if max_quantity > 0:
-                    proceeds = current_price * max_quantity
-                    margin_required = proceeds * margin_ratio
-
-                    old_short_shares = position["short"]
-                    old_cost_basis = position["short_cost_basis"]
-                    total_shares = old_short_shares + max_quantity
-
-                    if total_shares > 0:
-                        total_old_cost = old_cost_basis * old_short_shares
-                        total_new_cost = current_price * max_quantity
-                        position["short_cost_basis"] = (total_old_cost + total_new_cost) / total_shares
-
-                    position["short"] += max_quantity
-                    position["short_margin_used"] += margin_required
-                    self.portfolio["margin_used"] += margin_required
-
-                    self.portfolio["cash"] += proceeds
-                    self.portfolio["cash"] -= margin_required
-                    return max_quantity
-                return 0
-
-        elif action == "cover":
-            """
-            When covering shares:
-              1) Pay cover cost = current_price * quantity
-              2) Release a proportional share of the margin
-              3) Net effect on cash = -cover_cost + released_margin
-            """
-            quantity = min(quantity, position["short"])
-            if quantity > 0:
-                cover_cost = quantity * current_price
-                avg_short_price = position["short_cost_basis"] if position["short"] > 0 else 0
-                realized_gain = (avg_short_price - current_price) * quantity
-
-                if position["short"] > 0:
-                    portion = quantity / position["short"]
-                else:
-                    portion = 1.0
-
-                margin_to_release = portion * position["short_margin_used"]
-
-                position["short"] -= quantity
-                position["short_margin_used"] -= margin_to_release
-                self.portfolio["margin_used"] -= margin_to_release
-
-                # Pay the cost to cover, but get back the released margin
-                self.portfolio["cash"] += margin_to_release
-                self.portfolio["cash"] -= cover_cost
-
-                self.portfolio["realized_gains"][ticker]["short"] += realized_gain
-
-                if position["short"] == 0:
-                    position["short_cost_basis"] = 0.0
-                    position["short_margin_used"] = 0.0
-
-                return quantity
-
-        return 0
+        return self.ledger.execute_trade(ticker, action, quantity, current_price, date=date)
 
     def calculate_portfolio_value(self, current_prices):
         """
@@ -248,21 +139,7 @@ class Backtester:
           - market value of long positions
           - unrealized gains/losses for short positions
         """
-        total_value = self.portfolio["cash"]
-
-        for ticker in self.tickers:
-            position = self.portfolio["positions"][ticker]
-            price = current_prices[ticker]
-
-            # Long position value
-            long_value = position["long"] * price
-            total_value += long_value
-
-            # Short position unrealized PnL = short_shares * (short_cost_basis - current_price)
-            if position["short"] > 0:
-                total_value -= position["short"] * price
-
-        return total_value
+        return self.ledger.mark_to_market(np.array([current_prices[ticker] for ticker in self.tickers], dtype=float))
 
     def prefetch_data(self):
         """Pre-fetch all data needed for the backtest period."""
@@ -271,11 +148,13 @@ class Backtester:
         # Convert end_date string to datetime, fetch up to 1 year before
         end_date_dt = datetime.strptime(self.end_date, "%Y-%m-%d")
         start_date_dt = end_date_dt - relativedelta(years=1)
-        start_date_str = start_date_dt.strftime("%Y-%m-%d")
+        start_date_str = min(start_date_dt.strftime("%Y-%m-%d"), self.start_date)
 
+        price_frames = {}
         for ticker in self.tickers:
-            # Fetch price data for the entire period, plus 1 year
-            get_prices(ticker, start_date_str, self.end_date)
+            # Fetch price data for the entire period, plus 1 year (the daily lookback
+            # windows of the agents are then slices of these cached bars)
+            price_frames[ticker] = get_bars(ticker, start_date_str, self.end_date)
 
             # Fetch financial metrics
             get_financial_metrics(ticker, self.end_date, limit=10)
@@ -286,11 +165,83 @@ class Backtester:
             # Fetch company news
             get_company_news(ticker, self.end_date, start_date=self.start_date, limit=1000)
 
+        # Align all closes once so the day loop only has to index into them
+        self.price_matrix = self._build_price_matrix(price_frames)
+
         print("Data pre-fetch complete.")
 
-    def run_backtest(self):
+    def _build_price_matrix(self, price_frames: dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Align the close prices of all tickers into a single dates x tickers matrix.
+        Dates on which no ticker has a bar are market holidays and are dropped.
+        Missing bars of individual tickers are forward-filled when
+        missing_price_policy is "ffill" and left as NaN otherwise.
+        """
+        closes = {}
+        for ticker in self.tickers:
+            df = price_frames.get(ticker)
+            if df is None or df.empty:
+                closes[ticker] = pd.Series(dtype=float)
+                continue
+
+            index = pd.DatetimeIndex(df.index)
+            if index.tz is not None:
+                index = index.tz_localize(None)
+            series = pd.Series(df["close"].to_numpy(dtype=float), index=index.normalize())
+            closes[ticker] = series[~series.index.duplicated(keep="last")]
+
+        matrix = pd.DataFrame(closes, columns=self.tickers, dtype=float).sort_index()
+        matrix = matrix.dropna(how="all")
+        if self.missing_price_policy == "ffill":
+            matrix = matrix.ffill()
+        return matrix
+
+    def precompute_signals(self, trading_dates: list[str]) -> dict[str, dict]:
+        """
+        Compute analyst signals for all trading dates, split into contiguous date shards
+        that run in parallel processes. Signals only depend on market data, so they
+        can be produced ahead of the portfolio-dependent stages.
+        """
+        shards = [shard.tolist() for shard in np.array_split(np.array(trading_dates, dtype=object), self.parallel_shards) if len(shard) > 0]
+        if not shards:
+            return {}
+
+        print(f"\nComputing analyst signals for {len(trading_dates)} trading days in {len(shards)} parallel shards...")
+
+        signals_by_date = {}
+        with ProcessPoolExecutor(max_workers=len(shards), initializer=seed_cache, initargs=(get_cache(),)) as executor:
+            futures = [
+                executor.submit(
+                    _compute_shard_signals,
+                    self.tickers,
+                    shard,
+                    self.selected_analysts,
+                    self.model_name,
+                    self.model_provider,
+                )
+                for shard in shards
+            ]
+            for future in as_completed(futures):
+                signals_by_date.update(future.result())
+
+        print("Analyst signals complete.")
+        return signals_by_date
+
+    def get_trading_dates(self) -> list[str]:
+        """Business days of the backtest period that have a close for every ticker."""
+        dates = pd.date_range(self.start_date, self.end_date, freq="B")
+        daily_closes = self.price_matrix.reindex(dates).to_numpy(dtype=float)
+        tradable_days = dates.isin(self.price_matrix.index) & ~np.isnan(daily_closes).any(axis=1)
+        return dates[tradable_days].strftime("%Y-%m-%d").tolist()
+
+    def run_backtest(self, prefetch: bool = True):
+        """
+        Run the day-by-day simulation.
+        :param prefetch: Fetch data first; pass False when price_matrix is already loaded.
+        """
         # Pre-fetch all data at the start
-        self.prefetch_data()
+        if prefetch:
+            self.prefetch_data()
 
         dates = pd.date_range(self.start_date, self.end_date, freq="B")
         table_rows = []
@@ -299,59 +250,70 @@ class Backtester:
         print("\nStarting backtest...")
 
         # Initialize portfolio values list with initial capital
+        self.performance = StreamingPerformance()
         if len(dates) > 0:
             self.portfolio_values = [{"Date": dates[0], "Portfolio Value": self.initial_capital}]
+            self.performance.update(dates[0], self.initial_capital)
         else:
             self.portfolio_values = []
 
-        for current_date in dates:
+        # Index the price matrix by backtest day once instead of querying prices per day
+        trading_days = dates.isin(self.price_matrix.index)
+        daily_closes = self.price_matrix.reindex(dates).to_numpy(dtype=float)
+
+        # In walk-forward mode the analyst stage runs up front for every tradable day
+        precomputed_signals = self.analyst_signals
+        if precomputed_signals is None and self.parallel_shards > 1:
+            precomputed_signals = self.precompute_signals(self.get_trading_dates())
+
+        for day_idx, current_date in enumerate(dates):
             lookback_start = (current_date - timedelta(days=30)).strftime("%Y-%m-%d")
             current_date_str = current_date.strftime("%Y-%m-%d")
-            previous_date_str = (current_date - timedelta(days=1)).strftime("%Y-%m-%d")
 
             # Skip if there's no prior day to look back (i.e., first date in the range)
             if lookback_start == current_date_str:
                 continue
 
-            # Get current prices for all tickers
-            try:
-                current_prices = {}
-                missing_data = False
-
-                for ticker in self.tickers:
-                    try:
-                        price_data = get_price_data(ticker, previous_date_str, current_date_str)
-                        if price_data.empty:
-                            print(f"Warning: No price data for {ticker} on {current_date_str}")
-                            missing_data = True
-                            break
-                        current_prices[ticker] = price_data.iloc[-1]["close"]
-                    except Exception as e:
-                        print(f"Error fetching price for {ticker} between {previous_date_str} and {current_date_str}: {e}")
-                        missing_data = True
-                        break
-
-                if missing_data:
-                    print(f"Skipping trading day {current_date_str} due to missing price data")
-                    continue
-
-            except Exception as e:
-                # If there's a general API error, log it and skip this day
-                print(f"Error fetching prices for {current_date_str}: {e}")
+            # Get current prices for all tickers from the preloaded matrix
+            if not trading_days[day_idx]:
+                print(f"Skipping {current_date_str}: no market data (holiday)")
                 continue
 
+            day_closes = daily_closes[day_idx]
+            missing_tickers = [ticker for ticker, close in zip(self.tickers, day_closes) if np.isnan(close)]
+            if missing_tickers:
+                print(f"Warning: No price data for {', '.join(missing_tickers)} on {current_date_str}")
+                print(f"Skipping trading day {current_date_str} due to missing price data")
+                continue
+
+            current_prices = dict(zip(self.tickers, day_closes.tolist()))
+
             # ---------------------------------------------------------------
             # 1) Execute the agent's trades
             # ---------------------------------------------------------------
-            output = self.agent(
-                tickers=self.tickers,
-                start_date=lookback_start,
-                end_date=current_date_str,
-                portfolio=self.portfolio,
-                model_name=self.model_name,
-                model_provider=self.model_provider,
-                selected_analysts=self.selected_analysts,
-            )
+            if precomputed_signals is not None:
+                # Replay the portfolio-dependent stages over the precomputed signals
+                output = run_portfolio_stage(
+                    tickers=self.tickers,
+                    start_date=lookback_start,
+                    end_date=current_date_str,
+                    portfolio=self.portfolio,
+                    analyst_signals=precomputed_signals.get(current_date_str, {}),
+                    model_name=self.model_name,
+                    model_provider=self.model_provider,
+                    allocation_mode=self.allocation_mode,
+                )
+            else:
+                output = self.agent(
+                    tickers=self.tickers,
+                    start_date=lookback_start,
+                    end_date=current_date_str,
+                    portfolio=self.portfolio,
+                    model_name=self.model_name,
+                    model_provider=self.model_provider,
+                    selected_analysts=self.selected_analysts,
+                    allocation_mode=self.allocation_mode,
+                )
             decisions = output["decisions"]
             analyst_signals = output["analyst_signals"]
 
@@ -361,18 +323,17 @@ class Backtester:
                 decision = decisions.get(ticker, {"action": "hold", "quantity": 0})
                 action, quantity = decision.get("action", "hold"), decision.get("quantity", 0)
 
-                executed_quantity = self.execute_trade(ticker, action, quantity, current_prices[ticker])
+                executed_quantity = self.execute_trade(ticker, action, quantity, current_prices[ticker], date=current_date_str)
                 executed_trades[ticker] = executed_quantity
 
             # ---------------------------------------------------------------
             # 2) Now that trades have executed trades, recalculate the final
             #    portfolio value for this day.
             # ---------------------------------------------------------------
-            total_value = self.calculate_portfolio_value(current_prices)
+            total_value = self.ledger.mark_to_market(day_closes)
 
             # Also compute long/short exposures for final post‐trade state
-            long_exposure = sum(self.portfolio["positions"][t]["long"] * current_prices[t] for t in self.tickers)
-            short_exposure = sum(self.portfolio["positions"][t]["short"] * current_prices[t] for t in self.tickers)
+            long_exposure, short_exposure = self.ledger.exposures(day_closes)
 
             # Calculate gross and net exposures
             gross_exposure = long_exposure + short_exposure
@@ -381,6 +342,7 @@ class Backtester:
 
             # Track each day's portfolio value in self.portfolio_values
             self.portfolio_values.append({"Date": current_date, "Portfolio Value": total_value, "Long Exposure": long_exposure, "Short Exposure": short_exposure, "Gross Exposure": gross_exposure, "Net Exposure": net_exposure, "Long/Short Ratio": long_short_ratio})
+            self.performance.update(current_date, total_value)
 
             # ---------------------------------------------------------------
             # 3) Build the table rows to display
@@ -388,7 +350,7 @@ class Backtester:
             date_rows = []
 
             # For each ticker, record signals/trades
-            for ticker in self.tickers:
+            for ticker_id, ticker in enumerate(self.tickers):
                 ticker_signals = {}
                 for agent_name, signals in analyst_signals.items():
                     if ticker in signals:
@@ -399,10 +361,8 @@ class Backtester:
                 neutral_count = len([s for s in ticker_signals.values() if s.get("signal", "").lower() == "neutral"])
 
                 # Calculate net position value
-                pos = self.portfolio["positions"][ticker]
-                long_val = pos["long"] * current_prices[ticker]
-                short_val = pos["short"] * current_prices[ticker]
-                net_position_value = long_val - short_val
+                net_shares = int(self.ledger.long[ticker_id] - self.ledger.short[ticker_id])
+                net_position_value = net_shares * current_prices[ticker]
 
                 # Get the action and quantity from the decisions
                 action = decisions.get(ticker, {}).get("action", "hold")
@@ -416,7 +376,7 @@ class Backtester:
                         action=action,
                         quantity=quantity,
                         price=current_prices[ticker],
-                        shares_owned=pos["long"] - pos["short"],  # net shares
+                        shares_owned=net_shares,
                         position_value=net_position_value,
                         bullish_count=bullish_count,
                         bearish_count=bearish_count,
@@ -446,8 +406,8 @@ class Backtester:
                     is_summary=True,
                     total_value=total_value,
                     return_pct=portfolio_return,
-                    cash_balance=self.portfolio["cash"],
-                    total_position_value=total_value - self.portfolio["cash"],
+                    cash_balance=self.ledger.cash,
+                    total_position_value=total_value - self.ledger.cash,
                     sharpe_ratio=performance_metrics["sharpe_ratio"],
                     sortino_ratio=performance_metrics["sortino_ratio"],
                     max_drawdown=performance_metrics["max_drawdown"],
@@ -455,7 +415,8 @@ class Backtester:
             )
 
             table_rows.extend(date_rows)
-            print_backtest_results(table_rows)
+            if self.verbose:
+                print_backtest_results(table_rows)
 
             # Update performance metrics if we have enough data
             if len(self.portfolio_values) > 3:
@@ -466,54 +427,8 @@ class Backtester:
         return performance_metrics
 
     def _update_performance_metrics(self, performance_metrics):
-        """Helper method to update performance metrics using daily returns."""
-        values_df = pd.DataFrame(self.portfolio_values).set_index("Date")
-        values_df["Daily Return"] = values_df["Portfolio Value"].pct_change()
-        clean_returns = values_df["Daily Return"].dropna()
-
-        if len(clean_returns) < 2:
-            return  # not enough data points
-
-        # Assumes 252 trading days/year
-        daily_risk_free_rate = 0.0434 / 252
-        excess_returns = clean_returns - daily_risk_free_rate
-        mean_excess_return = excess_returns.mean()
-        std_excess_return = excess_returns.std()
-
-        # Sharpe ratio
-        if std_excess_return > 1e-12:
-            performance_metrics["sharpe_ratio"] = np.sqrt(252) * (mean_excess_return / std_excess_return)
-        else:
-            performance_metrics["sharpe_ratio"] = 0.0
-
-        # Sortino ratio
-        negative_returns = excess_returns[excess_returns < 0]
-        if len(negative_returns) > 0:
-            downside_std = negative_returns.std()
-            if downside_std > 1e-12:
-                performance_metrics["sortino_ratio"] = np.sqrt(252) * (mean_excess_return / downside_std)
-            else:
-                performance_metrics["sortino_ratio"] = float("inf") if mean_excess_return > 0 else 0
-        else:
-            performance_metrics["sortino_ratio"] = float("inf") if mean_excess_return > 0 else 0
-
-        # Maximum drawdown (ensure it's stored as a negative percentage)
-        rolling_max = values_df["Portfolio Value"].cummax()
-        drawdown = (values_df["Portfolio Value"] - rolling_max) / rolling_max
-
-        if len(drawdown) > 0:
-            min_drawdown = drawdown.min()
-            # Store as a negative percentage
-            performance_metrics["max_drawdown"] = min_drawdown * 100
-
-            # Store the date of max drawdown for reference
-            if min_drawdown < 0:
-                performance_metrics["max_drawdown_date"] = drawdown.idxmin().strftime("%Y-%m-%d")
-            else:
-                performance_metrics["max_drawdown_date"] = None
-        else:
-            performance_metrics["max_drawdown"] = 0.0
-            performance_metrics["max_drawdown_date"] = None
+        """Helper method to update performance metrics from the streaming estimators (O(1) per day)."""
+        self.performance.update_metrics(performance_metrics)
 
     def analyze_performance(self):
         """Creates a performance DataFrame, prints summary stats, and plots equity curve."""
@@ -533,7 +448,7 @@ class Backtester:
         print(f"Total Return: {Fore.GREEN if total_return >= 0 else Fore.RED}{total_return:.2f}%{Style.RESET_ALL}")
 
         # Print realized P&L for informational purposes only
-        total_realized_gains = sum(self.portfolio["realized_gains"][ticker]["long"] + self.portfolio["realized_gains"][ticker]["short"] for ticker in self.tickers)
+        total_realized_gains = self.ledger.total_realized_gains()
         print(f"Total Realized Gains/Losses: {Fore.GREEN if total_realized_gains >= 0 else Fore.RED}${total_realized_gains:,.2f}{Style.RESET_ALL}")
 
         # Plot the portfolio value over time
@@ -652,6 +567,27 @@ if __name__ == "__main__":
         action="store_true",
         help="Use all available analysts (overrides --analysts)",
     )
+    parser.add_argument(
+        "--missing-price-policy",
+        type=str,
+        choices=["skip", "ffill"],
+        default="skip",
+        help="How to handle a ticker without a bar on a trading day: skip the day or forward-fill the last close (default: skip)",
+    )
+    parser.add_argument(
+        "--parallel-shards",
+        type=int,
+        default=1,
+        help="Split the period into this many date shards and compute analyst signals in parallel processes (default: 1, sequential)",
+    )
+    parser.add_argument(
+        "--allocation-mode",
+        type=str,
+        choices=ALLOCATION_MODES,
+        default="llm",
+        help="How the portfolio manager turns signals into orders: 'llm' (default) or 'deterministic' (no LLM call per day)",
+    )
+    parser.add_argument("--headless", action="store_true", help="Disable the live agent progress display")
     parser.add_argument("--ollama", action="store_true", help="Use Ollama for local LLM inference")
 
     args = parser.parse_args()
@@ -771,6 +707,10 @@ if __name__ == "__main__":
         model_provider=model_provider,
         selected_analysts=selected_analysts,
         initial_margin_requirement=args.margin_requirement,
+        missing_price_policy=args.missing_price_policy,
+        parallel_shards=args.parallel_shards,
+        allocation_mode=args.allocation_mode,
+        headless=args.headless,
     )
 
     performance_metrics = backtester.run_backtest()
@@ -1,12 +1,115 @@
-class Cache:
-    """In-memory cache for API responses."""
+import os
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+# Cache backend: "memory" (per process) or "sqlite" (shared by all processes on the host)
+CACHE_BACKEND_ENV = "HEDGE_FUND_CACHE_BACKEND"
+# Database file of the sqlite backend
+CACHE_PATH_ENV = "HEDGE_FUND_CACHE_PATH"
+DEFAULT_CACHE_PATH = ".cache/hedge_fund_cache.sqlite"
+
+
+class CacheBackend:
+    """Key-value storage behind the Cache, with one namespace per kind of data."""
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: Any):
+        raise NotImplementedError
+
+    def update(self, namespace: str, key: str, func: Callable[[Any | None], Any]):
+        """Replace the value with func(current value), atomically where the backend is shared."""
+        self.set(namespace, key, func(self.get(namespace, key)))
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Dictionaries in process memory (the default)."""
 
     def __init__(self):
-        self._prices_cache: dict[str, list[dict[str, any]]] = {}
-        self._financial_metrics_cache: dict[str, list[dict[str, any]]] = {}
-        self._line_items_cache: dict[str, list[dict[str, any]]] = {}
-        self._insider_trades_cache: dict[str, list[dict[str, any]]] = {}
-        self._company_news_cache: dict[str, list[dict[str, any]]] = {}
+        self._stores: dict[str, dict[str, Any]] = {}
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        return self._stores.get(namespace, {}).get(key)
+
+    def set(self, namespace: str, key: str, value: Any):
+        self._stores.setdefault(namespace, {})[key] = value
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    A SQLite database in WAL mode, shared by every process on the host that points at
+    the same file (e.g. backtest shard processes), so data fetched by one process is a cache
+    hit for all of them. Readers never block on the single writer. Values are pickled,
+    and each thread uses its own connection.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS cache (namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, PRIMARY KEY (namespace, key))")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        row = self._connection().execute("SELECT value FROM cache WHERE namespace = ? AND key = ?", (namespace, key)).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def set(self, namespace: str, key: str, value: Any):
+        with self._connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO cache (namespace, key, value) VALUES (?, ?, ?)", (namespace, key, pickle.dumps(value)))
+
+    def update(self, namespace: str, key: str, func: Callable[[Any | None], Any]):
+        connection = self._connection()
+        # Take the write lock before reading so concurrent merges of a key are not lost
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT value FROM cache WHERE namespace = ? AND key = ?", (namespace, key)).fetchone()
+            value = func(pickle.loads(row[0]) if row else None)
+            connection.execute("INSERT OR REPLACE INTO cache (namespace, key, value) VALUES (?, ?, ?)", (namespace, key, pickle.dumps(value)))
+        except BaseException:
+            connection.rollback()
+            raise
+        connection.commit()
+
+    def __getstate__(self):
+        # Connections cannot be pickled; worker processes reconnect to the same file
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.path = state["path"]
+        self._local = threading.local()
+
+
+def create_cache_backend() -> CacheBackend:
+    """The cache backend selected by HEDGE_FUND_CACHE_BACKEND (and HEDGE_FUND_CACHE_PATH)."""
+    backend = os.environ.get(CACHE_BACKEND_ENV, "memory").lower()
+    if backend == "memory":
+        return MemoryCacheBackend()
+    if backend == "sqlite":
+        return SQLiteCacheBackend(os.environ.get(CACHE_PATH_ENV, DEFAULT_CACHE_PATH))
+    raise ValueError(f"Unsupported cache backend: {backend} (expected 'memory' or 'sqlite')")
+
+
+class Cache:
+    """Cache for API responses, stored in a pluggable backend (in memory by default)."""
+
+    def __init__(self, backend: CacheBackend | None = None):
+        self.backend = backend or MemoryCacheBackend()
 
     def _merge_data(self, existing: list[dict] | None, new_data: list[dict], key_field: str) -> list[dict]:
         """Merge existing and new data, avoiding duplicates based on a key field."""
@@ -21,51 +124,92 @@ class Cache:
         merged.extend([item for item in new_data if item[key_field] not in existing_keys])
         return merged
 
+    def _merge(self, namespace: str, key: str, data: list[dict], key_field: str):
+        self.backend.update(namespace, key, lambda existing: self._merge_data(existing, data, key_field=key_field))
+
     def get_prices(self, ticker: str) -> list[dict[str, any]] | None:
         """Get cached price data if available."""
-        return self._prices_cache.get(ticker)
+        return self.backend.get("prices", ticker)
 
     def set_prices(self, ticker: str, data: list[dict[str, any]]):
         """Append new price data to cache."""
-        self._prices_cache[ticker] = self._merge_data(self._prices_cache.get(ticker), data, key_field="time")
+        self._merge("prices", ticker, data, key_field="time")
 
     def get_financial_metrics(self, ticker: str) -> list[dict[str, any]]:
         """Get cached financial metrics if available."""
-        return self._financial_metrics_cache.get(ticker)
+        return self.backend.get("financial_metrics", ticker)
 
     def set_financial_metrics(self, ticker: str, data: list[dict[str, any]]):
         """Append new financial metrics to cache."""
-        self._financial_metrics_cache[ticker] = self._merge_data(self._financial_metrics_cache.get(ticker), data, key_field="report_period")
+        self._merge("financial_metrics", ticker, data, key_field="report_period")
 
     def get_line_items(self, ticker: str) -> list[dict[str, any]] | None:
         """Get cached line items if available."""
-        return self._line_items_cache.get(ticker)
+        return self.backend.get("line_items", ticker)
 
     def set_line_items(self, ticker: str, data: list[dict[str, any]]):
         """Append new line items to cache."""
-        self._line_items_cache[ticker] = self._merge_data(self._line_items_cache.get(ticker), data, key_field="report_period")
+        self._merge("line_items", ticker, data, key_field="report_period")
 
     def get_insider_trades(self, ticker: str) -> list[dict[str, any]] | None:
         """Get cached insider trades if available."""
-        return self._insider_trades_cache.get(ticker)
+        return self.backend.get("insider_trades", ticker)
 
     def set_insider_trades(self, ticker: str, data: list[dict[str, any]]):
         """Append new insider trades to cache."""
-        self._insider_trades_cache[ticker] = self._merge_data(self._insider_trades_cache.get(ticker), data, key_field="filing_date")  # Could also use transaction_date if preferred
+        self._merge("insider_trades", ticker, data, key_field="filing_date")  # Could also use transaction_date if preferred
 
     def get_company_news(self, ticker: str) -> list[dict[str, any]] | None:
         """Get cached company news if available."""
-        return self._company_news_cache.get(ticker)
+        return self.backend.get("company_news", ticker)
 
     def set_company_news(self, ticker: str, data: list[dict[str, any]]):
         """Append new company news to cache."""
-        self._company_news_cache[ticker] = self._merge_data(self._company_news_cache.get(ticker), data, key_field="date")
+        self._merge("company_news", ticker, data, key_field="date")
+
+    def get_bars(self, key: str) -> dict[str, Any] | None:
+        """Get cached OHLCV bars ({"start", "end", "bars"}: the date range covered and its bars) if available."""
+        return self.backend.get("bars", key)
+
+    def merge_bars(self, key: str, start_date: str, end_date: str, bars: pd.DataFrame):
+        """
+        Merge bars covering [start_date, end_date] into the cached range. Ranges that
+        overlap or touch are combined; otherwise the new range replaces the cached one.
+        """
+
+        def merge(existing: dict[str, Any] | None) -> dict[str, Any]:
+            one_day = pd.Timedelta(days=1)
+            if existing is None or pd.Timestamp(start_date) > pd.Timestamp(existing["end"]) + one_day or pd.Timestamp(end_date) < pd.Timestamp(existing["start"]) - one_day:
+                return {"start": start_date, "end": end_date, "bars": bars}
+            frames = [frame for frame in (existing["bars"], bars) if not frame.empty]
+            combined = pd.concat(frames) if frames else bars
+            if not combined.empty:
+                combined = combined[~combined.index.duplicated(keep="last")].sort_index()
+            return {"start": min(start_date, existing["start"]), "end": max(end_date, existing["end"]), "bars": combined}
+
+        self.backend.update("bars", key, merge)
+
+    def get_last_price(self, key: str) -> float | None:
+        """Get a cached latest close if available."""
+        return self.backend.get("last_price", key)
+
+    def set_last_price(self, key: str, price: float):
+        """Cache the latest close as of a date."""
+        self.backend.set("last_price", key, price)
 
 
 # Global cache instance
-_cache = Cache()
+_cache = Cache(create_cache_backend())
 
 
 def get_cache() -> Cache:
     """Get the global cache instance."""
     return _cache
+
+
+def seed_cache(snapshot: Cache):
+    """
+    Replace the global cache contents with a snapshot, e.g. in a freshly started worker
+    process. A snapshot of a shared backend just reconnects to the same store.
+    """
+    _cache.__dict__.update(snapshot.__dict__)
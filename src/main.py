@@ -5,7 +5,7 @@ from langchain_core.messages import HumanMessage
 from langgraph.graph import END, StateGraph
 from colorama import Fore, Style, init
 import questionary
-from src.agents.portfolio_manager import portfolio_management_agent
+from src.agents.portfolio_manager import ALLOCATION_MODES, portfolio_management_agent
 from src.agents.risk_manager import risk_management_agent
 from src.graph.state import AgentState
 from src.utils.display import print_trading_output
@@ -15,6 +15,7 @@ from src.llm.models import LLM_ORDER, OLLAMA_LLM_ORDER, get_model_info, ModelPro
 from src.utils.ollama import ensure_ollama_and_model
 
 import argparse
+import functools
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from src.utils.visualize import save_graph_as_png
@@ -51,17 +52,14 @@ def run_hedge_fund(
     selected_analysts: list[str] = [],
     model_name: str = "gpt-4o",
     model_provider: str = "OpenAI",
+    allocation_mode: str = "llm",
 ):
     # Start progress tracking
     progress.start()
 
     try:
-        # Create a new workflow if analysts are customized
-        if selected_analysts:
-            workflow = create_workflow(selected_analysts)
-            agent = workflow.compile()
-        else:
-            agent = app
+        # Reuse the compiled workflow of this analyst selection (all analysts if none selected)
+        agent = get_compiled_workflow(selected_analysts or None)
 
         final_state = agent.invoke(
             {
@@ -81,6 +79,7 @@ def run_hedge_fund(
                     "show_reasoning": show_reasoning,
                     "model_name": model_name,
                     "model_provider": model_provider,
+                    "allocation_mode": allocation_mode,
                 },
             },
         )
@@ -94,13 +93,114 @@ def run_hedge_fund(
         progress.stop()
 
 
+def run_analysts(
+    tickers: list[str],
+    start_date: str,
+    end_date: str,
+    selected_analysts: list[str] = [],
+    model_name: str = "gpt-4o",
+    model_provider: str = "OpenAI",
+) -> dict:
+    """
+    Run only the analyst stage and return its signals.
+    Analyst signals depend on market data alone (not on the portfolio), so this
+    stage can be computed ahead of time and in parallel, e.g. by the backtester.
+    """
+    agent = get_compiled_workflow(selected_analysts or None, analysts_only=True)
+    final_state = agent.invoke(
+        {
+            "messages": [
+                HumanMessage(
+                    content="Make trading decisions based on the provided data.",
+                )
+            ],
+            "data": {
+                "tickers": tickers,
+                "portfolio": {},
+                "start_date": start_date,
+                "end_date": end_date,
+                "analyst_signals": {},
+            },
+            "metadata": {
+                "show_reasoning": False,
+                "model_name": model_name,
+                "model_provider": model_provider,
+            },
+        },
+    )
+    return final_state["data"]["analyst_signals"]
+
+
+def run_portfolio_stage(
+    tickers: list[str],
+    start_date: str,
+    end_date: str,
+    portfolio: dict,
+    analyst_signals: dict,
+    show_reasoning: bool = False,
+    model_name: str = "gpt-4o",
+    model_provider: str = "OpenAI",
+    allocation_mode: str = "llm",
+):
+    """
+    Run the portfolio-dependent stages (risk management, then portfolio management)
+    over precomputed analyst signals. Returns the same shape as run_hedge_fund.
+    """
+    state = {
+        "messages": [
+            HumanMessage(
+                content="Make trading decisions based on the provided data.",
+            )
+        ],
+        "data": {
+            "tickers": tickers,
+            "portfolio": portfolio,
+            "start_date": start_date,
+            "end_date": end_date,
+            # Copy so the risk manager does not write into the caller's signals
+            "analyst_signals": dict(analyst_signals),
+        },
+        "metadata": {
+            "show_reasoning": show_reasoning,
+            "model_name": model_name,
+            "model_provider": model_provider,
+            "allocation_mode": allocation_mode,
+        },
+    }
+    state["messages"] = risk_management_agent(state)["messages"]
+    state["messages"] = portfolio_management_agent(state)["messages"]
+
+    return {
+        "decisions": parse_hedge_fund_response(state["messages"][-1].content),
+        "analyst_signals": state["data"]["analyst_signals"],
+    }
+
+
 def start(state: AgentState):
     """Initialize the workflow with the input message."""
     return state
 
 
-def create_workflow(selected_analysts=None):
-    """Create the workflow with selected analysts."""
+def get_compiled_workflow(selected_analysts=None, analysts_only: bool = False):
+    """
+    The compiled workflow of an analyst selection. Compiled graphs hold no run state,
+    so they are memoized by the set of selected analysts and shared by every run
+    (e.g. every day of a backtest) instead of being rebuilt each time.
+    """
+    return _compile_workflow(frozenset(selected_analysts) if selected_analysts is not None else None, analysts_only)
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_workflow(selected_analysts: frozenset | None, analysts_only: bool):
+    if selected_analysts is not None:
+        # Canonical (configuration) order, so equal selections build identical graphs
+        unknown_analysts = selected_analysts - set(get_analyst_nodes())
+        selected_analysts = [key for key in get_analyst_nodes() if key in selected_analysts] + sorted(unknown_analysts)
+    return create_workflow(selected_analysts, analysts_only=analysts_only).compile()
+
+
+def create_workflow(selected_analysts=None, analysts_only: bool = False):
+    """Create the workflow with selected analysts. With analysts_only, the graph ends after the analysts."""
     workflow = StateGraph(AgentState)
     workflow.add_node("start_node", start)
 
@@ -116,6 +216,12 @@ def create_workflow(selected_analysts=None):
         workflow.add_node(node_name, node_func)
         workflow.add_edge("start_node", node_name)
 
+    if analysts_only:
+        for analyst_key in selected_analysts:
+            workflow.add_edge(analyst_nodes[analyst_key][0], END)
+        workflow.set_entry_point("start_node")
+        return workflow
+
     # Always add risk and portfolio management
     workflow.add_node("risk_management_agent", risk_management_agent)
     workflow.add_node("portfolio_manager", portfolio_management_agent)
@@ -146,6 +252,13 @@ if __name__ == "__main__":
     parser.add_argument("--show-reasoning", action="store_true", help="Show reasoning from each agent")
     parser.add_argument("--show-agent-graph", action="store_true", help="Show the agent graph")
     parser.add_argument("--ollama", action="store_true", help="Use Ollama for local LLM inference")
+    parser.add_argument(
+        "--allocation-mode",
+        type=str,
+        choices=ALLOCATION_MODES,
+        default="llm",
+        help="How the portfolio manager turns signals into orders: 'llm' (default) or 'deterministic' (confidence-weighted sizing without an LLM call)",
+    )
 
     args = parser.parse_args()
 
@@ -250,8 +363,7 @@ if __name__ == "__main__":
             print(f"\nSelected model: {Fore.GREEN + Style.BRIGHT}{model_name}{Style.RESET_ALL}\n")
 
     # Create the workflow with selected analysts
-    workflow = create_workflow(selected_analysts)
-    app = workflow.compile()
+    app = get_compiled_workflow(selected_analysts)
 
     if args.show_agent_graph:
         file_path = ""
@@ -317,5 +429,6 @@ if __name__ == "__main__":
         selected_analysts=selected_analysts,
         model_name=model_name,
         model_provider=model_provider,
+        allocation_mode=args.allocation_mode,
     )
     print_trading_output(result)
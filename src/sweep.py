@@ -0,0 +1,208 @@
+import sys
+
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import pandas as pd
+from colorama import Fore, Style, init
+from dateutil.relativedelta import relativedelta
+from pydantic import BaseModel
+from tabulate import tabulate
+
+from src.backtester import Backtester
+from src.data.cache import get_cache, seed_cache
+from src.main import run_analysts, run_hedge_fund
+from src.utils.analysts import ANALYST_CONFIG, uses_llm
+from src.utils.progress import progress
+
+init(autoreset=True)
+
+
+class SweepConfig(BaseModel):
+    """One backtest configuration of a parameter sweep."""
+
+    initial_capital: float
+    margin_requirement: float
+    selected_analysts: list[str]
+    model_name: str
+    model_provider: str
+
+
+def build_grid(
+    initial_capitals: list[float],
+    margin_requirements: list[float],
+    analyst_sets: list[list[str]],
+    models: list[tuple[str, str]],
+) -> list[SweepConfig]:
+    """Expand the parameter lists into the full cartesian grid of configurations."""
+    return [
+        SweepConfig(
+            initial_capital=initial_capital,
+            margin_requirement=margin_requirement,
+            selected_analysts=analysts,
+            model_name=model_name,
+            model_provider=model_provider,
+        )
+        for initial_capital, margin_requirement, analysts, (model_name, model_provider) in itertools.product(initial_capitals, margin_requirements, analyst_sets, models)
+    ]
+
+
+def signal_key(analyst: str, model_name: str, model_provider: str) -> tuple:
+    """
+    Key of the shared signal cache. Signals of analysts that do not call an LLM
+    are identical for every model, so the model is left out of their key.
+    """
+    if not uses_llm(analyst):
+        return (analyst, None, None)
+    return (analyst, model_name, model_provider)
+
+
+def _compute_analyst_signals(tickers: list[str], trading_dates: list[str], analyst: str, model_name: str, model_provider: str) -> dict[str, dict]:
+    """Compute one analyst's signals for every trading date (runs in a worker process)."""
+    progress.set_headless()
+    signals_by_date = {}
+    for current_date_str in trading_dates:
+        lookback_start = (datetime.strptime(current_date_str, "%Y-%m-%d") - timedelta(days=30)).strftime("%Y-%m-%d")
+        signals_by_date[current_date_str] = run_analysts(
+            tickers=tickers,
+            start_date=lookback_start,
+            end_date=current_date_str,
+            selected_analysts=[analyst],
+            model_name=model_name,
+            model_provider=model_provider,
+        )
+    return signals_by_date
+
+
+def _run_config(config: SweepConfig, tickers: list[str], start_date: str, end_date: str, price_matrix: pd.DataFrame, signals_by_date: dict[str, dict]) -> dict:
+    """Replay the portfolio stages of one configuration over shared data and signals (runs in a worker process)."""
+    backtester = Backtester(
+        agent=run_hedge_fund,
+        tickers=tickers,
+        start_date=start_date,
+        end_date=end_date,
+        initial_capital=config.initial_capital,
+        model_name=config.model_name,
+        model_provider=config.model_provider,
+        selected_analysts=config.selected_analysts,
+        initial_margin_requirement=config.margin_requirement,
+        analyst_signals=signals_by_date,
+        verbose=False,
+        headless=True,
+    )
+    backtester.price_matrix = price_matrix
+    performance_metrics = backtester.run_backtest(prefetch=False)
+
+    final_value = backtester.portfolio_values[-1]["Portfolio Value"] if backtester.portfolio_values else config.initial_capital
+    return {
+        "Analysts": ",".join(config.selected_analysts),
+        "Model": f"{config.model_provider}:{config.model_name}",
+        "Initial Capital": config.initial_capital,
+        "Margin Requirement": config.margin_requirement,
+        "Final Value": final_value,
+        "Total Return %": (final_value / config.initial_capital - 1) * 100,
+        "Sharpe Ratio": performance_metrics.get("sharpe_ratio"),
+        "Sortino Ratio": performance_metrics.get("sortino_ratio"),
+        "Max Drawdown %": performance_metrics.get("max_drawdown"),
+    }
+
+
+def run_sweep(
+    tickers: list[str],
+    start_date: str,
+    end_date: str,
+    configs: list[SweepConfig],
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    """
+    Run every configuration of a sweep and return one comparison table.
+
+    Data is fetched once and shared with all workers. Analyst signals are computed
+    once per (analyst, model) and shared by every configuration that uses them, so
+    capital and margin variations only replay the portfolio stages.
+    """
+    if not configs:
+        return pd.DataFrame()
+
+    # 1) Fetch all data once
+    loader = Backtester(agent=run_hedge_fund, tickers=tickers, start_date=start_date, end_date=end_date, initial_capital=configs[0].initial_capital, verbose=False)
+    loader.prefetch_data()
+    trading_dates = loader.get_trading_dates()
+
+    # 2) Compute each distinct analyst/model combination's signals once
+    signal_jobs = {}
+    for config in configs:
+        for analyst in config.selected_analysts:
+            signal_jobs.setdefault(signal_key(analyst, config.model_name, config.model_provider), (analyst, config.model_name, config.model_provider))
+
+    print(f"\nComputing signals for {len(signal_jobs)} analyst/model combinations shared by {len(configs)} configurations...")
+    signal_cache = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=seed_cache, initargs=(get_cache(),)) as executor:
+        futures = {executor.submit(_compute_analyst_signals, tickers, trading_dates, *job): key for key, job in signal_jobs.items()}
+        for future in as_completed(futures):
+            signal_cache[futures[future]] = future.result()
+
+    # 3) Replay the portfolio stages of every configuration in parallel
+    print(f"Running {len(configs)} configurations...")
+    rows = []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=seed_cache, initargs=(get_cache(),)) as executor:
+        futures = []
+        for config in configs:
+            keys = [signal_key(analyst, config.model_name, config.model_provider) for analyst in config.selected_analysts]
+            signals_by_date = {date: {agent: signals for key in keys for agent, signals in signal_cache[key].get(date, {}).items()} for date in trading_dates}
+            futures.append(executor.submit(_run_config, config, tickers, start_date, end_date, loader.price_matrix, signals_by_date))
+
+        for future in as_completed(futures):
+            rows.append(future.result())
+
+    return pd.DataFrame(rows).sort_values("Sharpe Ratio", ascending=False, na_position="last").reset_index(drop=True)
+
+
+def parse_list(value: str, cast=str) -> list:
+    """Parse a comma-separated CLI value."""
+    return [cast(item.strip()) for item in value.split(",") if item.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a parameter sweep over backtest configurations")
+    parser.add_argument("--tickers", type=str, required=True, help="Comma-separated list of stock ticker symbols")
+    parser.add_argument("--end-date", type=str, default=datetime.now().strftime("%Y-%m-%d"), help="End date in YYYY-MM-DD format")
+    parser.add_argument("--start-date", type=str, default=(datetime.now() - relativedelta(months=1)).strftime("%Y-%m-%d"), help="Start date in YYYY-MM-DD format")
+    parser.add_argument("--initial-capitals", type=str, default="100000", help="Comma-separated initial capital values (default: 100000)")
+    parser.add_argument("--margin-requirements", type=str, default="0.0", help="Comma-separated margin ratios (default: 0.0)")
+    parser.add_argument("--analyst-sets", type=str, required=True, help="Semicolon-separated analyst subsets, each comma-separated (e.g. 'warren_buffett,technical_analyst;ben_graham')")
+    parser.add_argument("--models", type=str, default="gpt-4o:OpenAI", help="Semicolon-separated model_name:provider pairs (default: gpt-4o:OpenAI)")
+    parser.add_argument("--max-workers", type=int, default=None, help="Maximum number of worker processes (default: CPU count)")
+    parser.add_argument("--output", type=str, default="sweep_results.csv", help="Path of the comparison table CSV (default: sweep_results.csv)")
+
+    args = parser.parse_args()
+
+    analyst_sets = [parse_list(analyst_set) for analyst_set in args.analyst_sets.split(";") if analyst_set.strip()]
+    unknown_analysts = {analyst for analyst_set in analyst_sets for analyst in analyst_set if analyst not in ANALYST_CONFIG}
+    if unknown_analysts:
+        print(f"{Fore.RED}Unknown analysts: {', '.join(sorted(unknown_analysts))}{Style.RESET_ALL}")
+        sys.exit(1)
+
+    models = [tuple(model.strip().rsplit(":", 1)) for model in args.models.split(";") if model.strip()]
+
+    configs = build_grid(
+        initial_capitals=parse_list(args.initial_capitals, float),
+        margin_requirements=parse_list(args.margin_requirements, float),
+        analyst_sets=analyst_sets,
+        models=models,
+    )
+
+    results = run_sweep(
+        tickers=parse_list(args.tickers),
+        start_date=args.start_date,
+        end_date=args.end_date,
+        configs=configs,
+        max_workers=args.max_workers,
+    )
+
+    print(f"\n{Fore.WHITE}{Style.BRIGHT}SWEEP RESULTS:{Style.RESET_ALL}")
+    print(tabulate(results, headers="keys", tablefmt="grid", floatfmt=".2f", showindex=False))
+    results.to_csv(args.output, index=False)
+    print(f"\nResults written to {args.output}")
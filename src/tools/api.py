@@ -21,6 +21,9 @@ from src.data.models import (
 # Global cache instance
 _cache = get_cache()
 
+# Calendar days fetched by get_last_price, enough to span weekends and holidays
+LAST_PRICE_LOOKBACK_DAYS = 14
+
 
 def get_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
     """Fetch price data from cache or API."""
@@ -29,7 +32,9 @@ def get_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
     
     # Check cache first - simple exact match
     if cached_data := _cache.get_prices(cache_key):
-        return [Price(**price) for price in cached_data]
+        prices = [Price(**price) for price in cached_data]
+        _cache_last_price(ticker, end_date, prices)
+        return prices
 
     # If not in cache, fetch from API
     headers = {}
@@ -50,9 +55,31 @@ def get_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
 
     # Cache the results using the comprehensive cache key
     _cache.set_prices(cache_key, [p.model_dump() for p in prices])
+    _cache_last_price(ticker, end_date, prices)
     return prices
 
 
+def get_last_price(ticker: str, end_date: str) -> float | None:
+    """
+    Get the latest close on or before end_date. Served from the cache when any
+    price request ending on end_date has already been made; otherwise only the
+    last couple of weeks are fetched.
+    """
+    cache_key = f"{ticker}_{end_date}"
+    if (cached_price := _cache.get_last_price(cache_key)) is not None:
+        return cached_price
+
+    start_date = (datetime.datetime.strptime(end_date, "%Y-%m-%d") - datetime.timedelta(days=LAST_PRICE_LOOKBACK_DAYS)).strftime("%Y-%m-%d")
+    get_prices(ticker, start_date, end_date)
+    return _cache.get_last_price(cache_key)
+
+
+def _cache_last_price(ticker: str, end_date: str, prices: list[Price]):
+    """Remember the latest close of a price response for get_last_price."""
+    if prices:
+        _cache.set_last_price(f"{ticker}_{end_date}", float(max(prices, key=lambda price: price.time).close))
+
+
 def get_financial_metrics(
     ticker: str,
     end_date: str,
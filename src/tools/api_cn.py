@@ -22,6 +22,9 @@ from src.data.models import (
 # Global cache instance
 _cache = get_cache()
 
+# Calendar days fetched by get_last_price, enough to span weekends and holidays (e.g. Golden Week)
+LAST_PRICE_LOOKBACK_DAYS = 14
+
 def normalize_field_name(field_name: str) -> str:
     """Normalize field names by removing special characters and converting to uppercase."""
     # Remove special characters and spaces
@@ -58,6 +61,9 @@ def get_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
         start_date_fmt = start_date.replace('-', '')
         end_date_fmt = end_date.replace('-', '')
         df = ak.stock_zh_a_hist(symbol=stock_code, start_date=start_date_fmt, end_date=end_date_fmt, adjust="qfq")
+        if df is None or df.empty:
+            # No trading days in the range
+            return []
         print("[DEBUG] stock_zh_a_hist columns:", df.columns)
         print("[DEBUG] stock_zh_a_hist head:\n", df.head())
         
@@ -99,10 +105,32 @@ def get_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
                 time=date_str  # 使用相同的日期字符串
             )
             prices.append(price)
+        _cache_last_price(ticker, end_date, prices)
         return prices
     except Exception as e:
-        print(f"Error fetching prices for {ticker}: {str(e)}")
-        return []
+        # Raise like the US data source, so a failed fetch is not mistaken for a range without trading days
+        raise Exception(f"Error fetching prices for {ticker}: {str(e)}") from e
+
+
+def get_last_price(ticker: str, end_date: str) -> float | None:
+    """
+    Get the latest close on or before end_date. Served from the cache when any
+    price request ending on end_date has already been made; otherwise only the
+    last couple of weeks are fetched.
+    """
+    cache_key = f"{ticker}_{end_date}"
+    if (cached_price := _cache.get_last_price(cache_key)) is not None:
+        return cached_price
+
+    start_date = (datetime.datetime.strptime(end_date, "%Y-%m-%d") - datetime.timedelta(days=LAST_PRICE_LOOKBACK_DAYS)).strftime("%Y-%m-%d")
+    get_prices(ticker, start_date, end_date)
+    return _cache.get_last_price(cache_key)
+
+
+def _cache_last_price(ticker: str, end_date: str, prices: list[Price]):
+    """Remember the latest close of a price response for get_last_price."""
+    if prices:
+        _cache.set_last_price(f"{ticker}_{end_date}", float(max(prices, key=lambda price: price.time).close))
 
 
 def get_financial_metrics(ticker: str, end_date: str, period: str = "annual", limit: int = 5) -> list[FinancialMetrics]:
@@ -1,6 +1,8 @@
 from typing import TYPE_CHECKING, Any
 import importlib
 
+from src.utils.cancellation import check_cancelled
+
 if TYPE_CHECKING:
     from src.tools import api, api_cn
 
@@ -29,7 +31,8 @@ class APIProxy:
 
 # Create a function to get the API proxy
 def get_api(ticker: str) -> APIProxy:
-    """Get an API proxy for the given ticker."""
+    """Get an API proxy for the given ticker (raises RunCancelled once the current run is cancelled)."""
+    check_cancelled()
     return APIProxy(ticker)
 
 # Export commonly used functions for convenience
@@ -37,6 +40,10 @@ def get_prices(ticker: str, *args, **kwargs):
     """Get prices using the appropriate API."""
     return get_api(ticker).get_prices(ticker, *args, **kwargs)
 
+def get_last_price(ticker: str, *args, **kwargs):
+    """Get the latest close using the appropriate API."""
+    return get_api(ticker).get_last_price(ticker, *args, **kwargs)
+
 def get_financial_metrics(ticker: str, *args, **kwargs):
     """Get financial metrics using the appropriate API."""
     return get_api(ticker).get_financial_metrics(ticker, *args, **kwargs)
@@ -0,0 +1,101 @@
+"""Multi-resolution OHLCV bars derived from daily prices."""
+
+from datetime import date, timedelta
+
+import pandas as pd
+
+from src.data.cache import get_cache
+from src.tools.api_router import get_prices, prices_to_df
+
+# Supported bar resolutions and the calendar periods daily bars are grouped into
+RESOLUTIONS = {
+    "day": None,
+    "week": "W-FRI",
+    "month": "M",
+}
+
+# Global cache instance
+_cache = get_cache()
+
+
+def resample_bars(prices_df: pd.DataFrame, resolution: str) -> pd.DataFrame:
+    """
+    Aggregate daily OHLCV bars into weekly or monthly bars: first open, highest high,
+    lowest low, last close and total volume of each period. Every bar is stamped with
+    the last trading day it contains, so a bar never carries a date later than the
+    data it was built from (the latest period may be incomplete).
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unsupported resolution: {resolution}. Choose from {', '.join(RESOLUTIONS)}")
+    if RESOLUTIONS[resolution] is None or prices_df.empty:
+        return prices_df
+
+    periods = prices_df.index.to_period(RESOLUTIONS[resolution])
+    grouped = prices_df.groupby(periods, sort=True)
+    bars = grouped.agg(open=("open", "first"), high=("high", "max"), low=("low", "min"), close=("close", "last"), volume=("volume", "sum"))
+    bars.index = pd.DatetimeIndex(prices_df.index.to_series().groupby(periods, sort=True).max().to_numpy(), name=prices_df.index.name)
+    return bars
+
+
+def get_bars(ticker: str, start_date: str, end_date: str, resolution: str = "day") -> pd.DataFrame:
+    """
+    Get OHLCV bars of the given resolution as a DataFrame (the format of prices_to_df).
+    Daily bars are cached per ticker as one contiguous date range that grows with every
+    request, so a window inside it is a slice and a window sliding forward (a backtest
+    day, the next live run) only downloads the days it adds. Weekly and monthly bars
+    are aggregated from the daily slice.
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unsupported resolution: {resolution}. Choose from {', '.join(RESOLUTIONS)}")
+    return resample_bars(_get_daily_bars(ticker, start_date, end_date), resolution)
+
+
+def _get_daily_bars(ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
+    cache_key = f"{ticker}_day"
+    cached = _cache.get_bars(cache_key)
+
+    # Only fetch the parts of the window outside the cached range; a window that does
+    # not touch the cached range replaces it
+    if cached is not None and start_date <= _shift(cached["end"], 1) and end_date >= _shift(cached["start"], -1):
+        frames = [cached["bars"]]
+        missing = []
+        if start_date < cached["start"]:
+            missing.append((start_date, _shift(cached["start"], -1)))
+        if end_date > cached["end"]:
+            missing.append((_shift(cached["end"], 1), end_date))
+        covered = (cached["start"], cached["end"])
+    else:
+        frames = []
+        missing = [(start_date, end_date)]
+        covered = None
+
+    if not missing:
+        bars = cached["bars"]
+    else:
+        # The cached range only grows by the parts whose fetch returned bars; a part
+        # without bars is fetched again next time (fetch errors raise instead)
+        fetched_bars = False
+        for fetch_start, fetch_end in missing:
+            prices = get_prices(ticker, fetch_start, fetch_end)
+            if not prices:
+                continue
+            frames.append(prices_to_df(prices))
+            covered = (min(covered[0], fetch_start), max(covered[1], fetch_end)) if covered else (fetch_start, fetch_end)
+            fetched_bars = True
+        frames = [frame for frame in frames if not frame.empty]
+        bars = pd.concat(frames) if frames else pd.DataFrame()
+        if not bars.empty:
+            bars = bars[~bars.index.duplicated(keep="last")].sort_index()
+
+        if fetched_bars:
+            # Today's bar may still change, so the cached range ends yesterday at the latest
+            range_start, range_end = covered[0], min(covered[1], _shift(date.today().isoformat(), -1))
+            if range_start <= range_end:
+                _cache.merge_bars(cache_key, range_start, range_end, bars)
+
+    # A copy, so callers adding columns never modify the cached bars
+    return bars.loc[start_date:end_date].copy() if not bars.empty else bars
+
+
+def _shift(date_str: str, days: int) -> str:
+    return (pd.Timestamp(date_str) + timedelta(days=days)).strftime("%Y-%m-%d")
@@ -21,76 +21,91 @@ ANALYST_CONFIG = {
     "aswath_damodaran": {
         "display_name": "Aswath Damodaran",
         "agent_func": aswath_damodaran_agent,
+        "uses_llm": True,
         "order": 0,
     },
     "ben_graham": {
         "display_name": "Ben Graham",
         "agent_func": ben_graham_agent,
+        "uses_llm": True,
         "order": 1,
     },
     "bill_ackman": {
         "display_name": "Bill Ackman",
         "agent_func": bill_ackman_agent,
+        "uses_llm": True,
         "order": 2,
     },
     "cathie_wood": {
         "display_name": "Cathie Wood",
         "agent_func": cathie_wood_agent,
+        "uses_llm": True,
         "order": 3,
     },
     "charlie_munger": {
         "display_name": "Charlie Munger",
         "agent_func": charlie_munger_agent,
+        "uses_llm": True,
         "order": 4,
     },
     "michael_burry": {
         "display_name": "Michael Burry",
         "agent_func": michael_burry_agent,
+        "uses_llm": True,
         "order": 5,
     },
     "peter_lynch": {
         "display_name": "Peter Lynch",
         "agent_func": peter_lynch_agent,
+        "uses_llm": True,
         "order": 6,
     },
     "phil_fisher": {
         "display_name": "Phil Fisher",
         "agent_func": phil_fisher_agent,
+        "uses_llm": True,
         "order": 7,
     },
     "rakesh_jhunjhunwala": {
         "display_name": "Rakesh Jhunjhunwala",
         "agent_func": rakesh_jhunjhunwala_agent,
+        "uses_llm": True,
         "order": 8,
     },
     "stanley_druckenmiller": {
         "display_name": "Stanley Druckenmiller",
         "agent_func": stanley_druckenmiller_agent,
+        "uses_llm": True,
         "order": 9,
     },
     "warren_buffett": {
         "display_name": "Warren Buffett",
         "agent_func": warren_buffett_agent,
+        "uses_llm": True,
         "order": 10,
     },
     "technical_analyst": {
         "display_name": "Technical Analyst",
         "agent_func": technical_analyst_agent,
+        "uses_llm": False,
         "order": 11,
     },
     "fundamentals_analyst": {
         "display_name": "Fundamentals Analyst",
         "agent_func": fundamentals_analyst_agent,
+        "uses_llm": False,
         "order": 12,
     },
     "sentiment_analyst": {
         "display_name": "Sentiment Analyst",
         "agent_func": sentiment_analyst_agent,
+        "uses_llm": False,
         "order": 13,
     },
     "valuation_analyst": {
         "display_name": "Valuation Analyst",
         "agent_func": valuation_analyst_agent,
+        "uses_llm": False,
         "order": 14,
     },
 }
@@ -99,6 +114,20 @@ ANALYST_CONFIG = {
 ANALYST_ORDER = [(config["display_name"], key) for key, config in sorted(ANALYST_CONFIG.items(), key=lambda x: x[1]["order"])]
 
 
+def uses_llm(analyst_key: str) -> bool:
+    """Whether the analyst calls an LLM (its signals then depend on the selected model)."""
+    return ANALYST_CONFIG[analyst_key].get("uses_llm", True)
+
+
+# Candidates a staged screen passes on to the LLM analysts by default
+DEFAULT_TOP_K = 20
+
+
+def screening_analysts() -> list[str]:
+    """The analysts that do not call an LLM (fast enough to run over a whole market)."""
+    return [key for key in ANALYST_CONFIG if not uses_llm(key)]
+
+
 def get_analyst_nodes():
     """Get the mapping of analyst keys to their (node_name, agent_func) tuples."""
     return {key: (f"{key}_agent", config["agent_func"]) for key, config in ANALYST_CONFIG.items()}
@@ -0,0 +1,51 @@
+"""Cooperative cancellation of hedge fund runs."""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+class RunCancelled(BaseException):
+    """
+    Raised inside a run once its cancellation token is set. Like asyncio.CancelledError it
+    derives from BaseException, so the agents' broad `except Exception` handlers (which
+    fall back to defaults and carry on) do not swallow it.
+    """
+
+
+class CancellationToken:
+    """A flag that can be set from any thread to ask a run to stop."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+# Token of the run executing in the current context (inherited by the threads and tasks it starts)
+_current_token: ContextVar[CancellationToken | None] = ContextVar("cancellation_token", default=None)
+
+
+@contextmanager
+def cancellation_scope(token: CancellationToken):
+    """Make check_cancelled() in this context raise RunCancelled once token is cancelled."""
+    reset_token = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset_token)
+
+
+def check_cancelled():
+    """
+    Raise RunCancelled if the current run has been cancelled. Called by the agents between
+    tickers and before every LLM call and data fetch; a no-op outside a cancellation scope.
+    """
+    token = _current_token.get()
+    if token is not None and token.cancelled:
+        raise RunCancelled()
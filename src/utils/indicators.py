@@ -0,0 +1,396 @@
+"""
+Vectorized technical indicator kernels.
+
+All kernels operate along axis 0 (time) of float64 arrays, so the same code runs on a
+single series of shape (T,) or on a bars x tickers panel of shape (T, N). Panels are
+right-aligned: row -1 holds every ticker's latest bar and shorter histories are
+NaN-padded at the top, which makes every indicator identical to computing it on each
+ticker's own DataFrame.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+PANEL_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def build_price_panel(price_frames: dict[str, pd.DataFrame], fields: tuple[str, ...] = PANEL_FIELDS) -> dict[str, np.ndarray]:
+    """
+    Stack per-ticker price DataFrames into right-aligned (T, N) float64 arrays, one per field.
+    Columns follow the order of price_frames.
+    """
+    lengths = [len(df) for df in price_frames.values()]
+    n_bars = max(lengths, default=0)
+    panel = {field: np.full((n_bars, len(lengths)), np.nan) for field in fields}
+    for column, df in enumerate(price_frames.values()):
+        if len(df) == 0:
+            continue
+        for field in fields:
+            panel[field][n_bars - len(df) :, column] = df[field].to_numpy(dtype=float)
+    return panel
+
+
+def shift(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Shift forward along time, filling the first rows with NaN."""
+    shifted = np.full_like(x, np.nan)
+    if periods < len(x):
+        shifted[periods:] = x[:-periods]
+    return shifted
+
+
+def pct_change(x: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return x / shift(x) - 1
+
+
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    """Recursive EMA, equivalent to pandas ewm(span=span, adjust=False).mean()."""
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty_like(x)
+    prev = np.full(x.shape[1:], np.nan)
+    for t in range(len(x)):
+        prev = np.where(np.isnan(prev), x[t], (1 - alpha) * prev + alpha * x[t])
+        out[t] = prev
+    return out
+
+
+def ewm_mean(x: np.ndarray, span: int) -> np.ndarray:
+    """Bias-adjusted EWM mean skipping NaNs, equivalent to pandas ewm(span=span).mean()."""
+    decay = 1.0 - 2.0 / (span + 1.0)
+    out = np.empty_like(x)
+    num = np.zeros(x.shape[1:])
+    den = np.zeros(x.shape[1:])
+    for t in range(len(x)):
+        valid = ~np.isnan(x[t])
+        num = decay * num + np.where(valid, x[t], 0.0)
+        den = decay * den + valid
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[t] = np.where(den > 0, num / den, np.nan)
+    return out
+
+
+def last_window(x: np.ndarray, window: int) -> np.ndarray:
+    """The last `window` rows, NaN-padded at the top when the series is shorter."""
+    if len(x) >= window:
+        return x[len(x) - window :]
+    pad = np.full((window - len(x),) + x.shape[1:], np.nan)
+    return np.concatenate([pad, x])
+
+
+def rolling_tail(x: np.ndarray, window: int, length: int) -> np.ndarray:
+    """
+    The last `length` rolling windows of size `window`, shape (length, ..., window).
+    Windows overlapping missing history contain NaN, like pandas' min_periods=window.
+    """
+    return sliding_window_view(last_window(x, length + window - 1), window, axis=0)
+
+
+def rolling_mean_last(x: np.ndarray, window: int) -> np.ndarray:
+    return last_window(x, window).mean(axis=0)
+
+
+def rolling_sum_last(x: np.ndarray, window: int) -> np.ndarray:
+    return last_window(x, window).sum(axis=0)
+
+
+def rolling_std_last(x: np.ndarray, window: int) -> np.ndarray:
+    return last_window(x, window).std(axis=0, ddof=1)
+
+
+def rolling_skew_last(x: np.ndarray, window: int) -> np.ndarray:
+    """Bias-corrected sample skewness of the last window, as pandas rolling().skew()."""
+    values = last_window(x, window)
+    n = float(window)
+    deviations = values - values.mean(axis=0)
+    m2 = (deviations**2).mean(axis=0)
+    m3 = (deviations**3).mean(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        skew = np.sqrt(n * (n - 1)) / (n - 2) * m3 / m2**1.5
+    return np.where(m2 <= 1e-14, np.nan, skew)
+
+
+def rolling_kurt_last(x: np.ndarray, window: int) -> np.ndarray:
+    """Bias-corrected sample excess kurtosis of the last window, as pandas rolling().kurt()."""
+    values = last_window(x, window)
+    n = float(window)
+    deviations = values - values.mean(axis=0)
+    m2 = (deviations**2).mean(axis=0)
+    m4 = (deviations**4).mean(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kurt = ((n + 1) * n * (n - 1) * m4 / (n * m2**2) - 3 * (n - 1) ** 2) / ((n - 2) * (n - 3))
+    return np.where(m2 <= 1e-14, np.nan, kurt)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range; the first bar (without a previous close) uses high - low."""
+    prev_close = shift(close)
+    return np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+
+def directional_movement(high: np.ndarray, low: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """+DM and -DM; zero on the first bar, NaN where there is no bar."""
+    up_move = high - shift(high)
+    down_move = shift(low) - low
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    missing = np.isnan(high)
+    plus_dm[missing] = np.nan
+    minus_dm[missing] = np.nan
+    return plus_dm, minus_dm
+
+
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14, tr: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ADX, +DI and -DI series. Pass `tr` to reuse an already computed true range."""
+    if tr is None:
+        tr = true_range(high, low, close)
+    tr = ewm_mean(tr, period)
+    plus_dm, minus_dm = directional_movement(high, low)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = 100 * (ewm_mean(plus_dm, period) / tr)
+        minus_di = 100 * (ewm_mean(minus_dm, period) / tr)
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    return ewm_mean(dx, period), plus_di, minus_di
+
+
+def rsi_last(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Simple-average RSI of the last bar."""
+    delta = close - shift(close)
+    missing = np.isnan(close)
+    gain = np.where(missing, np.nan, np.where(delta > 0, delta, 0.0))
+    loss = np.where(missing, np.nan, np.where(delta < 0, -delta, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = rolling_mean_last(gain, period) / rolling_mean_last(loss, period)
+        return 100 - (100 / (1 + rs))
+
+
+def _hurst_fit(lags: np.ndarray, tau: np.ndarray) -> np.ndarray:
+    """Least-squares slope of log(tau) over log(lag) along axis 0, for all series at once."""
+    log_lags = np.log(lags) - np.log(lags).mean()
+    log_tau = np.log(tau)
+    log_tau = log_tau - log_tau.mean(axis=0)
+    slope = np.tensordot(log_lags, log_tau, axes=(0, 0)) / (log_lags**2).sum()
+    return np.where(np.isnan(slope), 0.5, slope)
+
+
+def hurst_exponent(close: np.ndarray, max_lag: int = 20) -> np.ndarray:
+    """
+    Hurst exponent from the slope of log(sqrt(std of lag differences)) over log(lag).
+    Lags without any difference (series too short) contribute the 1e-8 floor.
+
+    The differences of all lags are taken at once from a strided view of the
+    NaN-padded series (no copies per lag), followed by a single linear fit.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    lags = np.arange(2, max_lag)
+    padded = np.concatenate([close, np.full((max_lag,) + close.shape[1:], np.nan)])
+    # leads[i][t] = close[t + lags[i]], NaN past the end of the series
+    leads = np.moveaxis(sliding_window_view(padded, len(close), axis=0), -1, 1)[lags]
+    diffs = leads - close
+
+    valid = ~np.isnan(diffs)
+    count = valid.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(valid, diffs, 0.0).sum(axis=1) / count
+        std = np.sqrt(np.where(valid, (diffs - mean[:, None]) ** 2, 0.0).sum(axis=1) / count)
+    tau = np.where(count > 0, np.maximum(1e-8, np.sqrt(std)), 1e-8)
+    return _hurst_fit(lags, tau)
+
+
+class OnlineEwm:
+    """
+    Exponentially weighted mean advanced one value at a time. Matches ema() with
+    adjust=False and ewm_mean() (bias-adjusted, NaN-skipping) with adjust=True.
+    """
+
+    def __init__(self, span: int, adjust: bool = True):
+        self.span = span
+        self.adjust = adjust
+        self.decay = 1.0 - 2.0 / (span + 1.0)
+        self.num = 0.0
+        self.den = 0.0
+        self.value = math.nan
+
+    def push(self, value: float) -> float:
+        value = float(value)
+        if self.adjust:
+            valid = not math.isnan(value)
+            self.num = self.decay * self.num + (value if valid else 0.0)
+            self.den = self.decay * self.den + valid
+            self.value = self.num / self.den if self.den > 0 else math.nan
+        elif math.isnan(self.value):
+            self.value = value
+        else:
+            self.value = self.decay * self.value + (1 - self.decay) * value
+        return self.value
+
+    def to_dict(self) -> dict:
+        return {"span": self.span, "adjust": self.adjust, "num": self.num, "den": self.den, "value": self.value}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "OnlineEwm":
+        ewm = cls(data["span"], data["adjust"])
+        ewm.num, ewm.den, ewm.value = data["num"], data["den"], data["value"]
+        return ewm
+
+
+class RollingMoments:
+    """
+    Mean, standard deviation, skewness and excess kurtosis of the last `window` values,
+    advanced one value at a time in O(1) from running power sums. The sums are rebuilt
+    from the window (around its mean) every `window` updates to bound floating-point
+    drift. Statistics are NaN until the window holds `window` non-NaN values, matching
+    pandas' rolling(window) with the default min_periods.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self._center = 0.0
+        self._sums = [0.0, 0.0, 0.0, 0.0]
+        self._nan_count = 0
+        self._since_rebuild = 0
+
+    def push(self, value: float):
+        value = float(value)
+        if len(self.values) == self.window:
+            self._remove(self.values[0])
+        self.values.append(value)
+        self._add(value)
+
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.window:
+            self._rebuild()
+
+    def _add(self, value: float, sign: float = 1.0):
+        if math.isnan(value):
+            self._nan_count += 1 if sign > 0 else -1
+            return
+        d = value - self._center
+        self._sums[0] += sign * d
+        self._sums[1] += sign * d * d
+        self._sums[2] += sign * d * d * d
+        self._sums[3] += sign * d * d * d * d
+
+    def _remove(self, value: float):
+        self._add(value, -1.0)
+
+    def _rebuild(self):
+        valid = [value for value in self.values if not math.isnan(value)]
+        self._center = sum(valid) / len(valid) if valid else 0.0
+        self._sums = [0.0, 0.0, 0.0, 0.0]
+        self._nan_count = 0
+        for value in self.values:
+            self._add(value)
+        self._since_rebuild = 0
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.window and self._nan_count == 0
+
+    def to_dict(self) -> dict:
+        return {"window": self.window, "values": list(self.values)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RollingMoments":
+        moments = cls(data["window"])
+        moments.values.extend(float(value) for value in data["values"])
+        moments._rebuild()
+        return moments
+
+    def _central_moments(self) -> tuple[float, float, float, float]:
+        n = self.window
+        s1, s2, s3, s4 = (total / n for total in self._sums)
+        m2 = max(s2 - s1 * s1, 0.0)
+        m3 = s3 - 3 * s1 * s2 + 2 * s1**3
+        m4 = s4 - 4 * s1 * s3 + 6 * s1 * s1 * s2 - 3 * s1**4
+        return self._center + s1, m2, m3, m4
+
+    def mean(self) -> float:
+        return self._central_moments()[0] if self.ready else math.nan
+
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1)."""
+        if not self.ready:
+            return math.nan
+        return math.sqrt(self._central_moments()[1] * self.window / (self.window - 1))
+
+    def skew(self) -> float:
+        """Bias-corrected sample skewness, as pandas rolling().skew()."""
+        if not self.ready:
+            return math.nan
+        n = self.window
+        _, m2, m3, _ = self._central_moments()
+        if m2 <= 1e-14:
+            return math.nan
+        return math.sqrt(n * (n - 1)) / (n - 2) * m3 / m2**1.5
+
+    def kurt(self) -> float:
+        """Bias-corrected sample excess kurtosis, as pandas rolling().kurt()."""
+        if not self.ready:
+            return math.nan
+        n = self.window
+        _, m2, _, m4 = self._central_moments()
+        if m2 <= 1e-14:
+            return math.nan
+        return ((n + 1) * n * (n - 1) * m4 / (n * m2**2) - 3 * (n - 1) ** 2) / ((n - 2) * (n - 3))
+
+
+class IncrementalHurst:
+    """
+    Hurst exponent of a growing price series, advanced one bar at a time.
+    Each new bar adds one difference per lag to running (Welford) statistics, so an
+    update costs O(max_lag) instead of recomputing every lag over the full history.
+    Matches hurst_exponent() on the series pushed so far.
+    """
+
+    def __init__(self, max_lag: int = 20):
+        self.lags = np.arange(2, max_lag)
+        self._recent = deque(maxlen=max_lag - 1)
+        self._count = np.zeros(len(self.lags))
+        self._mean = np.zeros(len(self.lags))
+        self._m2 = np.zeros(len(self.lags))
+
+    def push(self, price: float):
+        price = float(price)
+        available = self.lags[self.lags <= len(self._recent)]
+        if len(available) > 0 and not math.isnan(price):
+            recent = np.array(self._recent)
+            diffs = price - recent[len(recent) - available]
+            valid = ~np.isnan(diffs)
+            idx = available[valid] - 2
+            diffs = diffs[valid]
+
+            self._count[idx] += 1
+            delta = diffs - self._mean[idx]
+            self._mean[idx] += delta / self._count[idx]
+            self._m2[idx] += delta * (diffs - self._mean[idx])
+        self._recent.append(price)
+
+    def to_dict(self) -> dict:
+        return {
+            "max_lag": int(self.lags[-1]) + 1,
+            "recent": list(self._recent),
+            "count": self._count.tolist(),
+            "mean": self._mean.tolist(),
+            "m2": self._m2.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IncrementalHurst":
+        hurst = cls(data["max_lag"])
+        hurst._recent.extend(float(price) for price in data["recent"])
+        hurst._count = np.array(data["count"], dtype=np.float64)
+        hurst._mean = np.array(data["mean"], dtype=np.float64)
+        hurst._m2 = np.array(data["m2"], dtype=np.float64)
+        return hurst
+
+    def value(self) -> float:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std = np.sqrt(self._m2 / self._count)
+        tau = np.where(self._count > 0, np.maximum(1e-8, np.sqrt(std)), 1e-8)
+        return float(_hurst_fit(self.lags, tau))
@@ -0,0 +1,194 @@
+"""Array-backed portfolio ledger used by the backtester."""
+
+import numpy as np
+
+# Structured record of one executed trade
+TRADE_DTYPE = np.dtype(
+    [
+        ("date", "datetime64[D]"),
+        ("ticker_id", np.int32),
+        ("action", "U5"),
+        ("quantity", np.int64),
+        ("price", np.float64),
+    ]
+)
+
+
+class PortfolioLedger:
+    """
+    Long/short portfolio whose per-ticker state lives in NumPy arrays indexed by ticker id.
+    Marking to market and exposure sums are single vector operations, and executed
+    trades are appended to a preallocated structured array. `to_dict` returns the
+    nested-dict view of the portfolio that the agents (and LLM prompts) expect.
+    """
+
+    def __init__(self, tickers: list[str], cash: float, margin_requirement: float = 0.0, trade_capacity: int = 1024):
+        self.tickers = list(tickers)
+        self.ticker_ids = {ticker: idx for idx, ticker in enumerate(self.tickers)}
+        self.cash = float(cash)
+        self.margin_used = 0.0  # total margin usage across all short positions
+        self.margin_requirement = margin_requirement  # The margin ratio required for shorts
+
+        n = len(self.tickers)
+        self.long = np.zeros(n, dtype=np.int64)  # Number of shares held long
+        self.short = np.zeros(n, dtype=np.int64)  # Number of shares held short
+        self.long_cost_basis = np.zeros(n)  # Average cost basis per share (long)
+        self.short_cost_basis = np.zeros(n)  # Average cost basis per share (short)
+        self.short_margin_used = np.zeros(n)  # Dollars of margin used for each ticker's short
+        self.realized_long = np.zeros(n)  # Realized gains from long positions
+        self.realized_short = np.zeros(n)  # Realized gains from short positions
+
+        self._trades = np.zeros(max(trade_capacity, 1), dtype=TRADE_DTYPE)
+        self._trade_count = 0
+
+    @property
+    def trades(self) -> np.ndarray:
+        """The executed trades, in execution order."""
+        return self._trades[: self._trade_count]
+
+    def _log_trade(self, ticker_id: int, action: str, quantity: int, price: float, date):
+        if self._trade_count == len(self._trades):
+            # Grow geometrically so appends stay amortized O(1)
+            self._trades = np.concatenate([self._trades, np.zeros(len(self._trades), dtype=TRADE_DTYPE)])
+        self._trades[self._trade_count] = (np.datetime64(date, "D") if date is not None else np.datetime64("NaT", "D"), ticker_id, action, quantity, price)
+        self._trade_count += 1
+
+    def execute_trade(self, ticker: str, action: str, quantity: float, current_price: float, date=None) -> int:
+        """
+        Execute a trade and return the number of shares actually traded.
+        Only integer shares are traded; buys and shorts are scaled down to what
+        cash and margin allow, sells and covers to the shares currently held.
+        """
+        if quantity <= 0:
+            return 0
+
+        quantity = int(quantity)  # force integer shares
+        i = self.ticker_ids[ticker]
+
+        if action == "buy":
+            cost = quantity * current_price
+            if cost > self.cash:
+                # Calculate maximum affordable quantity
+                quantity = int(self.cash / current_price)
+                if quantity <= 0:
+                    return 0
+                cost = quantity * current_price
+
+            # Weighted average cost basis for the new total
+            total_shares = self.long[i] + quantity
+            self.long_cost_basis[i] = (self.long_cost_basis[i] * self.long[i] + cost) / total_shares
+            self.long[i] = total_shares
+            self.cash -= cost
+
+        elif action == "sell":
+            # You can only sell as many as you own
+            quantity = min(quantity, int(self.long[i]))
+            if quantity <= 0:
+                return 0
+
+            # Realized gain/loss using average cost basis
+            self.realized_long[i] += (current_price - self.long_cost_basis[i]) * quantity
+            self.long[i] -= quantity
+            self.cash += quantity * current_price
+            if self.long[i] == 0:
+                self.long_cost_basis[i] = 0.0
+
+        elif action == "short":
+            # Receive the proceeds, post margin_required = proceeds * margin ratio
+            proceeds = current_price * quantity
+            margin_required = proceeds * self.margin_requirement
+            if margin_required > self.cash:
+                # Calculate maximum shortable quantity
+                if self.margin_requirement > 0:
+                    quantity = int(self.cash / (current_price * self.margin_requirement))
+                else:
+                    quantity = 0
+                if quantity <= 0:
+                    return 0
+                proceeds = current_price * quantity
+                margin_required = proceeds * self.margin_requirement
+
+            # Weighted average short cost basis
+            total_shares = self.short[i] + quantity
+            self.short_cost_basis[i] = (self.short_cost_basis[i] * self.short[i] + current_price * quantity) / total_shares
+            self.short[i] = total_shares
+
+            self.short_margin_used[i] += margin_required
+            self.margin_used += margin_required
+            self.cash += proceeds
+            self.cash -= margin_required
+
+        elif action == "cover":
+            # Pay the cover cost, release a proportional share of the margin
+            quantity = min(quantity, int(self.short[i]))
+            if quantity <= 0:
+                return 0
+
+            cover_cost = quantity * current_price
+            realized_gain = (self.short_cost_basis[i] - current_price) * quantity
+            margin_to_release = quantity / self.short[i] * self.short_margin_used[i]
+
+            self.short[i] -= quantity
+            self.short_margin_used[i] -= margin_to_release
+            self.margin_used -= margin_to_release
+            self.cash += margin_to_release
+            self.cash -= cover_cost
+            self.realized_short[i] += realized_gain
+
+            if self.short[i] == 0:
+                self.short_cost_basis[i] = 0.0
+                self.short_margin_used[i] = 0.0
+
+        else:
+            return 0
+
+        self._log_trade(i, action, quantity, current_price, date)
+        return quantity
+
+    def mark_to_market(self, prices: np.ndarray) -> float:
+        """Total portfolio value (cash + long market value - short market value) for prices in ticker order."""
+        return float(self.cash + np.dot(self.long - self.short, prices))
+
+    def exposures(self, prices: np.ndarray) -> tuple[float, float]:
+        """Long and short market exposure for prices in ticker order."""
+        return float(np.dot(self.long, prices)), float(np.dot(self.short, prices))
+
+    def total_realized_gains(self) -> float:
+        return float(self.realized_long.sum() + self.realized_short.sum())
+
+    def to_dict(self) -> dict:
+        """The nested-dict portfolio view used by the agents."""
+        positions = zip(
+            self.tickers,
+            self.long.tolist(),
+            self.short.tolist(),
+            self.long_cost_basis.tolist(),
+            self.short_cost_basis.tolist(),
+            self.short_margin_used.tolist(),
+        )
+        return {
+            "cash": self.cash,
+            "margin_used": self.margin_used,
+            "margin_requirement": self.margin_requirement,
+            "positions": {ticker: {"long": long, "short": short, "long_cost_basis": long_cost_basis, "short_cost_basis": short_cost_basis, "short_margin_used": short_margin_used} for ticker, long, short, long_cost_basis, short_cost_basis, short_margin_used in positions},
+            "realized_gains": {ticker: {"long": long, "short": short} for ticker, long, short in zip(self.tickers, self.realized_long.tolist(), self.realized_short.tolist())},
+        }
+
+    @classmethod
+    def from_dict(cls, portfolio: dict, tickers: list[str] | None = None) -> "PortfolioLedger":
+        """Build a ledger from the nested-dict view, adding empty positions for any extra tickers."""
+        all_tickers = list(dict.fromkeys([*portfolio.get("positions", {}), *(tickers or [])]))
+        ledger = cls(all_tickers, portfolio["cash"], portfolio.get("margin_requirement", 0.0))
+        ledger.margin_used = float(portfolio.get("margin_used", 0.0))
+        for ticker, position in portfolio.get("positions", {}).items():
+            i = ledger.ticker_ids[ticker]
+            ledger.long[i] = position.get("long", 0)
+            ledger.short[i] = position.get("short", 0)
+            ledger.long_cost_basis[i] = position.get("long_cost_basis", 0.0)
+            ledger.short_cost_basis[i] = position.get("short_cost_basis", 0.0)
+            ledger.short_margin_used[i] = position.get("short_margin_used", 0.0)
+        for ticker, gains in portfolio.get("realized_gains", {}).items():
+            if ticker in ledger.ticker_ids:
+                ledger.realized_long[ledger.ticker_ids[ticker]] = gains.get("long", 0.0)
+                ledger.realized_short[ledger.ticker_ids[ticker]] = gains.get("short", 0.0)
+        return ledger
@@ -5,6 +5,7 @@ from typing import TypeVar, Type, Optional, Any
 from pydantic import BaseModel
 from src.llm.models import get_model, get_model_info
 from src.utils.progress import progress
+from src.utils.cancellation import check_cancelled
 
 T = TypeVar("T", bound=BaseModel)
 
@@ -46,6 +47,8 @@ def call_llm(
 
     # Call the LLM with retries
     for attempt in range(max_retries):
+        # Do not spend provider quota on a run that has been cancelled
+        check_cancelled()
         try:
             # Call the LLM
             result = llm.invoke(prompt)
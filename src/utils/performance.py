@@ -0,0 +1,88 @@
+"""Streaming performance metrics for the backtester."""
+
+import math
+
+import numpy as np
+
+
+class StreamingPerformance:
+    """
+    Online estimators for the running backtest metrics, updated in O(1) per day:
+    Welford mean/variance of daily excess returns (Sharpe), Welford variance of the
+    negative excess returns (Sortino), and the running peak / maximum drawdown.
+    Produces the same numbers as recomputing them from the full value history.
+    """
+
+    def __init__(self, annual_risk_free_rate: float = 0.0434):
+        # Assumes 252 trading days/year
+        self.daily_risk_free_rate = annual_risk_free_rate / 252
+
+        self._last_value = None
+
+        # Running mean and sum of squared deviations of excess returns
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+        # Same for the negative excess returns only
+        self._downside_count = 0
+        self._downside_mean = 0.0
+        self._downside_m2 = 0.0
+
+        self._peak = None
+        self.max_drawdown = 0.0
+        self.max_drawdown_date = None
+
+    def update(self, date, value: float):
+        """Add the portfolio value of the next day."""
+        # A return from a zero value is undefined (NaN/inf in the pandas computation) and skipped
+        if self._last_value is not None and self._last_value != 0:
+            daily_return = value / self._last_value - 1
+            if math.isfinite(daily_return):
+                excess_return = daily_return - self.daily_risk_free_rate
+
+                self._count += 1
+                delta = excess_return - self._mean
+                self._mean += delta / self._count
+                self._m2 += delta * (excess_return - self._mean)
+
+                if excess_return < 0:
+                    self._downside_count += 1
+                    delta = excess_return - self._downside_mean
+                    self._downside_mean += delta / self._downside_count
+                    self._downside_m2 += delta * (excess_return - self._downside_mean)
+        self._last_value = value
+
+        self._peak = value if self._peak is None else max(self._peak, value)
+        if self._peak == 0:
+            return  # drawdown from a zero peak is undefined, as in the pandas computation
+        drawdown = (value - self._peak) / self._peak
+        # Strict comparison keeps the first date on which the maximum drawdown was reached
+        if drawdown < self.max_drawdown:
+            self.max_drawdown = drawdown
+            self.max_drawdown_date = date
+
+    def update_metrics(self, performance_metrics: dict):
+        """Write the current Sharpe, Sortino and max drawdown into performance_metrics."""
+        if self._count < 2:
+            return  # not enough data points
+
+        mean_excess_return = self._mean
+        std_excess_return = math.sqrt(self._m2 / (self._count - 1))
+
+        # Sharpe ratio
+        if std_excess_return > 1e-12:
+            performance_metrics["sharpe_ratio"] = np.sqrt(252) * (mean_excess_return / std_excess_return)
+        else:
+            performance_metrics["sharpe_ratio"] = 0.0
+
+        # Sortino ratio (the sample std of a single negative return is undefined)
+        if self._downside_count > 1 and math.sqrt(self._downside_m2 / (self._downside_count - 1)) > 1e-12:
+            downside_std = math.sqrt(self._downside_m2 / (self._downside_count - 1))
+            performance_metrics["sortino_ratio"] = np.sqrt(252) * (mean_excess_return / downside_std)
+        else:
+            performance_metrics["sortino_ratio"] = float("inf") if mean_excess_return > 0 else 0
+
+        # Maximum drawdown, stored as a negative percentage
+        performance_metrics["max_drawdown"] = self.max_drawdown * 100
+        performance_metrics["max_drawdown_date"] = self.max_drawdown_date.strftime("%Y-%m-%d") if self.max_drawdown < 0 else None
@@ -1,3 +1,7 @@
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timezone
 from rich.console import Console
 from rich.live import Live
@@ -9,15 +13,46 @@ from typing import Dict, Optional, Callable, List
 console = Console()
 
 
+class ProgressChannel:
+    """Progress events of a single run, delivered only to that run's handlers."""
+
+    def __init__(self, handler: Callable[[str, Optional[str], str, Optional[str], str], None], signal_handler: Optional[Callable[[str, str, dict, str], None]] = None):
+        self.handler = handler
+        self.signal_handler = signal_handler
+
+    def publish(self, agent_name: str, ticker: Optional[str], status: str, analysis: Optional[str], timestamp: str):
+        self.handler(agent_name, ticker, status, analysis, timestamp)
+
+    def publish_signal(self, agent_name: str, ticker: str, signal: dict, timestamp: str):
+        if self.signal_handler is not None:
+            self.signal_handler(agent_name, ticker, signal, timestamp)
+
+
+# Channel of the run executing in the current context (None outside of run_channel)
+_current_channel: ContextVar[Optional[ProgressChannel]] = ContextVar("progress_channel", default=None)
+
+
 class AgentProgress:
-    """Manages progress tracking for multiple agents."""
+    """
+    Manages progress tracking for multiple agents.
+
+    Status updates only record the new state and mark the display dirty; the table is
+    rebuilt at most once per Live refresh (4 times per second), however many updates
+    arrive in between. In headless mode (for backtests and servers) the Live display is
+    never started.
+    """
 
-    def __init__(self):
+    def __init__(self, headless: bool = False):
         self.agent_status: Dict[str, Dict[str, str]] = {}
+        self.headless = headless
         self.table = Table(show_header=False, box=None, padding=(0, 1))
-        self.live = Live(self.table, console=console, refresh_per_second=4)
+        # Live renders this object (see __rich__) on its own refresh thread
+        self.live = Live(self, console=console, refresh_per_second=4)
         self.started = False
         self.update_handlers: List[Callable[[str, Optional[str], str], None]] = []
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._display_order: List[str] = []
 
     def register_handler(self, handler: Callable[[str, Optional[str], str], None]):
         """Register a handler to be called when agent status updates."""
@@ -29,9 +64,29 @@ class AgentProgress:
         if handler in self.update_handlers:
             self.update_handlers.remove(handler)
 
+    @contextmanager
+    def run_channel(self, handler: Callable[[str, Optional[str], str, Optional[str], str], None], signal_handler: Optional[Callable[[str, str, dict, str], None]] = None):
+        """
+        Route the progress updates made in this context (and in the threads and tasks
+        started from it, which inherit the context) to handler only, and the finished
+        per-ticker signals to signal_handler. Updates of other runs never reach the
+        handlers, and these updates bypass the global handlers and the console display.
+        """
+        token = _current_channel.set(ProgressChannel(handler, signal_handler))
+        try:
+            yield
+        finally:
+            _current_channel.reset(token)
+
+    def set_headless(self, headless: bool = True):
+        """Enable or disable headless mode (no console display)."""
+        if headless:
+            self.stop()
+        self.headless = headless
+
     def start(self):
-        """Start the progress display."""
-        if not self.started:
+        """Start the progress display (no-op in headless mode)."""
+        if not self.started and not self.headless:
             self.live.start()
             self.started = True
 
@@ -43,52 +98,77 @@ class AgentProgress:
 
     def update_status(self, agent_name: str, ticker: Optional[str] = None, status: str = "", analysis: Optional[str] = None):
         """Update the status of an agent."""
-        if agent_name not in self.agent_status:
-            self.agent_status[agent_name] = {"status": "", "ticker": None}
-
-        if ticker:
-            self.agent_status[agent_name]["ticker"] = ticker
-        if status:
-            self.agent_status[agent_name]["status"] = status
-        if analysis:
-            self.agent_status[agent_name]["analysis"] = analysis
-        
-        # Set the timestamp as UTC datetime
-        timestamp = datetime.now(timezone.utc).isoformat()
-        self.agent_status[agent_name]["timestamp"] = timestamp
-
-        # Notify all registered handlers
-        for handler in self.update_handlers:
+        channel = _current_channel.get()
+        if channel is not None:
+            channel.publish(agent_name, ticker, status, analysis, datetime.now(timezone.utc).isoformat())
+            return
+
+        with self._lock:
+            info = self.agent_status.get(agent_name)
+            if info is None:
+                info = self.agent_status[agent_name] = {"status": "", "ticker": None}
+                # Only a new agent changes the display order
+                self._display_order = sorted(self.agent_status, key=self._sort_key)
+
+            if ticker:
+                info["ticker"] = ticker
+            if status:
+                info["status"] = status
+            if analysis:
+                info["analysis"] = analysis
+            self._dirty = True
+
+            # Timestamp only when someone is listening (set as UTC datetime)
+            handlers = list(self.update_handlers)
+            if handlers:
+                timestamp = datetime.now(timezone.utc).isoformat()
+                info["timestamp"] = timestamp
+
+        # Notify the registered handlers outside the lock, with the values captured under it
+        for handler in handlers:
             handler(agent_name, ticker, status, analysis, timestamp)
 
-        self._refresh_display()
+    def update_signal(self, agent_name: str, ticker: str, signal: dict):
+        """Report an agent's finished signal for one ticker (only delivered to run channels)."""
+        channel = _current_channel.get()
+        if channel is not None:
+            channel.publish_signal(agent_name, ticker, signal, datetime.now(timezone.utc).isoformat())
 
     def get_all_status(self):
         """Get the current status of all agents as a dictionary."""
-        return {agent_name: {"ticker": info["ticker"], "status": info["status"], "display_name": self._get_display_name(agent_name)} for agent_name, info in self.agent_status.items()}
+        with self._lock:
+            return {agent_name: {"ticker": info["ticker"], "status": info["status"], "display_name": self._get_display_name(agent_name)} for agent_name, info in self.agent_status.items()}
 
     def _get_display_name(self, agent_name: str) -> str:
         """Convert agent_name to a display-friendly format."""
         return agent_name.replace("_agent", "").replace("_", " ").title()
 
+    @staticmethod
+    def _sort_key(agent_name: str):
+        """Sort agents with Risk Management and Portfolio Management at the bottom."""
+        if "risk_management" in agent_name:
+            return (2, agent_name)
+        elif "portfolio_management" in agent_name:
+            return (3, agent_name)
+        else:
+            return (1, agent_name)
+
+    def __rich__(self) -> Table:
+        """Called by Live on every refresh: rebuild the table only if something changed."""
+        if self._dirty:
+            self._refresh_display()
+        return self.table
+
     def _refresh_display(self):
-        """Refresh the progress display."""
-        self.table.columns.clear()
-        self.table.add_column(width=100)
-
-        # Sort agents with Risk Management and Portfolio Management at the bottom
-        def sort_key(item):
-            agent_name = item[0]
-            if "risk_management" in agent_name:
-                return (2, agent_name)
-            elif "portfolio_management" in agent_name:
-                return (3, agent_name)
-            else:
-                return (1, agent_name)
+        """Rebuild the progress table from the current status of every agent."""
+        with self._lock:
+            rows = [(agent_name, self.agent_status[agent_name]["status"], self.agent_status[agent_name]["ticker"]) for agent_name in self._display_order]
+            self._dirty = False
+
+        table = Table(show_header=False, box=None, padding=(0, 1))
+        table.add_column(width=100)
 
-        for agent_name, info in sorted(self.agent_status.items(), key=sort_key):
-            status = info["status"]
-            ticker = info["ticker"]
+        for agent_name, status, ticker in rows:
             # Create the status text with appropriate styling
             if status.lower() == "done":
                 style = Style(color="green", bold=True)
@@ -109,8 +189,10 @@ class AgentProgress:
                 status_text.append(f"[{ticker}] ", style=Style(color="cyan"))
             status_text.append(status, style=style)
 
-            self.table.add_row(status_text)
+            table.add_row(status_text)
+
+        self.table = table
 
 
-# Create a global instance
-progress = AgentProgress()
+# Create a global instance (headless when HEDGE_FUND_HEADLESS is set, e.g. on servers)
+progress = AgentProgress(headless=os.environ.get("HEDGE_FUND_HEADLESS", "").lower() in ("1", "true", "yes"))
@@ -0,0 +1,205 @@
+"""Covariance-based position sizing for the risk manager."""
+
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.tools.bars import get_bars
+
+# Trading days of returns in the rolling covariance window
+COVARIANCE_WINDOW = 63
+# Calendar days fetched when a model is first built, enough for COVARIANCE_WINDOW trading days
+COVARIANCE_LOOKBACK_DAYS = 100
+# Fewer return observations than this fall back to the flat position limit
+MIN_OBSERVATIONS = 20
+# Annualized portfolio volatility targeted by the position limits
+TARGET_VOLATILITY = 0.15
+# Hard cap of any single position as a fraction of NAV
+MAX_POSITION_WEIGHT = 0.20
+# Number of universes whose covariance models are kept between runs
+MAX_CACHED_MODELS = 16
+
+
+class RollingCovariance:
+    """
+    Covariance of the last `window` return vectors, maintained from a running sum and
+    cross-product matrix so each new day costs O(N^2) instead of O(window * N^2).
+    The sums are rebuilt from the window every `window` updates to bound drift.
+    Missing returns count as zero (no price move).
+    """
+
+    def __init__(self, n_assets: int, window: int = COVARIANCE_WINDOW):
+        self.window = window
+        self.rows = deque(maxlen=window)
+        self._sum = np.zeros(n_assets)
+        self._cross = np.zeros((n_assets, n_assets))
+        self._since_rebuild = 0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def push(self, returns: np.ndarray):
+        row = np.nan_to_num(np.asarray(returns, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+        if len(self.rows) == self.window:
+            oldest = self.rows[0]
+            self._sum -= oldest
+            self._cross -= np.outer(oldest, oldest)
+        self.rows.append(row)
+        self._sum += row
+        self._cross += np.outer(row, row)
+
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.window:
+            returns_matrix = np.array(self.rows)
+            self._sum = returns_matrix.sum(axis=0)
+            self._cross = returns_matrix.T @ returns_matrix
+            self._since_rebuild = 0
+
+    def shrunk_covariance(self) -> tuple[np.ndarray, float]:
+        """
+        Ledoit-Wolf covariance: the (biased) sample covariance shrunk towards a scaled
+        identity with the optimal intensity. Returns the matrix and the intensity.
+        """
+        t = len(self.rows)
+        mean = self._sum / t
+        sample = self._cross / t - np.outer(mean, mean)
+        n = len(mean)
+
+        mu = np.trace(sample) / n
+        target_distance = ((sample - mu * np.eye(n)) ** 2).sum() / n
+        if target_distance <= 0:
+            return sample, 0.0
+
+        # Average squared distance of the single-day outer products from the sample covariance
+        centered = np.array(self.rows) - mean
+        sample_noise = ((np.einsum("ij,ij->i", centered, centered) ** 2).sum() / t - (sample**2).sum()) / (t * n)
+        shrinkage = float(min(max(sample_noise, 0.0), target_distance) / target_distance)
+        return shrinkage * mu * np.eye(n) + (1 - shrinkage) * sample, shrinkage
+
+
+class CovarianceModel:
+    """
+    Rolling return covariance of a fixed ticker universe. The first update reads a
+    lookback window of daily bars; later updates for a newer date only ingest the days
+    since the previous one. The bars come from the shared bars cache, so the prices the
+    backtester prefetched or the analysts already fetched are not downloaded again.
+    Runs sharing a model serialize on its lock.
+    """
+
+    def __init__(self, tickers: list[str], window: int = COVARIANCE_WINDOW):
+        self.tickers = list(tickers)
+        self.window = window
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.covariance = RollingCovariance(len(self.tickers), self.window)
+        self.last_date = None
+        self.last_closes = None
+
+    def update(self, end_date: str):
+        if self.last_date == end_date:
+            return
+        if self.last_date is None or end_date < self.last_date:
+            self.reset()
+            start_date = (datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=COVARIANCE_LOOKBACK_DAYS)).strftime("%Y-%m-%d")
+        else:
+            start_date = (datetime.strptime(self.last_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+        closes = self._fetch_closes(start_date, end_date)
+        if self.last_closes is not None:
+            closes = pd.concat([self.last_closes.to_frame().T, closes])
+        if not closes.empty:
+            closes = closes.ffill()
+            for returns in closes.pct_change().iloc[1:].to_numpy():
+                self.covariance.push(returns)
+            self.last_closes = closes.iloc[-1]
+        self.last_date = end_date
+
+    def _fetch_closes(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """Daily closes of the universe (dates x tickers), NaN where a ticker has no bar."""
+        series = {}
+        for ticker in self.tickers:
+            try:
+                bars = get_bars(ticker, start_date, end_date)
+            except Exception as e:
+                print(f"Error fetching prices for {ticker}: {e}")
+                continue
+            if not bars.empty:
+                close = bars["close"]
+                close.index = close.index.tz_localize(None).normalize() if close.index.tz is not None else close.index.normalize()
+                series[ticker] = close[~close.index.duplicated(keep="last")]
+        return pd.DataFrame(series, columns=self.tickers, dtype=float).sort_index()
+
+
+_models: dict[tuple[str, ...], CovarianceModel] = {}
+_models_lock = threading.Lock()
+
+
+def get_covariance_model(tickers: list[str]) -> CovarianceModel:
+    """The covariance model of a universe (models are reused across runs)."""
+    key = tuple(tickers)
+    with _models_lock:
+        if key not in _models:
+            if len(_models) >= MAX_CACHED_MODELS:
+                _models.pop(next(iter(_models)))
+            _models[key] = CovarianceModel(list(tickers))
+        return _models[key]
+
+
+def estimate_covariance(tickers: list[str], end_date: str) -> tuple[np.ndarray, float] | None:
+    """
+    Shrunk daily return covariance of a universe as of end_date and its shrinkage
+    intensity, or None with fewer than MIN_OBSERVATIONS days of returns. The update and
+    the estimate happen under the model's lock, so a concurrent run moving the shared
+    model to another date cannot interleave with them.
+    """
+    model = get_covariance_model(tickers)
+    with model.lock:
+        model.update(end_date)
+        if len(model.covariance) < MIN_OBSERVATIONS:
+            return None
+        return model.covariance.shrunk_covariance()
+
+
+def risk_based_limits(
+    covariance: np.ndarray,
+    portfolio_value: float,
+    position_values: np.ndarray,
+    target_volatility: float = TARGET_VOLATILITY,
+    max_weight: float = MAX_POSITION_WEIGHT,
+) -> dict[str, np.ndarray | float]:
+    """
+    Per-ticker position limits (in currency) from a daily return covariance matrix.
+
+    Each ticker's budget is an inverse-volatility weight, scaled so that the budgets of
+    the whole universe together run at the target volatility (so a highly correlated
+    universe gets smaller limits), and capped at max_weight of NAV. When the current
+    portfolio (signed position_values) already exceeds the target, the budgets of tickers
+    with a positive marginal risk contribution are scaled down by the excess.
+    """
+    annual_covariance = covariance * 252
+    volatility = np.sqrt(np.clip(np.diag(annual_covariance), 0.0, None))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inverse_volatility = np.where(volatility > 0, 1 / volatility, 0.0)
+    budget_volatility = np.sqrt(max(inverse_volatility @ annual_covariance @ inverse_volatility, 0.0))
+    target_weights = inverse_volatility * (target_volatility / budget_volatility) if budget_volatility > 0 else np.zeros_like(volatility)
+
+    weights = position_values / portfolio_value if portfolio_value > 0 else np.zeros_like(position_values)
+    portfolio_volatility = float(np.sqrt(max(weights @ annual_covariance @ weights, 0.0)))
+    if portfolio_volatility > 0:
+        marginal_contribution = annual_covariance @ weights / portfolio_volatility
+    else:
+        marginal_contribution = np.zeros_like(weights)
+    scale = np.where((marginal_contribution > 0) & (portfolio_volatility > target_volatility), target_volatility / max(portfolio_volatility, 1e-12), 1.0)
+
+    limit_weights = np.minimum(target_weights * scale, max_weight)
+    return {
+        "position_limits": limit_weights * max(portfolio_value, 0.0),
+        "volatility": volatility,
+        "marginal_contribution": marginal_contribution,
+        "portfolio_volatility": portfolio_volatility,
+    }
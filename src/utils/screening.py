@@ -0,0 +1,46 @@
+"""Staged screening: cheap analysts over a large universe, expensive ones on the best candidates."""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from src.agents.portfolio_manager import signal_conviction
+from src.main import run_analysts
+
+# Tickers per analyst-stage batch of the screen, and how many batches run at once
+SCREEN_BATCH_SIZE = 50
+MAX_CONCURRENT_BATCHES = 4
+
+
+def screen_universe(tickers: list[str], start_date: str, end_date: str, analysts: list[str], model_name: str, model_provider: str) -> dict:
+    """
+    Run the analyst stage of the given analysts over the whole universe, in batches of
+    SCREEN_BATCH_SIZE tickers of which MAX_CONCURRENT_BATCHES run at once (each batch
+    fetches its data and computes its indicators together). Returns the merged analyst
+    signals ({agent: {ticker: signal}}).
+    """
+    if not analysts or not tickers:
+        return {}
+
+    batches = [tickers[i : i + SCREEN_BATCH_SIZE] for i in range(0, len(tickers), SCREEN_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_BATCHES, max(len(batches), 1))) as executor:
+        # Each batch runs in a copy of the caller's context, so progress channels and
+        # cancellation reach the worker threads
+        futures = [executor.submit(contextvars.copy_context().run, run_analysts, batch, start_date, end_date, analysts, model_name, model_provider) for batch in batches]
+        analyst_signals = {}
+        for future in futures:
+            for agent, signals in future.result().items():
+                analyst_signals.setdefault(agent, {}).update(signals)
+    return analyst_signals
+
+
+def rank_tickers(analyst_signals: dict, tickers: list[str]) -> dict[str, float]:
+    """
+    Net conviction of every ticker (see signal_conviction), sorted by its strength:
+    strongly bearish candidates rank as high as strongly bullish ones, since either can
+    be traded. Ties keep the universe order.
+    """
+    scores = {}
+    for ticker in tickers:
+        signals = [agent_signals[ticker] for agent_signals in analyst_signals.values() if ticker in agent_signals and "signal" in agent_signals[ticker]]
+        scores[ticker] = signal_conviction(signals)
+    return dict(sorted(scores.items(), key=lambda item: abs(item[1]), reverse=True))
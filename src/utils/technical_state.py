@@ -0,0 +1,214 @@
+"""Online technical indicator state that is advanced one bar at a time and persisted between runs."""
+
+import json
+import math
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from src.utils.indicators import IncrementalHurst, OnlineEwm, RollingMoments
+
+# Directory holding one JSON checkpoint per ticker; persistence is disabled when unset
+STATE_DIR_ENV = "TECHNICAL_STATE_DIR"
+
+
+class TechnicalState:
+    """
+    Every indicator used by the technical analyst, kept as incremental state:
+    EMA 8/21/55, ADX 14, RSI 14/28, Bollinger 20, ATR 14, momentum sums, the
+    volatility regime and the 63-bar return moments, plus the Hurst exponent.
+
+    `update` ingests one OHLCV bar in O(1) (O(max_lag) for the Hurst exponent), so
+    daily runs only process the bars added since the last checkpoint. The values
+    follow the same definitions as the batch kernels in src/utils/indicators.py,
+    computed over the full history since start_date. They equal the batch signals of
+    a run only when that run's window starts on the same date (see `matches`).
+    """
+
+    VERSION = 2
+
+    def __init__(self, start_date: str | None = None):
+        # First date of the price window the state was seeded from
+        self.start_date = start_date
+        self.last_date = None
+        self.last_close = math.nan
+        self.last_high = math.nan
+        self.last_low = math.nan
+        self.last_volume = math.nan
+
+        # Trend
+        self.ema_8 = OnlineEwm(8, adjust=False)
+        self.ema_21 = OnlineEwm(21, adjust=False)
+        self.ema_55 = OnlineEwm(55, adjust=False)
+        self.tr_ewm = OnlineEwm(14)
+        self.plus_dm_ewm = OnlineEwm(14)
+        self.minus_dm_ewm = OnlineEwm(14)
+        self.dx_ewm = OnlineEwm(14)
+
+        # Mean reversion
+        self.close_50 = RollingMoments(50)
+        self.close_20 = RollingMoments(20)
+        self.gain_14 = RollingMoments(14)
+        self.loss_14 = RollingMoments(14)
+        self.gain_28 = RollingMoments(28)
+        self.loss_28 = RollingMoments(28)
+
+        # Momentum
+        self.returns_21 = RollingMoments(21)
+        self.returns_63 = RollingMoments(63)
+        self.returns_126 = RollingMoments(126)
+        self.volume_21 = RollingMoments(21)
+
+        # Volatility
+        self.hist_vol_63 = RollingMoments(63)
+        self.tr_14 = RollingMoments(14)
+
+        # Statistical arbitrage
+        self.hurst = IncrementalHurst()
+
+    def update(self, date, open_: float, high: float, low: float, close: float, volume: float):
+        """Ingest the next bar; bars must arrive in date order."""
+        prev_close, prev_high, prev_low = self.last_close, self.last_high, self.last_low
+
+        # True range and directional movement (the first bar has no previous bar)
+        tr = max(high - low, abs(high - prev_close), abs(low - prev_close)) if not math.isnan(prev_close) else high - low
+        up_move = high - prev_high
+        down_move = prev_low - low
+        plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+        minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+
+        self.ema_8.push(close)
+        self.ema_21.push(close)
+        self.ema_55.push(close)
+        tr_smoothed = self.tr_ewm.push(tr)
+        plus_di = 100 * _divide(self.plus_dm_ewm.push(plus_dm), tr_smoothed)
+        minus_di = 100 * _divide(self.minus_dm_ewm.push(minus_dm), tr_smoothed)
+        self.dx_ewm.push(100 * _divide(abs(plus_di - minus_di), plus_di + minus_di))
+
+        self.close_50.push(close)
+        self.close_20.push(close)
+        delta = close - prev_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        self.gain_14.push(gain)
+        self.loss_14.push(loss)
+        self.gain_28.push(gain)
+        self.loss_28.push(loss)
+
+        daily_return = _divide(close, prev_close) - 1
+        self.returns_21.push(daily_return)
+        self.returns_63.push(daily_return)
+        self.returns_126.push(daily_return)
+        self.volume_21.push(volume)
+
+        self.hist_vol_63.push(self.returns_21.std() * math.sqrt(252))
+        self.tr_14.push(tr)
+
+        self.hurst.push(close)
+
+        self.last_date = pd.Timestamp(date).strftime("%Y-%m-%d")
+        self.last_close, self.last_high, self.last_low, self.last_volume = close, high, low, volume
+
+    def matches(self, start_date: str, end_date: str) -> bool:
+        """Whether the state can be advanced to the window [start_date, end_date] of a run."""
+        return self.start_date == start_date and self.last_date is not None and self.last_date <= end_date
+
+    def update_from_frame(self, prices_df: pd.DataFrame):
+        """Ingest the bars of a price DataFrame that are newer than the last ingested bar."""
+        if self.last_date is not None:
+            prices_df = prices_df[prices_df.index > pd.Timestamp(self.last_date)]
+        for date, bar in zip(prices_df.index, prices_df[["open", "high", "low", "close", "volume"]].itertuples(index=False)):
+            self.update(date, *map(float, bar))
+
+    def indicators(self) -> dict[str, float]:
+        """Latest indicator values, named like the arguments of the strategy signal functions."""
+        sma_20 = self.close_20.mean()
+        std_20 = self.close_20.std()
+        rsi_14 = 100 - 100 / (1 + _divide(self.gain_14.mean(), self.loss_14.mean()))
+        rsi_28 = 100 - 100 / (1 + _divide(self.gain_28.mean(), self.loss_28.mean()))
+        return {
+            "close": self.last_close,
+            "ema_8": self.ema_8.value,
+            "ema_21": self.ema_21.value,
+            "ema_55": self.ema_55.value,
+            "adx": self.dx_ewm.value,
+            "ma_50": self.close_50.mean(),
+            "std_50": self.close_50.std(),
+            "bb_upper": sma_20 + std_20 * 2,
+            "bb_lower": sma_20 - std_20 * 2,
+            "rsi_14": rsi_14,
+            "rsi_28": rsi_28,
+            "mom_1m": self.returns_21.mean() * 21,
+            "mom_3m": self.returns_63.mean() * 63,
+            "mom_6m": self.returns_126.mean() * 126,
+            "volume_momentum": _divide(self.last_volume, self.volume_21.mean()),
+            "hist_vol": self.returns_21.std() * math.sqrt(252),
+            "vol_ma": self.hist_vol_63.mean(),
+            "vol_std": self.hist_vol_63.std(),
+            "atr_ratio": _divide(self.tr_14.mean(), self.last_close),
+            "hurst": self.hurst.value(),
+            "skew": self.returns_63.skew(),
+            "kurt": self.returns_63.kurt(),
+        }
+
+    def to_dict(self) -> dict:
+        data = {"version": self.VERSION}
+        for name, value in vars(self).items():
+            data[name] = value.to_dict() if hasattr(value, "to_dict") else value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TechnicalState":
+        if data.get("version") != cls.VERSION:
+            raise ValueError(f"Unsupported technical state version: {data.get('version')}")
+        state = cls()
+        for name, value in vars(state).items():
+            stored = data[name]
+            setattr(state, name, type(value).from_dict(stored) if hasattr(value, "from_dict") else stored)
+        return state
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    """Division with NumPy semantics: x/0 is +-inf and 0/0 is NaN instead of raising."""
+    if denominator == 0:
+        if numerator == 0 or math.isnan(numerator):
+            return math.nan
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+def get_state_dir() -> Path | None:
+    state_dir = os.environ.get(STATE_DIR_ENV)
+    return Path(state_dir) if state_dir else None
+
+
+def load_technical_state(ticker: str) -> TechnicalState | None:
+    """The persisted state of a ticker, or None when persistence is disabled or no valid checkpoint exists."""
+    state_dir = get_state_dir()
+    if state_dir is None:
+        return None
+    path = state_dir / f"{ticker}.json"
+    if not path.exists():
+        return None
+    try:
+        with open(path) as f:
+            return TechnicalState.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error loading technical state for {ticker}: {e}")
+        return None
+
+
+def save_technical_state(ticker: str, state: TechnicalState):
+    """Checkpoint the state of a ticker (no-op when persistence is disabled)."""
+    state_dir = get_state_dir()
+    if state_dir is None:
+        return
+    state_dir.mkdir(parents=True, exist_ok=True)
+    path = state_dir / f"{ticker}.json"
+    # Write to a temporary file of this writer first, so a crash never leaves a truncated
+    # checkpoint and concurrent writers (shard processes, API workers) never share one
+    with tempfile.NamedTemporaryFile("w", dir=state_dir, prefix=f"{ticker}.", suffix=".json.tmp", delete=False) as f:
+        json.dump(state.to_dict(), f)
+    os.replace(f.name, path)
@@ -0,0 +1,103 @@
+"""JobManager sharing of identical requests and expiry of completed results."""
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.backend.models.schemas import HedgeFundRequest
+from app.backend.services import jobs
+from app.backend.services.jobs import JobManager, request_fingerprint
+
+
+@pytest.fixture
+def graph_runs(monkeypatch):
+    """Replace the graph by a stub that records its runs and waits for the test to release them."""
+    runs = SimpleNamespace(count=0, release=threading.Event(), fail=False)
+
+    def run_graph(**kwargs):
+        runs.count += 1
+        runs.release.wait(timeout=5)
+        if runs.fail:
+            raise RuntimeError("graph failed")
+        decisions = {ticker: {"action": "hold", "quantity": 0, "confidence": 50.0, "reasoning": ""} for ticker in kwargs["tickers"]}
+        return {"messages": [SimpleNamespace(content=json.dumps(decisions))], "data": {"analyst_signals": {}}}
+
+    monkeypatch.setattr(jobs, "run_graph", run_graph)
+    monkeypatch.setattr(jobs, "get_compiled_graph", lambda selected_agents: object())
+    monkeypatch.setattr(jobs, "parse_hedge_fund_response", json.loads)
+    return runs
+
+
+def make_request(**overrides) -> HedgeFundRequest:
+    fields = {"tickers": ["AAPL", "MSFT"], "selected_agents": ["ben_graham", "cathie_wood"], "start_date": "2024-01-01", "end_date": "2024-03-01"}
+    return HedgeFundRequest(**{**fields, **overrides})
+
+
+def wait_finished(job, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not job.finished:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+
+
+def test_fingerprint_ignores_agent_and_ticker_order():
+    portfolio = {"cash": 100000.0}
+    request = make_request()
+    reordered = make_request(tickers=["MSFT", "AAPL"], selected_agents=["cathie_wood", "ben_graham", "ben_graham"])
+
+    assert request_fingerprint(request, "OpenAI", portfolio) == request_fingerprint(reordered, "OpenAI", portfolio)
+    assert request_fingerprint(request, "OpenAI", portfolio) != request_fingerprint(make_request(end_date="2024-03-02"), "OpenAI", portfolio)
+    assert request_fingerprint(request, "OpenAI", portfolio) != request_fingerprint(request, "Anthropic", portfolio)
+    assert request_fingerprint(request, "OpenAI", portfolio) != request_fingerprint(request, "OpenAI", {"cash": 50000.0})
+
+
+def test_identical_requests_share_a_running_job(graph_runs):
+    manager = JobManager(max_workers=1)
+    job = manager.submit(make_request())
+    shared = manager.submit(make_request(selected_agents=["cathie_wood", "ben_graham"]))
+    other = manager.submit(make_request(initial_cash=50000.0))
+
+    assert shared is job
+    assert other is not job
+
+    graph_runs.release.set()
+    wait_finished(job)
+    wait_finished(other)
+    assert job.status == "completed"
+    assert graph_runs.count == 2
+
+
+def test_completed_result_is_reused_until_it_expires(graph_runs):
+    graph_runs.release.set()
+    manager = JobManager(max_workers=1, result_ttl=60)
+    job = manager.submit(make_request())
+    wait_finished(job)
+    assert job.result["decisions"]["AAPL"]["action"] == "hold"
+
+    assert manager.submit(make_request()) is job
+    assert graph_runs.count == 1
+
+    job.finished_at -= 61
+    rerun = manager.submit(make_request())
+    assert rerun is not job
+    wait_finished(rerun)
+    assert graph_runs.count == 2
+    assert manager.submit(make_request()) is rerun
+
+
+def test_failed_job_is_not_reused(graph_runs):
+    graph_runs.release.set()
+    graph_runs.fail = True
+    manager = JobManager(max_workers=1)
+    job = manager.submit(make_request())
+    wait_finished(job)
+    assert job.status == "failed"
+
+    graph_runs.fail = False
+    rerun = manager.submit(make_request())
+    assert rerun is not job
+    wait_finished(rerun)
+    assert rerun.status == "completed"
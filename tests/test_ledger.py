@@ -0,0 +1,146 @@
+"""PortfolioLedger against the dict-based trade execution the backtester used before it."""
+
+import random
+
+import pytest
+
+from src.utils.ledger import PortfolioLedger
+
+
+def reference_portfolio(tickers: list[str], cash: float, margin_requirement: float) -> dict:
+    return {
+        "cash": cash,
+        "margin_used": 0.0,
+        "margin_requirement": margin_requirement,
+        "positions": {ticker: {"long": 0, "short": 0, "long_cost_basis": 0.0, "short_cost_basis": 0.0, "short_margin_used": 0.0} for ticker in tickers},
+        "realized_gains": {ticker: {"long": 0.0, "short": 0.0} for ticker in tickers},
+    }
+
+
+def reference_execute_trade(portfolio: dict, ticker: str, action: str, quantity: float, current_price: float) -> int:
+    """The original Backtester.execute_trade on the nested-dict portfolio."""
+    if quantity <= 0:
+        return 0
+    quantity = int(quantity)
+    position = portfolio["positions"][ticker]
+
+    if action == "buy":
+        if quantity * current_price > portfolio["cash"]:
+            quantity = int(portfolio["cash"] / current_price)
+        if quantity <= 0:
+            return 0
+        cost = quantity * current_price
+        total_shares = position["long"] + quantity
+        position["long_cost_basis"] = (position["long_cost_basis"] * position["long"] + cost) / total_shares
+        position["long"] += quantity
+        portfolio["cash"] -= cost
+        return quantity
+
+    if action == "sell":
+        quantity = min(quantity, position["long"])
+        if quantity <= 0:
+            return 0
+        portfolio["realized_gains"][ticker]["long"] += (current_price - position["long_cost_basis"]) * quantity
+        position["long"] -= quantity
+        portfolio["cash"] += quantity * current_price
+        if position["long"] == 0:
+            position["long_cost_basis"] = 0.0
+        return quantity
+
+    if action == "short":
+        margin_ratio = portfolio["margin_requirement"]
+        if current_price * quantity * margin_ratio > portfolio["cash"]:
+            quantity = int(portfolio["cash"] / (current_price * margin_ratio)) if margin_ratio > 0 else 0
+        if quantity <= 0:
+            return 0
+        proceeds = current_price * quantity
+        margin_required = proceeds * margin_ratio
+        total_shares = position["short"] + quantity
+        position["short_cost_basis"] = (position["short_cost_basis"] * position["short"] + proceeds) / total_shares
+        position["short"] += quantity
+        position["short_margin_used"] += margin_required
+        portfolio["margin_used"] += margin_required
+        portfolio["cash"] += proceeds - margin_required
+        return quantity
+
+    if action == "cover":
+        quantity = min(quantity, position["short"])
+        if quantity <= 0:
+            return 0
+        portfolio["realized_gains"][ticker]["short"] += (position["short_cost_basis"] - current_price) * quantity
+        margin_to_release = quantity / position["short"] * position["short_margin_used"]
+        position["short"] -= quantity
+        position["short_margin_used"] -= margin_to_release
+        portfolio["margin_used"] -= margin_to_release
+        portfolio["cash"] += margin_to_release - quantity * current_price
+        if position["short"] == 0:
+            position["short_cost_basis"] = 0.0
+            position["short_margin_used"] = 0.0
+        return quantity
+
+    return 0
+
+
+def assert_same_portfolio(actual: dict, expected: dict):
+    assert actual["cash"] == pytest.approx(expected["cash"])
+    assert actual["margin_used"] == pytest.approx(expected["margin_used"], abs=1e-9)
+    for ticker, position in expected["positions"].items():
+        for field, value in position.items():
+            assert actual["positions"][ticker][field] == pytest.approx(value, abs=1e-9), (ticker, field)
+        for side, gain in expected["realized_gains"][ticker].items():
+            assert actual["realized_gains"][ticker][side] == pytest.approx(gain, abs=1e-9), (ticker, side)
+
+
+@pytest.mark.parametrize(
+    "trades",
+    [
+        [("AAPL", "buy", 10, 100.0), ("AAPL", "buy", 10, 120.0), ("AAPL", "sell", 5, 130.0), ("AAPL", "sell", 100, 90.0)],
+        [("AAPL", "short", 20, 50.0), ("AAPL", "short", 10, 60.0), ("AAPL", "cover", 15, 40.0), ("AAPL", "cover", 100, 70.0)],
+        [("AAPL", "buy", 1000, 100.0), ("MSFT", "short", 10000, 10.0), ("MSFT", "cover", 0, 10.0), ("AAPL", "hold", 5, 100.0)],
+    ],
+)
+@pytest.mark.parametrize("margin_requirement", [0.0, 0.5])
+def test_trades_match_reference(trades, margin_requirement):
+    ledger = PortfolioLedger(["AAPL", "MSFT"], 10000.0, margin_requirement)
+    expected = reference_portfolio(["AAPL", "MSFT"], 10000.0, margin_requirement)
+
+    for ticker, action, quantity, price in trades:
+        assert ledger.execute_trade(ticker, action, quantity, price) == reference_execute_trade(expected, ticker, action, quantity, price)
+        assert_same_portfolio(ledger.to_dict(), expected)
+
+
+@pytest.mark.parametrize("margin_requirement", [0.0, 0.3, 1.0])
+def test_random_trades_match_reference(margin_requirement):
+    rng = random.Random(7)
+    tickers = ["AAPL", "MSFT", "NVDA"]
+    ledger = PortfolioLedger(tickers, 50000.0, margin_requirement)
+    expected = reference_portfolio(tickers, 50000.0, margin_requirement)
+
+    for _ in range(500):
+        ticker = rng.choice(tickers)
+        action = rng.choice(["buy", "sell", "short", "cover", "hold"])
+        quantity = rng.randint(0, 200)
+        price = round(rng.uniform(5.0, 300.0), 2)
+        assert ledger.execute_trade(ticker, action, quantity, price) == reference_execute_trade(expected, ticker, action, quantity, price)
+    assert_same_portfolio(ledger.to_dict(), expected)
+
+
+def test_round_trip_through_dict():
+    ledger = PortfolioLedger(["AAPL", "MSFT"], 10000.0, 0.5)
+    ledger.execute_trade("AAPL", "buy", 10, 100.0)
+    ledger.execute_trade("MSFT", "short", 20, 50.0)
+
+    restored = PortfolioLedger.from_dict(ledger.to_dict(), ["NVDA"])
+    assert restored.tickers == ["AAPL", "MSFT", "NVDA"]
+    assert_same_portfolio(restored.to_dict(), ledger.to_dict())
+    assert restored.to_dict()["positions"]["NVDA"]["long"] == 0
+
+
+def test_trades_are_logged():
+    ledger = PortfolioLedger(["AAPL"], 1000.0, trade_capacity=1)
+    ledger.execute_trade("AAPL", "buy", 5, 100.0, date="2024-01-02")
+    ledger.execute_trade("AAPL", "sell", 0, 100.0, date="2024-01-03")
+    ledger.execute_trade("AAPL", "sell", 2, 110.0, date="2024-01-04")
+
+    assert ledger.trades["action"].tolist() == ["buy", "sell"]
+    assert ledger.trades["quantity"].tolist() == [5, 2]
@@ -0,0 +1,81 @@
+"""StreamingPerformance against the pandas recomputation over the full value history."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.performance import StreamingPerformance
+
+
+def reference_metrics(dates: list, values: list[float]) -> dict:
+    """The backtester's original _update_performance_metrics."""
+    performance_metrics = {}
+    values_df = pd.DataFrame({"Date": dates, "Portfolio Value": values}).set_index("Date")
+    daily_returns = values_df["Portfolio Value"].pct_change().replace([np.inf, -np.inf], np.nan).dropna()
+    if len(daily_returns) < 2:
+        return performance_metrics
+
+    daily_risk_free_rate = 0.0434 / 252
+    excess_returns = daily_returns - daily_risk_free_rate
+    mean_excess_return = excess_returns.mean()
+    std_excess_return = excess_returns.std()
+
+    if std_excess_return > 1e-12:
+        performance_metrics["sharpe_ratio"] = np.sqrt(252) * (mean_excess_return / std_excess_return)
+    else:
+        performance_metrics["sharpe_ratio"] = 0.0
+
+    negative_returns = excess_returns[excess_returns < 0]
+    if len(negative_returns) > 1 and negative_returns.std() > 1e-12:
+        performance_metrics["sortino_ratio"] = np.sqrt(252) * (mean_excess_return / negative_returns.std())
+    else:
+        performance_metrics["sortino_ratio"] = float("inf") if mean_excess_return > 0 else 0
+
+    rolling_max = values_df["Portfolio Value"].cummax()
+    drawdown = (values_df["Portfolio Value"] - rolling_max) / rolling_max
+    performance_metrics["max_drawdown"] = drawdown.min() * 100
+    performance_metrics["max_drawdown_date"] = drawdown.idxmin().strftime("%Y-%m-%d") if drawdown.min() < 0 else None
+    return performance_metrics
+
+
+def assert_same_metrics(actual: dict, expected: dict):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, float):
+            assert actual[key] == pytest.approx(value, rel=1e-9, abs=1e-9), key
+        else:
+            assert actual[key] == value, key
+
+
+def check_series(values: list[float]):
+    dates = list(pd.bdate_range("2024-01-02", periods=len(values)))
+    performance = StreamingPerformance()
+    for i, (date, value) in enumerate(zip(dates, values)):
+        performance.update(date, value)
+        actual = {}
+        performance.update_metrics(actual)
+        assert_same_metrics(actual, reference_metrics(dates[: i + 1], values[: i + 1]))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_random_walk_matches_pandas(seed):
+    rng = np.random.default_rng(seed)
+    values = (100000.0 * np.cumprod(1 + rng.normal(0.0005, 0.02, 250))).tolist()
+    check_series(values)
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [100.0, 100.0, 100.0, 100.0],  # flat: zero standard deviation
+        [100.0, 110.0, 121.0, 133.1],  # only gains: infinite Sortino
+        [100.0, 90.0, 95.0, 120.0, 80.0, 80.0, 130.0],  # one drawdown deepens, then recovers
+        [100.0, 95.0, 100.0, 95.0, 100.0],  # the same maximum drawdown twice keeps the first date
+    ],
+)
+def test_edge_cases_match_pandas(values):
+    check_series(values)
+
+
+def test_zero_value_is_skipped_like_pandas():
+    check_series([100.0, 50.0, 0.0, 0.0, 20.0, 30.0, 25.0])